@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark del AVLTree iterativo: operaciones por segundo de inserción y
+búsqueda con las claves enteras (red, longitud) que usa Device, y
+construcción/combinación en bloque (from_sorted, union) frente a insert_key.
+Al final compara claves string "a.b.c.d/len" con claves enteras.
+
+Uso: python bench_avl.py [n_rutas]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from data_structures import AVLTree
+from network.addressing import format_route_key, make_route_key
+
+FIRST_ADDRESS = 167772160  # 10.0.0.0
+
+def route_keys(n):
+    """Genera n claves de prefijos /32 distintos en orden aleatorio"""
+    keys = [make_route_key(address, 32) for address in range(FIRST_ADDRESS, FIRST_ADDRESS + n)]
+    random.shuffle(keys)
+    return keys
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    random.seed(42)
+    keys = route_keys(n)
+    value = {"next_hop": "10.255.255.254", "metric": 1, "mask": "255.255.255.255"}
+
+    tree = AVLTree()
+    start = time.perf_counter()
+    for key in keys:
+        tree.insert_key(key, value)
+    insert_time = time.perf_counter() - start
+
+    random.shuffle(keys)
+    search = tree.search_key
+    start = time.perf_counter()
+    for key in keys:
+        search(key)
+    lookup_time = time.perf_counter() - start
+
+    # Búsquedas fallidas: el caso típico de find_route al probar prefijos largos
+    misses = [key - 1 for key in keys]  # Misma red con longitud /31
+    start = time.perf_counter()
+    for key in misses:
+        search(key)
+    miss_time = time.perf_counter() - start
+
+    # Carga en bloque: ordenar + from_sorted, como Network._parse_config
+    start = time.perf_counter()
+    bulk = AVLTree.from_sorted(sorted((key, value) for key in keys))
+    bulk_time = time.perf_counter() - start
+
+    # Combinar una tabla con un 10% de rutas nuevas
+    extra = sorted((key - 1, value) for key in keys[:n // 10])
+    start = time.perf_counter()
+    bulk.union(extra)
+    union_time = time.perf_counter() - start
+
+    stats = tree.get_stats()
+    print(f"Rutas: {n}  altura: {stats['height']}  rotaciones: {stats['rotations']}")
+    print(f"{'operación':>16} | {'ops/s':>12} | {'ns/op':>8} | {'total':>8}")
+    print("-" * 53)
+    for name, elapsed, ops in (("insert_key", insert_time, n), ("search (hit)", lookup_time, n),
+                               ("search (miss)", miss_time, n), ("from_sorted", bulk_time, n),
+                               ("union (+10%)", union_time, len(extra))):
+        print(f"{name:>16} | {ops / elapsed:12,.0f} | {elapsed / ops * 1e9:8.0f} | {elapsed:7.2f}s")
+
+    compare_key_types(min(n, 200_000))
+
+def compare_key_types(n):
+    """Compara claves string y enteras: ns por inserción/búsqueda y bytes por nodo"""
+    random.seed(7)
+    int_keys = route_keys(n)
+    str_keys = [format_route_key(key) for key in int_keys]
+
+    print(f"\nClaves string vs enteras ({n} rutas)")
+    print(f"{'clave':>8} | {'ns/insert':>10} | {'ns/search':>10} | {'bytes/nodo':>10}")
+    print("-" * 48)
+    for name, keys in (("string", str_keys), ("entera", int_keys)):
+        # Memoria de los nodos; el tamaño de las claves se suma aparte
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tree = AVLTree()
+        for key in keys:
+            tree.insert_key(key, None)
+        used = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        tree = AVLTree()
+        start = time.perf_counter()
+        for key in keys:
+            tree.insert_key(key, None)
+        insert_ns = (time.perf_counter() - start) / n * 1e9
+
+        search = tree.search_key
+        start = time.perf_counter()
+        for key in keys:
+            search(key)
+        search_ns = (time.perf_counter() - start) / n * 1e9
+
+        key_bytes = sum(sys.getsizeof(key) for key in keys)
+        print(f"{name:>8} | {insert_ns:10.0f} | {search_ns:10.0f} | {(used + key_bytes) / n:10.1f}")
+
+if __name__ == "__main__":
+    main()
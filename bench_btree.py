@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark del B-Tree: operaciones por segundo de insert, search y delete al
+variar el orden, y búsqueda con el recorrido lineal dentro del nodo (enfoque
+anterior) frente a bisect sobre el mismo árbol.
+
+Uso: python bench_btree.py [n_claves]
+"""
+
+import random
+import sys
+import time
+
+from data_structures import BTree
+
+ORDERS = [4, 8, 16, 32, 64, 128, 256]
+
+def linear_search(tree, key):
+    """Búsqueda con el recorrido lineal por nodo que usaba BTree.search"""
+    node = tree.root
+    while True:
+        i = 0
+        while i < len(node.keys) and key > node.keys[i]:
+            i += 1
+        if i < len(node.keys) and key == node.keys[i]:
+            return node.values[i]
+        if node.leaf:
+            return None
+        node = node.children[i]
+
+def ops_per_second(function, items):
+    """Ejecuta function sobre cada elemento y retorna operaciones por segundo"""
+    start = time.perf_counter()
+    for item in items:
+        function(item)
+    return len(items) / (time.perf_counter() - start)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(5)
+    keys = [f"snapshot_{value:012d}" for value in random.sample(range(10 ** 12), n)]
+    lookups = random.sample(keys, min(n, 50_000))
+
+    print(f"{n} claves")
+    print(f"{'orden':>6} | {'altura':>6} | {'insert/s':>10} | {'search/s':>10} | {'lineal/s':>10} | {'delete/s':>10}")
+    print("-" * 67)
+    for order in ORDERS:
+        tree = BTree(order=order)
+        insert_rate = ops_per_second(lambda key: tree.insert(key, key), keys)
+        height = tree.get_stats()["height"]
+        search_rate = ops_per_second(tree.search, lookups)
+        linear_rate = ops_per_second(lambda key: linear_search(tree, key), lookups)
+        delete_rate = ops_per_second(tree.delete, lookups)
+        print(f"{order:>6} | {height:>6} | {insert_rate:>10.0f} | {search_rate:>10.0f} | "
+              f"{linear_rate:>10.0f} | {delete_rate:>10.0f}")
+
+if __name__ == "__main__":
+    main()
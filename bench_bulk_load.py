@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la carga del índice de snapshots en disco: una inserción por
+clave (con splits en cascada) frente a la carga masiva de abajo hacia arriba
+desde un iterador ordenado, y un lote de insert_many sobre el árbol cargado.
+
+Uso: python bench_bulk_load.py [n_claves ...]   (por defecto 10^5 y 10^6;
+10^7 escribe un archivo de ~600 MB)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from data_structures import DiskBTree
+
+# Por encima de este tamaño la inserción clave por clave se omite (tarda minutos)
+MAX_SINGLE_INSERTS = 200_000
+FILL_FACTORS = [0.7, 0.9, 1.0]
+
+def snapshot_items(n):
+    """Genera n pares (clave, archivo) ordenados, con claves tipo snapshot_<epoch>"""
+    for i in range(n):
+        key = f"snapshot_{1_700_000_000 + 3 * i}"
+        yield key, f"snapshots/{key}.cfg"
+
+def timed(function):
+    """Ejecuta function y retorna (resultado, segundos)"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10 ** 5, 10 ** 6]
+    print(f"{'claves':>10} | {'método':>16} | {'claves/s':>10} | {'nodos':>8} | {'altura':>6} | {'MB':>7}")
+    print("-" * 72)
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            rows = []
+            if n <= MAX_SINGLE_INSERTS:
+                path = os.path.join(directory, f"single_{n}.db")
+                tree = DiskBTree(path)
+                keys = list(snapshot_items(n))
+                random.seed(n)
+                random.shuffle(keys)
+                _, seconds = timed(lambda: [tree.insert(key, value) for key, value in keys])
+                rows.append(("insert aleatorio", tree, path, seconds))
+
+            for fill in FILL_FACTORS:
+                path = os.path.join(directory, f"bulk_{n}_{fill}.db")
+                tree = DiskBTree(path)
+                _, seconds = timed(lambda: tree.bulk_load(snapshot_items(n), fill_factor=fill))
+                rows.append((f"bulk fill={fill}", tree, path, seconds))
+
+            for name, tree, path, seconds in rows:
+                stats = tree.get_stats()
+                size_mb = os.path.getsize(path) / 2 ** 20
+                print(f"{n:>10} | {name:>16} | {n / seconds:>10.0f} | {stats['nodes']:>8} | "
+                      f"{stats['height']:>6} | {size_mb:>7.1f}")
+
+            # Lote del 10% con claves nuevas intercaladas: insert_many lo mezcla y reconstruye
+            tree = rows[-1][1]
+            batch = [(f"snapshot_{1_700_000_001 + 3 * i}", "lote") for i in range(0, n, 10)]
+            random.shuffle(batch)
+            added, seconds = timed(lambda: tree.insert_many(batch))
+            print(f"{n:>10} | {'insert_many 10%':>16} | {added / seconds:>10.0f} | "
+                  f"{tree.get_stats()['nodes']:>8} | {tree.get_height():>6} |")
+            for _, tree, path, _ in rows:
+                tree.close()
+                os.remove(path)
+
+if __name__ == "__main__":
+    main()
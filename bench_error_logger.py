@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las entradas del registro de errores: bytes por entrada y ns
+por log_error, comparando la entrada original (datetime + mensajes
+preformateados con f-strings) con la entrada compacta actual (__slots__,
+timestamp en ns y argumentos formateados solo al mostrarse). Ambas se
+almacenan en el mismo ErrorLogger para aislar el costo de la representación.
+
+Uso: python bench_error_logger.py [n_entradas]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from utils import ErrorLogger
+
+class LegacyErrorEntry:
+    """Entrada original: datetime y strings construidos en cada evento"""
+
+    def __init__(self, error_type, severity, message, command=""):
+        self.timestamp = datetime.now()
+        self.error_type = error_type
+        self.severity = severity
+        self.message = message
+        self.command = command
+        # Atributos que el ErrorLogger actual necesita para indexar
+        self.template = message
+        self.count = 1
+
+def log_legacy(logger, i):
+    source = "192.168.1.10"
+    destination = f"10.0.{i // 256 % 256}.{i % 256}"
+    logger._store(LegacyErrorEntry(
+        "NoRouteToHost", "ERROR",
+        f"No hay ruta disponible para {destination}",
+        f"packet from {source}"
+    ))
+
+def log_compact(logger, i):
+    destination = f"10.0.{i // 256 % 256}.{i % 256}"
+    logger.log_error(
+        "NoRouteToHost", "ERROR",
+        "No hay ruta disponible para {1}",
+        "packet from {0}",
+        ("192.168.1.10", destination)
+    )
+
+def measure(log, n):
+    """Retorna (bytes por entrada, ns por log_error)"""
+    tracemalloc.start()
+    logger = ErrorLogger(max_entries=n)
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(n):
+        log(logger, i)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    logger = ErrorLogger(max_entries=n)
+    start = time.perf_counter_ns()
+    for i in range(n):
+        log(logger, i)
+    elapsed = time.perf_counter_ns() - start
+    return used / n, elapsed / n
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    legacy_bytes, legacy_ns = measure(log_legacy, n)
+    compact_bytes, compact_ns = measure(log_compact, n)
+
+    print(f"Entradas: {n}")
+    print(f"{'':>12} | {'bytes/entrada':>14} | {'ns/log_error':>13}")
+    print("-" * 46)
+    print(f"{'original':>12} | {legacy_bytes:14.1f} | {legacy_ns:13.0f}")
+    print(f"{'compacta':>12} | {compact_bytes:14.1f} | {compact_ns:13.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: LinkedList con referencia a la cola vs. la versión original
+que recorría la lista completa en cada append.
+
+Uso: python bench_linked_list.py [max_exponente]
+"""
+
+import sys
+import time
+
+from data_structures import LinkedList
+
+class LegacyNode:
+    """Nodo original (sin __slots__)"""
+    def __init__(self, data):
+        self.data = data
+        self.next = None
+
+class LegacyLinkedList:
+    """Lista enlazada original: append O(n), remoción por índice"""
+
+    def __init__(self):
+        self.head = None
+        self.size = 0
+
+    def append(self, data):
+        new_node = LegacyNode(data)
+        if self.head is None:
+            self.head = new_node
+        else:
+            current = self.head
+            while current.next:
+                current = current.next
+            current.next = new_node
+        self.size += 1
+
+    def index_of(self, data):
+        current = self.head
+        index = 0
+        while current:
+            if current.data == data:
+                return index
+            current = current.next
+            index += 1
+        return -1
+
+    def remove_at(self, index):
+        if index == 0:
+            data = self.head.data
+            self.head = self.head.next
+            self.size -= 1
+            return data
+        current = self.head
+        for i in range(index - 1):
+            current = current.next
+        data = current.next.data
+        current.next = current.next.next
+        self.size -= 1
+        return data
+
+# La versión original es O(n²) en append; por encima de este tamaño se omite
+LEGACY_LIMIT = 10 ** 4
+
+def _time(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def bench_legacy(n):
+    ll = LegacyLinkedList()
+    append_time = _time(lambda: [ll.append(i) for i in range(n)])
+    # Remover el elemento del medio: index_of + remove_at (doble recorrido)
+    remove_time = _time(lambda: ll.remove_at(ll.index_of(n // 2)))
+    return append_time, remove_time
+
+def bench_new(n):
+    ll = LinkedList(doubly=True)
+    nodes = []
+    append_time = _time(lambda: nodes.extend(ll.append(i) for i in range(n)))
+    # Remover un nodo conocido en O(1)
+    remove_time = _time(lambda: ll.remove_node(nodes[n // 2]))
+    return append_time, remove_time
+
+def main():
+    max_exp = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+
+    print(f"{'n':>10} | {'append orig':>12} | {'append nueva':>12} | {'remove orig':>12} | {'remove nueva':>12}")
+    print("-" * 72)
+    for exp in range(3, max_exp + 1):
+        n = 10 ** exp
+        new_append, new_remove = bench_new(n)
+        if n <= LEGACY_LIMIT:
+            old_append, old_remove = bench_legacy(n)
+            old_append_str = f"{old_append:11.4f}s"
+            old_remove_str = f"{old_remove * 1e6:10.1f}us"
+        else:
+            old_append_str = old_remove_str = "omitido".rjust(12)
+        print(f"{n:>10} | {old_append_str} | {new_append:11.4f}s | {old_remove_str} | {new_remove * 1e6:10.1f}us")
+
+if __name__ == "__main__":
+    main()
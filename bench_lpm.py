@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de longest prefix match: 33 búsquedas en el AVL (de /32 a /0, el
+enfoque anterior de Device.find_route) frente a un recorrido del trie
+Patricia, a la tabla compilada DIR-24-8 y a la búsqueda por lotes sobre la
+tabla de intervalos (vectorizada si NumPy está instalado), sobre tablas de
+prefijos aleatorios.
+Al final compara Patricia y el trie multibit (stride 4 y 8) con prefijos IPv6.
+
+Uso: python bench_lpm.py [max_exponente] [n_búsquedas]
+"""
+
+import random
+import sys
+import time
+
+from data_structures import AVLTree, Dir248Table, IntervalTable, MultibitTrie, PatriciaTrie
+from data_structures.interval_table import np
+from network.addressing import PREFIX_MASKS, make_route_key
+
+# Longitudes de prefijo ponderadas de forma parecida a una tabla real (mayoría /24)
+PREFIX_LENGTHS = [8] + [16] * 4 + list(range(17, 24)) * 2 + [24] * 40 + [32] * 3
+
+def random_prefixes(n):
+    """Genera n prefijos (red, longitud) distintos"""
+    prefixes = set()
+    while len(prefixes) < n:
+        length = random.choice(PREFIX_LENGTHS)
+        prefixes.add((random.getrandbits(32) & PREFIX_MASKS[length], length))
+    return list(prefixes)
+
+def lookup_addresses(prefixes, count):
+    """Mitad de direcciones dentro de prefijos conocidos y mitad aleatorias"""
+    addresses = []
+    for i in range(count):
+        if i % 2:
+            network, length = random.choice(prefixes)
+            addresses.append(network | (random.getrandbits(32) & ~PREFIX_MASKS[length] & 0xFFFFFFFF))
+        else:
+            addresses.append(random.getrandbits(32))
+    return addresses
+
+def avl_lookup(tree, address):
+    """LPM probando las 33 longitudes de prefijo en el AVL"""
+    search = tree.search_key
+    for length in range(32, -1, -1):
+        node = search(make_route_key(address & PREFIX_MASKS[length], length))
+        if node is not None:
+            return node.value
+    return None
+
+def bench_ipv6(n, lookups):
+    """Patricia frente a multibit con n prefijos IPv6 bajo unos pocos /32"""
+    sites = [(0x2001 << 112) | (random.getrandbits(16) << 96) for _ in range(8)]
+    prefixes = set()
+    while len(prefixes) < n:
+        length = random.choice([32, 40, 44, 48, 48, 48, 56, 64])
+        network = random.choice(sites) | (random.getrandbits(96) & ~((1 << (128 - length)) - 1) & ((1 << 96) - 1))
+        prefixes.add((network, length))
+    prefixes = list(prefixes)
+    addresses = [network | random.getrandbits(128 - length) for network, length in
+                 (random.choice(prefixes) for _ in range(lookups))]
+
+    engines = [("Patricia", PatriciaTrie(128)), ("multibit s=4", MultibitTrie(128, 4)),
+               ("multibit s=8", MultibitTrie(128, 8))]
+    print(f"\nIPv6, {n} prefijos")
+    print(f"{'motor':>14} | {'búsqueda':>9} | {'nodos':>8}")
+    print("-" * 38)
+    expected = None
+    for name, trie in engines:
+        for network, length in prefixes:
+            trie.insert(network, length, (network, length))
+        longest_match = trie.longest_match
+        start = time.perf_counter()
+        results = [longest_match(address) for address in addresses]
+        elapsed_ns = (time.perf_counter() - start) / lookups * 1e9
+        if expected is None:
+            expected = results
+        assert results == expected
+        print(f"{name:>14} | {elapsed_ns:6.0f} ns | {trie.node_count:>8}")
+
+def main():
+    max_exp = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    random.seed(42)
+
+    print(f"Lotes con {'NumPy' if np is not None else 'bisect (NumPy no instalado)'}")
+    print(f"{'prefijos':>10} | {'AVL 33 sondeos':>15} | {'Patricia':>10} | {'DIR-24-8':>10} | "
+          f"{'lote':>8} | {'nodos trie':>10} | {'compilar':>9}")
+    print("-" * 92)
+    for exp in range(4, max_exp + 1):
+        n = 10 ** exp
+        prefixes = random_prefixes(n)
+
+        tree = AVLTree.from_sorted(sorted((make_route_key(network, length), (network, length))
+                                          for network, length in prefixes))
+        trie = PatriciaTrie(32)
+        for network, length in prefixes:
+            trie.insert(network, length, (network, length))
+
+        addresses = lookup_addresses(prefixes, lookups)
+
+        start = time.perf_counter()
+        avl_results = [avl_lookup(tree, address) for address in addresses]
+        avl_ns = (time.perf_counter() - start) / lookups * 1e9
+
+        longest_match = trie.longest_match
+        start = time.perf_counter()
+        trie_results = [longest_match(address) for address in addresses]
+        trie_ns = (time.perf_counter() - start) / lookups * 1e9
+
+        table = Dir248Table(trie.items())
+        table_match = table.longest_match
+        start = time.perf_counter()
+        table_results = [table_match(address) for address in addresses]
+        table_ns = (time.perf_counter() - start) / lookups * 1e9
+
+        intervals = IntervalTable(trie.items())
+        start = time.perf_counter()
+        batch_ids = intervals.lookup_many(addresses)
+        batch_ns = (time.perf_counter() - start) / lookups * 1e9
+
+        assert avl_results == [match[2] if match else None for match in trie_results]
+        assert table_results == trie_results
+        assert [intervals.values[i] if i >= 0 else None for i in batch_ids] == avl_results
+        print(f"{n:>10} | {avl_ns:12.0f} ns | {trie_ns:7.0f} ns | {table_ns:7.0f} ns | "
+              f"{batch_ns:5.0f} ns | {trie.node_count:>10} | {table.last_build_seconds:8.2f}s")
+
+    bench_ipv6(10 ** 4, lookups)
+
+if __name__ == "__main__":
+    main()
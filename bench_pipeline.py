@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de reenvío: paquetes por segundo de process_queues y
+costo por etapa al variar cuántos destinos únicos tiene cada lote.
+
+Uso: python bench_pipeline.py [paquetes_por_lote]
+"""
+
+import random
+import sys
+import time
+
+from network import Device, Packet
+
+BATCHES = 20
+UNIQUE_DESTINATIONS = [1, 16, 256, 4096]
+
+def build_router():
+    """Router con 2000 rutas /24, una /8 y algunas políticas"""
+    router = Device("R1", "router")
+    router.add_interface("g0/0")
+    iface = router.get_interface("g0/0")
+    iface.set_status("up")
+    iface.connect_to("R2", "g0/0")
+    random.seed(11)
+    routes = [(f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.0", "255.255.255.0", "192.168.1.2", 1)
+              for _ in range(2000)]
+    routes.append(("10.0.0.0", "255.0.0.0", "192.168.1.2", 1))
+    router.add_routes(routes)
+    router.set_policy("10.200.0.0", "255.255.0.0", "block", True)
+    router.set_policy("10.100.0.0", "255.255.0.0", "ttl-min", 10)
+    return router, iface
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"lotes de {batch_size} paquetes")
+    for unique in UNIQUE_DESTINATIONS:
+        router, iface = build_router()
+        destinations = [f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.1" for _ in range(unique)]
+        elapsed = 0.0
+        for _ in range(BATCHES):
+            for i in range(batch_size):
+                iface.output_queue.enqueue(Packet("192.168.1.1", destinations[i % unique], "x", 64))
+            start = time.perf_counter()
+            router.process_queues()
+            elapsed += time.perf_counter() - start
+
+        stages = " ".join(f"{name}={stats['seconds'] * 1e6 / stats['packets']:.2f}"
+                          for name, stats in router.pipeline.get_profile() if stats["packets"])
+        print(f"{unique:>5} destinos: {BATCHES * batch_size / elapsed:>10.0f} paquetes/s | us/paquete: {stages}")
+
+if __name__ == "__main__":
+    main()
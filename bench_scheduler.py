@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark del avance de la simulación: recorrer todos los dispositivos en cada
+paso (enfoque anterior de Network.tick) frente al planificador de eventos,
+que solo toca las colas con paquetes.
+
+Uso: python bench_scheduler.py [n_dispositivos] [dispositivos_activos]
+"""
+
+import sys
+import tempfile
+import time
+
+from network import Network
+
+STEPS = 200
+PACKETS_PER_STEP = 10  # Paquetes por dispositivo activo en cada paso
+
+def build_network(directory, n_devices, active):
+    """Red de routers donde solo los `active` primeros tienen tráfico"""
+    network = Network(snapshot_dir=directory)
+    for i in range(n_devices):
+        network.add_device(f"R{i}", "router")
+    for i in range(active):
+        router = network.get_device(f"R{i}")
+        router.configure_interface("g0/0", f"10.{i // 256}.{i % 256}.1", "255.255.255.0")
+        router.add_route("172.16.0.0", "255.255.0.0", f"10.{i // 256}.{i % 256}.2")
+    return network
+
+def full_scan_tick(network):
+    """Paso de simulación que procesa las colas de todos los dispositivos"""
+    for device in network.devices.values():
+        device.process_queues()
+
+def run(network, active, step):
+    """Encola tráfico y ejecuta STEPS pasos; retorna microsegundos por paso"""
+    sources = [f"10.{i // 256}.{i % 256}.1" for i in range(active)]
+    elapsed = 0.0
+    for _ in range(STEPS):
+        for source in sources:
+            for _ in range(PACKETS_PER_STEP):
+                network.send_packet(source, "172.16.1.1", "x", 64)
+        start = time.perf_counter()
+        step(network)
+        elapsed += time.perf_counter() - start
+    return elapsed / STEPS * 1e6
+
+def main():
+    n_devices = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    active = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as directory:
+        network = build_network(directory, n_devices, active)
+        print(f"{n_devices} dispositivos, {active} activos, {active * PACKETS_PER_STEP} paquetes por paso")
+        scan = run(network, active, full_scan_tick)
+        # Los eventos programados por el recorrido anterior ya no tienen paquetes
+        network.scheduler.clear()
+        events = run(network, active, Network.tick)
+        print(f"recorrido completo : {scan:>10.1f} us/paso")
+        print(f"eventos            : {events:>10.1f} us/paso  ({scan / events:.0f}x)")
+        network.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria del Trie de políticas: bytes por prefijo (medidos con
+tracemalloc) y tiempo de búsqueda para cada motor IPv4 con n políticas
+aleatorias /16../28 que comparten unos pocos tipos de política.
+
+Uso: python bench_trie_memory.py [n_políticas] [n_búsquedas]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from data_structures import Trie
+from network.addressing import PREFIX_MASKS, int_to_ip, prefix_length_to_mask
+
+ENGINES = [("patricia", {}), ("compact", {}), ("multibit", {"stride": 4}), ("multibit", {"stride": 8})]
+
+def random_policies(n):
+    """Genera n políticas (prefijo, máscara, política) con prefijos distintos"""
+    seen = set()
+    policies = []
+    while len(policies) < n:
+        length = random.randint(16, 28)
+        network = random.getrandbits(32) & PREFIX_MASKS[length]
+        if (network, length) in seen:
+            continue
+        seen.add((network, length))
+        policy = {"block": True} if random.random() < 0.5 else {"ttl-min": random.choice([5, 10, 32, 64])}
+        policies.append((int_to_ip(network), prefix_length_to_mask(length), policy))
+    return policies
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    random.seed(7)
+    # Cada inserción recibe un dict nuevo, como Device.set_policy
+    policies = random_policies(n)
+    addresses = [int_to_ip(random.getrandbits(32)) for _ in range(lookups)]
+
+    print(f"{n} políticas")
+    print(f"{'motor':>12} | {'bytes/prefijo':>13} | {'nodos':>8} | {'búsqueda':>9}")
+    print("-" * 52)
+    expected = None
+    for engine, options in ENGINES:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        trie = Trie(engine=engine, **options)
+        for prefix, mask, policy in policies:
+            trie.insert(prefix, mask, dict(policy))
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        search = trie.search_longest_prefix
+        start = time.perf_counter()
+        results = [search(address) for address in addresses]
+        lookup_ns = (time.perf_counter() - start) / lookups * 1e9
+        if expected is None:
+            expected = results
+        assert results == expected
+
+        name = engine if not options else f"{engine} s={options['stride']}"
+        print(f"{name:>12} | {used / n:13.1f} | {trie.nodes_count:>8} | {lookup_ns:6.0f} ns")
+        del trie
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,11 @@ Interfaz de línea de comandos para el simulador de red
 Implementa diferentes modos y parsing de comandos
 """
 
+from datetime import datetime
+from itertools import islice
+
+from network.addressing import format_route_key
+
 class CLIParser:
     """Parser de comandos CLI con modos múltiples"""
 
@@ -13,6 +18,9 @@ class CLIParser:
         "INTERFACE": "(config-if)#"
     }
 
+    # A partir de este número de rutas, show ip route imprime mientras recorre
+    ROUTE_STREAM_THRESHOLD = 1000
+
     def __init__(self, network, error_logger):
         self.network = network
         self.error_logger = error_logger
@@ -127,6 +135,8 @@ class CLIParser:
             return self._handle_tick()
         elif cmd == "process":
             return self._handle_tick()  # alias
+        elif cmd == "run":
+            return self._handle_run(parts)
         elif cmd == "save":
             return self._handle_save(parts)
         elif cmd == "load":
@@ -362,13 +372,24 @@ class CLIParser:
 
     def _handle_tick(self):
         """Avanza un paso de simulación"""
-        self.network.tick()
-        return "[Tick] Procesamiento completado"
+        processed = self.network.tick()
+        return f"[Tick] Procesamiento completado (t={self.network.clock}, paquetes={processed})"
+
+    def _handle_run(self, parts):
+        """Avanza el reloj por eventos: run until <t> | run idle"""
+        if len(parts) == 2 and parts[1].lower() == "idle":
+            processed = self.network.run_until_idle()
+        elif len(parts) == 3 and parts[1].lower() == "until" and parts[2].isdigit():
+            processed = self.network.run_until(int(parts[2]))
+        else:
+            return "Sintaxis: run until <tiempo> | run idle"
+        return (f"[Run] t={self.network.clock} paquetes={processed} "
+                f"eventos pendientes={len(self.network.scheduler)}")
 
     def _handle_show_user(self, parts):
         """Maneja comandos show en modo usuario"""
         if len(parts) < 2:
-            return "Comandos show disponibles: history, queue, statistics, error-log, ip route, ip prefix-tree, route avl-stats, snapshots, btree stats"
+            return "Comandos show disponibles: history, queue, statistics, error-log, ip route, ip fib, ip prefix-tree, route avl-stats, snapshots, btree stats, scheduler, throughput, pipeline"
 
         subcmd = parts[1].lower()
 
@@ -381,6 +402,8 @@ class CLIParser:
         elif subcmd == "statistics":
             return self._show_statistics()
         elif subcmd == "error-log":
+            if len(parts) > 2 and parts[2].lower() in ["since", "until"]:
+                return self._show_error_log_range(parts)
             limit = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else None
             return self._show_error_log(limit)
         elif subcmd == "ip" and len(parts) > 2:
@@ -391,12 +414,21 @@ class CLIParser:
                     return self._handle_show_ip_route(parts)
             elif parts[2] == "prefix-tree":
                 return self._handle_show_ip_prefix_tree(parts)
+            elif parts[2] == "fib":
+                return self._handle_show_ip_fib(parts)
         elif subcmd == "route" and len(parts) > 2 and parts[2] == "avl-stats":
             return self._handle_show_route_avl_stats(parts)
         elif subcmd == "snapshots":
-            return self._handle_show_snapshots()
+            return self._handle_show_snapshots(parts)
         elif subcmd == "btree" and len(parts) > 2 and parts[2] == "stats":
             return self._handle_show_btree_stats()
+        elif subcmd == "scheduler":
+            return self._handle_show_scheduler()
+        elif subcmd == "pipeline":
+            return self._handle_show_pipeline()
+        elif subcmd == "throughput":
+            limit = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 10
+            return self._handle_show_throughput(limit)
         else:
             return f"Comando show '{subcmd}' no reconocido"
 
@@ -461,7 +493,9 @@ class CLIParser:
         result += f"Packets dropped: {stats['total_packets_dropped']}\n"
         result += f"Average hops: {stats['average_hops']:.1f}\n"
         result += f"Top talker: {stats['top_talker'] or 'None'}\n"
-        result += f"Devices online: {stats['devices_online']}/{stats['total_devices']}"
+        result += f"Devices online: {stats['devices_online']}/{stats['total_devices']}\n"
+        cache = stats["decision_cache"]
+        result += f"Decision cache: hits={cache['hits']} misses={cache['misses']} evictions={cache['evictions']}"
 
         return result
 
@@ -472,11 +506,50 @@ class CLIParser:
         if not errors:
             return "No hay errores registrados"
 
-        result = "Registro de errores:\n"
-        for error in errors:
-            result += f"  {error}\n"
+        lines = ["Registro de errores:"]
+        lines.extend(f"  {error}" for error in errors)
+        return "\n".join(lines)
 
-        return result.strip()
+    def _parse_time(self, text):
+        """Convierte una marca de tiempo de la CLI a ns desde epoch"""
+        if text.isdigit():
+            return int(text) * 1_000_000_000
+
+        now = datetime.now()
+        for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d", "%H:%M:%S", "%H:%M"):
+            try:
+                moment = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            if not fmt.startswith("%Y"):
+                # Solo hora: se interpreta como hoy
+                moment = moment.replace(year=now.year, month=now.month, day=now.day)
+            return int(moment.timestamp() * 1_000_000_000)
+        return None
+
+    def _show_error_log_range(self, parts):
+        """Muestra errores entre dos instantes: show error-log since <t> [until <t>]"""
+        syntax = "Sintaxis: show error-log since <tiempo> [until <tiempo>]"
+        bounds = {"since": None, "until": None}
+        i = 2
+        while i < len(parts):
+            keyword = parts[i].lower()
+            if keyword not in bounds or i + 1 >= len(parts):
+                return syntax
+            value = self._parse_time(parts[i + 1])
+            if value is None:
+                self.error_logger.log_error("SyntaxError", "ERROR", f"Tiempo inválido '{parts[i + 1]}'", "show error-log")
+                return f"Error: Tiempo inválido '{parts[i + 1]}' (use AAAA-MM-DDTHH:MM:SS, HH:MM:SS o epoch)"
+            bounds[keyword] = value
+            i += 2
+
+        errors = self.error_logger.get_errors_between(bounds["since"], bounds["until"])
+        if not errors:
+            return "No hay errores registrados en ese intervalo"
+
+        lines = ["Registro de errores:"]
+        lines.extend(f"  {error}" for error in errors)
+        return "\n".join(lines)
 
     def _handle_save(self, parts):
         """Guarda configuración"""
@@ -534,7 +607,10 @@ class CLIParser:
                 if not self.current_device:
                     return "Error: No hay dispositivo actual"
 
-                self.current_device.add_route(prefix, mask, next_hop, metric)
+                try:
+                    self.current_device.add_route(prefix, mask, next_hop, metric)
+                except ValueError as e:
+                    return f"Error: {e}"
                 return "Ruta agregada"
             elif parts[2] == "del":
                 prefix = parts[3]
@@ -543,15 +619,38 @@ class CLIParser:
                 if not self.current_device:
                     return "Error: No hay dispositivo actual"
 
-                self.current_device.remove_route(prefix, mask)
+                try:
+                    self.current_device.remove_route(prefix, mask)
+                except ValueError as e:
+                    return f"Error: {e}"
                 return "Ruta removida"
             else:
                 return "Comando ip route no reconocido"
+        elif parts[1] == "fib":
+            return self._handle_ip_fib(parts)
         else:
             return "Comando ip no reconocido"
 
+    def _handle_ip_fib(self, parts):
+        """Activa o desactiva la FIB compilada DIR-24-8"""
+        if len(parts) < 4 or parts[2] != "compiled" or parts[3] not in ["on", "off"]:
+            return "Sintaxis: ip fib compiled on|off"
+
+        if not self.current_device:
+            return "Error: No hay dispositivo actual"
+
+        self.current_device.enable_compiled_fib(parts[3] == "on")
+        return f"FIB compilada {'activada' if parts[3] == 'on' else 'desactivada'}"
+
     def _handle_policy(self, parts):
         """Maneja comandos de políticas"""
+        if len(parts) == 2 and parts[1] == "compact":
+            if not self.current_device:
+                return "Error: No hay dispositivo actual"
+            reclaimed = self.current_device.policy_trie.compact()
+            stats = self.current_device.policy_trie.get_stats()
+            return f"Trie compactado: {reclaimed} nodos liberados (prefixes={stats['prefixes']} nodes={stats['nodes']})"
+
         if len(parts) < 4:
             return "Sintaxis: policy set <prefix> <mask> ttl-min <N> | policy set <prefix> <mask> block | policy unset <prefix> <mask>"
 
@@ -611,17 +710,54 @@ class CLIParser:
         if not self.current_device:
             return "Error: No hay dispositivo actual"
 
-        routes = self.current_device.get_routing_table()
-
-        if not routes:
+        device = self.current_device
+        if device.route_count() == 0:
             return "No hay rutas configuradas\nDefault: none"
 
-        result = ""
-        for route_key, route_value in routes:
-            result += f"{route_key}  via {route_value['next_hop']}  metric {route_value['metric']}\n"
+        lines = (f"{route_key}  via {route_value['next_hop']}  metric {route_value['metric']}"
+                 for route_key, route_value in device.iter_routes())
 
-        result += "Default: none"
-        return result
+        # Tablas grandes: imprimir a medida que se recorre el árbol
+        if device.route_count() > self.ROUTE_STREAM_THRESHOLD:
+            for line in lines:
+                print(line)
+            return "Default: none"
+
+        return "\n".join(lines) + "\nDefault: none"
+
+    def _handle_show_ip_fib(self, parts):
+        """Muestra el estado de la FIB (trie Patricia y tabla compilada)"""
+        if not self.current_device:
+            return "Error: No hay dispositivo actual"
+
+        stats = self.current_device.get_fib_stats()
+        trie = stats["trie"]
+        trie6 = stats["trie6"]
+        lines = [f"FIB trie: prefixes={trie['prefixes']} nodes={trie['nodes']}",
+                 f"FIB IPv6 (multibit, stride {trie6['stride']}): prefixes={trie6['prefixes']} nodes={trie6['nodes']}"]
+
+        compiled = stats["compiled"]
+        if compiled is None:
+            lines.append("FIB compilada (DIR-24-8): desactivada")
+        else:
+            lines.append(f"FIB compilada (DIR-24-8): routes={compiled['routes']} "
+                         f"{'(pendiente de recompilar)' if compiled['stale'] else ''}".rstrip())
+            lines.append(f"  tbl24: {compiled['tbl24_entries']} entradas, {compiled['tbl24_bytes'] / 1048576:.1f} MB")
+            lines.append(f"  tbl8: {compiled['tbl8_groups']} grupos, {compiled['tbl8_bytes'] / 1048576:.1f} MB")
+            lines.append(f"  total: {compiled['total_bytes'] / 1048576:.1f} MB, "
+                         f"builds={compiled['builds']} última={compiled['last_build_ms']:.1f} ms")
+        return "\n".join(lines)
+
+    def _handle_show_pipeline(self):
+        """Muestra el perfil por etapa del pipeline de reenvío del dispositivo actual"""
+        if not self.current_device:
+            return "Error: No hay dispositivo actual"
+
+        lines = [f"{'etapa':<10} {'lotes':>7} {'paquetes':>9} {'descartes':>9} {'us/paquete':>10}"]
+        for name, stats in self.current_device.pipeline.get_profile():
+            per_packet = stats["seconds"] * 1e6 / stats["packets"] if stats["packets"] else 0.0
+            lines.append(f"{name:<10} {stats['calls']:>7} {stats['packets']:>9} {stats['dropped']:>9} {per_packet:>10.2f}")
+        return "\n".join(lines)
 
     def _handle_show_route_avl_stats(self, parts):
         """Muestra estadísticas del árbol AVL de rutas"""
@@ -641,14 +777,12 @@ class CLIParser:
         if not self.current_device:
             return "Error: No hay dispositivo actual"
 
-        routes = self.current_device.get_routing_table()
-
-        if not routes:
+        if len(self.current_device.routing_table) == 0:
             return "Árbol vacío"
 
         # Mostrar el árbol usando el método print_tree del AVL
         print("\n=== ÁRBOL AVL DE RUTAS ===")
-        self.current_device.routing_table.print_tree()
+        self.current_device.routing_table.print_tree(format_key=format_route_key)
         print("=" * 30)
 
         return ""
@@ -670,18 +804,48 @@ class CLIParser:
 
         return ""
 
-    def _handle_show_snapshots(self):
-        """Muestra todos los snapshots disponibles"""
-        snapshots = self.network.get_snapshots()
-
-        if not snapshots:
+    def _handle_show_snapshots(self, parts):
+        """Muestra snapshots: show snapshots [from <k>] [to <k>] [prefix <p>] [limit <n>]"""
+        syntax = "Sintaxis: show snapshots [from <clave>] [to <clave>] [prefix <p>] [limit <n>]"
+        options = {"from": None, "to": None, "prefix": None, "limit": None}
+        i = 2
+        while i < len(parts):
+            keyword = parts[i].lower()
+            if keyword not in options or i + 1 >= len(parts):
+                return syntax
+            options[keyword] = parts[i + 1]
+            i += 2
+        if options["limit"] is not None and not options["limit"].isdigit():
+            return syntax
+
+        # El índice se recorre de forma perezosa: solo se leen las hojas que se muestran
+        snapshots = self.network.iter_snapshots(options["from"], options["to"], options["prefix"])
+        if options["limit"] is not None:
+            snapshots = islice(snapshots, int(options["limit"]))
+
+        lines = ["Snapshots disponibles:"]
+        lines.extend(f"  {key} -> {filename}" for key, filename in snapshots)
+        if len(lines) == 1:
             return "No hay snapshots guardados"
-
-        result = "Snapshots disponibles:\n"
-        for key, filename in snapshots:
-            result += f"  {key} -> {filename}\n"
-
-        return result.strip()
+        return "\n".join(lines)
+
+    def _handle_show_scheduler(self):
+        """Muestra el reloj y el estado del planificador de eventos"""
+        stats = self.network.scheduler.get_stats()
+        next_time = stats["next_time"] if stats["next_time"] is not None else "-"
+        return (f"clock={self.network.clock} pending={stats['pending']} next={next_time} "
+                f"scheduled={stats['scheduled']} coalesced={stats['coalesced']} processed={stats['processed']}")
+
+    def _handle_show_throughput(self, limit):
+        """Muestra paquetes procesados, entregados y descartados en los últimos instantes con actividad"""
+        records = self.network.get_throughput(limit)
+        if not records:
+            return "Sin actividad registrada"
+
+        lines = [f"{'t':>6} {'procesados':>10} {'entregados':>10} {'descartados':>11}"]
+        for record in records:
+            lines.append(f"{record['time']:>6} {record['processed']:>10} {record['delivered']:>10} {record['dropped']:>11}")
+        return "\n".join(lines)
 
     def _handle_show_btree_stats(self):
         """Muestra estadísticas del B-tree de snapshots"""
@@ -689,6 +853,11 @@ class CLIParser:
 
         result = f"order={stats['order']} height={stats['height']} "
         result += f"nodes={stats['nodes']} splits={stats['splits']} merges={stats['merges']}"
+        if "pages" in stats:
+            cache = stats["cache"]
+            result += f"\nkeys={stats['keys']} pages={stats['pages']} free={stats['free_pages']} "
+            result += f"page_size={stats['page_size']} reads={stats['page_reads']} writes={stats['page_writes']} "
+            result += f"cache_hits={cache['hits']} cache_misses={cache['misses']}"
 
         return result
 
@@ -709,11 +878,18 @@ Comandos disponibles en modo Usuario:
   show queue [device]      - Muestra colas de dispositivos
   show statistics          - Muestra estadísticas de red
   show error-log [n]       - Muestra registro de errores
+  show error-log since <t> [until <t>] - Errores en un intervalo
   show ip route            - Muestra tabla de rutas
+  show ip fib              - Muestra estado y memoria de la FIB
   show ip prefix-tree      - Muestra trie de prefijos IP
   show route avl-stats     - Muestra estadísticas del AVL
   show snapshots           - Muestra snapshots guardados
+  show snapshots from <k> to <k> - Snapshots en un rango de claves
+  show snapshots limit <n> - Primeros n snapshots (también prefix <p>)
   show btree stats         - Muestra estadísticas del B-tree
+  show scheduler           - Muestra reloj y eventos pendientes
+  show throughput [n]      - Entregados/descartados por instante
+  show pipeline            - Perfil por etapa del reenvío
   help                     - Muestra esta ayuda
   exit                     - Sale del simulador
         """
@@ -731,6 +907,8 @@ Comandos disponibles en modo Privilegiado:
   set_device_status <d> <s>- Cambia estado de dispositivo
   tick                     - Avanza simulación
   process                  - Alias para tick
+  run until <t>            - Procesa eventos hasta el tiempo t
+  run idle                 - Procesa eventos hasta vaciar las colas
   save running-config      - Guarda configuración
   save snapshot <key>      - Guarda snapshot nombrado
   load config <key>        - Carga configuración por clave
@@ -747,9 +925,11 @@ Comandos disponibles en modo Configuración:
   interface <name>         - Configura interfaz
   ip route add ...         - Agrega ruta
   ip route del ...         - Elimina ruta
+  ip fib compiled on|off   - Activa/desactiva la FIB DIR-24-8
   policy set <p> <m> ttl-min <N> - Establece límite TTL
   policy set <p> <m> block      - Bloquea prefijo
   policy unset <p> <m>          - Remueve política
+  policy compact                - Poda y re-empaqueta el trie de políticas
   exit                     - Vuelve a modo privilegiado
   end                      - Vuelve a modo privilegiado
         """
@@ -5,16 +5,34 @@ Implementaciones desde cero para el simulador de red
 
 from .linked_list import LinkedList
 from .queue import Queue
+from .ring_buffer import RingBuffer
 from .stack import Stack
+from .min_heap import MinHeap
 from .avl_tree import AVLTree
 from .b_tree import BTree
+from .disk_btree import DiskBTree
 from .trie import Trie
+from .patricia_trie import PatriciaTrie
+from .multibit_trie import MultibitTrie
+from .compact_trie import CompactTrie
+from .dir24_8 import Dir248Table
+from .interval_table import IntervalTable
+from .lru_cache import LRUCache
 
 __all__ = [
     'LinkedList',
     'Queue',
+    'RingBuffer',
     'Stack',
+    'MinHeap',
     'AVLTree',
     'BTree',
-    'Trie'
+    'DiskBTree',
+    'Trie',
+    'PatriciaTrie',
+    'MultibitTrie',
+    'CompactTrie',
+    'Dir248Table',
+    'IntervalTable',
+    'LRUCache'
 ]
@@ -0,0 +1,64 @@
+"""
+Conversión de direcciones y máscaras IP: notación punteada IPv4 y
+direcciones IPv6 a enteros (32 y 128 bits) y máscaras a longitudes de
+prefijo. La comparten el Trie de políticas y la tabla de rutas de Device,
+así ambos interpretan direcciones y máscaras igual.
+"""
+
+import ipaddress
+
+# PREFIX_MASKS[n] = máscara de red de n bits como entero
+PREFIX_MASKS = tuple((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF for length in range(33))
+
+def ip_to_int(ip):
+    """Convierte 'a.b.c.d' a entero de 32 bits"""
+    parts = ip.split('.')
+    if len(parts) != 4:
+        raise ValueError(f"Dirección IP inválida: {ip}")
+    value = 0
+    for part in parts:
+        octet = int(part)
+        if octet < 0 or octet > 255:
+            raise ValueError(f"Dirección IP inválida: {ip}")
+        value = (value << 8) | octet
+    return value
+
+def int_to_ip(value):
+    """Convierte un entero de 32 bits a 'a.b.c.d'"""
+    return f"{value >> 24 & 0xFF}.{value >> 16 & 0xFF}.{value >> 8 & 0xFF}.{value & 0xFF}"
+
+def mask_to_prefix_length(mask):
+    """Convierte una máscara 'a.b.c.d' a longitud de prefijo"""
+    return bin(ip_to_int(mask)).count("1")
+
+def prefix_length_to_mask(length):
+    """Convierte una longitud de prefijo a máscara 'a.b.c.d'"""
+    return int_to_ip(PREFIX_MASKS[length])
+
+def is_ipv6(ip):
+    """Indica si la dirección está en notación IPv6"""
+    return ':' in ip
+
+def ipv6_to_int(ip):
+    """Convierte una dirección IPv6 a entero de 128 bits"""
+    try:
+        return int(ipaddress.IPv6Address(ip))
+    except ipaddress.AddressValueError:
+        raise ValueError(f"Dirección IPv6 inválida: {ip}") from None
+
+def int_to_ipv6(value):
+    """Convierte un entero de 128 bits a notación IPv6 abreviada"""
+    return str(ipaddress.IPv6Address(value))
+
+def parse_prefix_length(mask, width=32):
+    """Convierte una máscara ('255.255.0.0', '16' o '/16') a longitud de prefijo"""
+    text = str(mask).lstrip('/')
+    if text.isdigit():
+        length = int(text)
+    elif width == 32:
+        return mask_to_prefix_length(text)
+    else:
+        raise ValueError(f"Máscara inválida para IPv6: {mask}")
+    if length > width:
+        raise ValueError(f"Longitud de prefijo inválida: {mask}")
+    return length
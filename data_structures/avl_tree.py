@@ -1,9 +1,15 @@
 """
 Implementación de Árbol AVL desde cero para tabla de rutas
+
+Inserción, eliminación, búsqueda y recorrido son iterativos: se registra el
+camino desde la raíz en una lista y se rebalancea de abajo hacia arriba,
+calculando las alturas en línea en lugar de llamar a métodos auxiliares.
 """
 
 class AVLNode:
     """Nodo del árbol AVL"""
+    __slots__ = ("key", "value", "left", "right", "height")
+
     def __init__(self, key, value=None):
         self.key = key
         self.value = value
@@ -44,8 +50,11 @@ class AVLTree:
         x.right = y
         y.left = T2
 
-        self.update_height(y)
-        self.update_height(x)
+        left_height = T2.height if T2 else 0
+        right_height = y.right.height if y.right else 0
+        y.height = 1 + (left_height if left_height > right_height else right_height)
+        left_height = x.left.height if x.left else 0
+        x.height = 1 + (left_height if left_height > y.height else y.height)
 
         self.rotations["LL"] += 1
         return x
@@ -58,8 +67,11 @@ class AVLTree:
         y.left = x
         x.right = T2
 
-        self.update_height(x)
-        self.update_height(y)
+        left_height = x.left.height if x.left else 0
+        right_height = T2.height if T2 else 0
+        x.height = 1 + (left_height if left_height > right_height else right_height)
+        right_height = y.right.height if y.right else 0
+        y.height = 1 + (right_height if right_height > x.height else x.height)
 
         self.rotations["RR"] += 1
         return y
@@ -78,48 +90,101 @@ class AVLTree:
         self.rotations["RL"] += 1
         return result
 
+    def _rotate(self, node, balance):
+        """Aplica la rotación que corresponde a un nodo desbalanceado"""
+        if balance > 1:
+            child = node.left
+            left_height = child.left.height if child.left else 0
+            right_height = child.right.height if child.right else 0
+            # Caso LL / Caso LR
+            if left_height >= right_height:
+                return self.rotate_right(node)
+            return self.rotate_left_right(node)
+
+        child = node.right
+        left_height = child.left.height if child.left else 0
+        right_height = child.right.height if child.right else 0
+        # Caso RR / Caso RL
+        if right_height >= left_height:
+            return self.rotate_left(node)
+        return self.rotate_right_left(node)
+
     def balance(self, node):
         """Balancea el árbol después de inserción/eliminación"""
         if not node:
             return node
 
-        self.update_height(node)
-        balance = self.get_balance(node)
-
-        # Caso LL
-        if balance > 1 and self.get_balance(node.left) >= 0:
-            return self.rotate_right(node)
-
-        # Caso LR
-        if balance > 1 and self.get_balance(node.left) < 0:
-            return self.rotate_left_right(node)
-
-        # Caso RR
-        if balance < -1 and self.get_balance(node.right) <= 0:
-            return self.rotate_left(node)
-
-        # Caso RL
-        if balance < -1 and self.get_balance(node.right) > 0:
-            return self.rotate_right_left(node)
+        left_height = node.left.height if node.left else 0
+        right_height = node.right.height if node.right else 0
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        balance = left_height - right_height
 
+        if balance > 1 or balance < -1:
+            return self._rotate(node, balance)
         return node
 
+    def _rebalance_path(self, root, path, after_insert):
+        """Rebalancea de abajo hacia arriba los nodos del camino; retorna la raíz"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+
+            left_height = node.left.height if node.left else 0
+            right_height = node.right.height if node.right else 0
+            node.height = 1 + (left_height if left_height > right_height else right_height)
+            balance = left_height - right_height
+
+            if -1 <= balance <= 1:
+                if node.height == old_height:
+                    return root  # Los ancestros no cambian
+                continue
+
+            subtree = self._rotate(node, balance)
+            if i == 0:
+                root = subtree
+            else:
+                parent = path[i - 1]
+                if parent.left is node:
+                    parent.left = subtree
+                else:
+                    parent.right = subtree
+
+            # Tras una rotación por inserción la altura original se restaura
+            if after_insert or subtree.height == old_height:
+                return root
+
+        return root
+
     def insert(self, root, key, value=None):
-        """Inserta un nodo en el árbol AVL"""
-        if not root:
+        """Inserta un nodo en el árbol AVL; retorna la nueva raíz del subárbol"""
+        if root is None:
             self.nodes_count += 1
             return AVLNode(key, value)
 
-        if key < root.key:
-            root.left = self.insert(root.left, key, value)
-        elif key > root.key:
-            root.right = self.insert(root.right, key, value)
+        path = []
+        node = root
+        while node is not None:
+            node_key = node.key
+            if key < node_key:
+                path.append(node)
+                node = node.left
+            elif key > node_key:
+                path.append(node)
+                node = node.right
+            else:
+                # Actualizar valor si la clave ya existe
+                node.value = value
+                return root
+
+        new_node = AVLNode(key, value)
+        self.nodes_count += 1
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = new_node
         else:
-            # Actualizar valor si la clave ya existe
-            root.value = value
-            return root
+            parent.right = new_node
 
-        return self.balance(root)
+        return self._rebalance_path(root, path, True)
 
     def insert_key(self, key, value=None):
         """Método público para insertar"""
@@ -133,61 +198,307 @@ class AVLTree:
         return current
 
     def delete(self, root, key):
-        """Elimina un nodo del árbol AVL"""
-        if not root:
+        """Elimina un nodo del árbol AVL; retorna la nueva raíz del subárbol"""
+        path = []
+        node = root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                break
+            path.append(node)
+            node = node.left if key < node_key else node.right
+
+        if node is None:
             return root
 
-        if key < root.key:
-            root.left = self.delete(root.left, key)
-        elif key > root.key:
-            root.right = self.delete(root.right, key)
+        # Nodo encontrado
+        self.nodes_count -= 1
+
+        # Caso 2: Nodo con dos hijos, se reemplaza por su sucesor
+        if node.left and node.right:
+            path.append(node)
+            successor = node.right
+            while successor.left:
+                path.append(successor)
+                successor = successor.left
+            node.key = successor.key
+            node.value = successor.value
+            node = successor
+
+        # Caso 1: Nodo hoja o con un hijo
+        child = node.left if node.left else node.right
+        if not path:
+            return child
+
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = child
         else:
-            # Nodo encontrado
-            self.nodes_count -= 1
-
-            # Caso 1: Nodo hoja o con un hijo
-            if not root.left:
-                return root.right
-            elif not root.right:
-                return root.left
-
-            # Caso 2: Nodo con dos hijos
-            temp = self.get_min_value_node(root.right)
-            root.key = temp.key
-            root.value = temp.value
-            root.right = self.delete(root.right, temp.key)
+            parent.right = child
 
-        return self.balance(root)
+        return self._rebalance_path(root, path, False)
 
     def delete_key(self, key):
         """Método público para eliminar"""
         self.root = self.delete(self.root, key)
 
+    # Construcción y combinación en bloque
+    @classmethod
+    def from_sorted(cls, items):
+        """Construye un árbol perfectamente balanceado en O(n) a partir de (clave, valor) ordenados
+
+        Claves repetidas consecutivas conservan el último valor.
+        """
+        nodes = []
+        append = nodes.append
+        last = None
+        for key, value in items:
+            # Una sola comparación en el caso común (claves estrictamente crecientes)
+            if last is not None and key <= last.key:
+                if key == last.key:
+                    last.value = value
+                    continue
+                raise ValueError("Los elementos deben estar ordenados por clave")
+            last = AVLNode(key, value)
+            append(last)
+
+        tree = cls()
+        tree.root = cls._link_balanced(nodes, 0, len(nodes))
+        tree.nodes_count = len(nodes)
+        return tree
+
+    @classmethod
+    def _link_balanced(cls, nodes, lo, hi):
+        """Enlaza nodes[lo:hi] como subárbol balanceado (profundidad de recursión O(log n))"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        left = node.left = cls._link_balanced(nodes, lo, mid)
+        right = node.right = cls._link_balanced(nodes, mid + 1, hi)
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        return node
+
+    def _join(self, left, node, right):
+        """Une left < node < right en un árbol AVL en O(|altura(left) - altura(right)| + 1)"""
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+
+        if left_height > right_height + 1:
+            # Bajar por el borde derecho de left hasta una altura compatible
+            path = []
+            current = left
+            while current is not None and current.height > right_height + 1:
+                path.append(current)
+                current = current.right
+            node.left = current
+            node.right = right
+            self.balance(node)
+            path[-1].right = node
+            return self._rebalance_path(left, path, False)
+
+        if right_height > left_height + 1:
+            # Bajar por el borde izquierdo de right
+            path = []
+            current = right
+            while current is not None and current.height > left_height + 1:
+                path.append(current)
+                current = current.left
+            node.left = left
+            node.right = current
+            self.balance(node)
+            path[-1].left = node
+            return self._rebalance_path(right, path, False)
+
+        node.left = left
+        node.right = right
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        return node
+
+    def _split(self, root, key):
+        """Divide root en (claves < key, nodo con key o None, claves > key)"""
+        path = []
+        node = root
+        while node is not None and node.key != key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+
+        if node is not None:
+            left, right = node.left, node.right
+        else:
+            left = right = None
+
+        # Reconstruir ambos lados de abajo hacia arriba
+        for ancestor in reversed(path):
+            if key < ancestor.key:
+                right = self._join(right, ancestor, ancestor.right)
+            else:
+                left = self._join(ancestor.left, ancestor, left)
+        return left, node, right
+
+    def _pop_min(self, root):
+        """Desenlaza el nodo mínimo; retorna (nueva raíz, nodo mínimo)"""
+        path = []
+        node = root
+        while node.left is not None:
+            path.append(node)
+            node = node.left
+        if not path:
+            return node.right, node
+        path[-1].left = node.right
+        return self._rebalance_path(root, path, False), node
+
+    def _union_nodes(self, root, other):
+        """Une destructivamente dos árboles; ante claves repetidas gana other"""
+        if root is None:
+            return other, 0
+        if other is None:
+            return root, 0
+
+        left, duplicate, right = self._split(root, other.key)
+        other_left, other_right = other.left, other.right
+        left, left_duplicates = self._union_nodes(left, other_left)
+        right, right_duplicates = self._union_nodes(right, other_right)
+        duplicates = left_duplicates + right_duplicates + (duplicate is not None)
+        return self._join(left, other, right), duplicates
+
+    def _difference_nodes(self, root, other):
+        """Elimina de root las claves presentes en other (other no se modifica)"""
+        if root is None or other is None:
+            return root, 0
+
+        left, removed, right = self._split(root, other.key)
+        left, left_removed = self._difference_nodes(left, other.left)
+        right, right_removed = self._difference_nodes(right, other.right)
+        removed_count = left_removed + right_removed + (removed is not None)
+
+        if right is None:
+            return left, removed_count
+        right, minimum = self._pop_min(right)
+        return self._join(left, minimum, right), removed_count
+
+    def union(self, other):
+        """Agrega al árbol las claves de other en O(m log(n/m + 1)); retorna cuántas eran nuevas
+
+        other puede ser otro AVLTree (no se modifica) o una secuencia de
+        (clave, valor) ordenada. Ante claves repetidas prevalece el valor de other.
+        """
+        if isinstance(other, AVLTree):
+            other = AVLTree.from_sorted(other.iter_items())
+        else:
+            other = AVLTree.from_sorted(other)
+
+        self.root, duplicates = self._union_nodes(self.root, other.root)
+        added = other.nodes_count - duplicates
+        self.nodes_count += added
+        return added
+
+    def difference(self, other):
+        """Elimina del árbol las claves de other (AVLTree); retorna cuántas se eliminaron"""
+        self.root, removed = self._difference_nodes(self.root, other.root)
+        self.nodes_count -= removed
+        return removed
+
     def search(self, root, key):
         """Busca un nodo en el árbol"""
-        if not root or root.key == key:
-            return root
-
-        if key < root.key:
-            return self.search(root.left, key)
-        return self.search(root.right, key)
+        node = root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                return node
+            node = node.left if key < node_key else node.right
+        return None
 
     def search_key(self, key):
         """Método público para buscar"""
         return self.search(self.root, key)
 
     def inorder_traversal(self, node, result):
-        """Recorrido inorder del árbol"""
-        if node:
-            self.inorder_traversal(node.left, result)
-            result.append((node.key, node.value))
-            self.inorder_traversal(node.right, result)
+        """Recorrido inorder del árbol con pila explícita"""
+        stack = []
+        current = node
+        while stack or current is not None:
+            while current is not None:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            result.append((current.key, current.value))
+            current = current.right
+
+    def iter_items(self, start=None, stop=None):
+        """Genera (clave, valor) en orden con start <= clave < stop, sin materializar el árbol"""
+        stack = []
+        node = self.root
+
+        # Descender solo por los nodos que pueden ser >= start
+        while node is not None:
+            if start is not None and node.key < start:
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+
+        while stack:
+            node = stack.pop()
+            if stop is not None and not node.key < stop:
+                return
+            yield node.key, node.value
+
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def range(self, low, high):
+        """Genera (clave, valor) con low <= clave <= high"""
+        for key, value in self.iter_items(low):
+            if key > high:
+                return
+            yield key, value
+
+    def floor(self, key):
+        """Retorna (clave, valor) de la mayor clave <= key, o None"""
+        best = None
+        node = self.root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                return node_key, node.value
+            if key < node_key:
+                node = node.left
+            else:
+                best = node
+                node = node.right
+        return (best.key, best.value) if best is not None else None
+
+    def ceiling(self, key):
+        """Retorna (clave, valor) de la menor clave >= key, o None"""
+        best = None
+        node = self.root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                return node_key, node.value
+            if key < node_key:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return (best.key, best.value) if best is not None else None
 
     def get_all_routes(self):
         """Obtiene todas las rutas ordenadas"""
-        result = []
-        self.inorder_traversal(self.root, result)
-        return result
+        return list(self.iter_items())
+
+    def __iter__(self):
+        """Itera (clave, valor) en orden"""
+        return self.iter_items()
+
+    def __len__(self):
+        """Retorna el número de nodos en O(1)"""
+        return self.nodes_count
 
     def get_tree_height(self):
         """Obtiene la altura del árbol"""
@@ -201,17 +512,17 @@ class AVLTree:
             "rotations": self.rotations.copy()
         }
 
-    def print_tree(self, node=None, level=0, prefix="Root: "):
+    def print_tree(self, node=None, level=0, prefix="Root: ", format_key=str):
         """Imprime el árbol en forma visual"""
         if node is None:
             node = self.root
 
         if node:
-            print("  " * level + prefix + f"[{node.key}]")
+            print("  " * level + prefix + f"[{format_key(node.key)}]")
             if node.left:
-                self.print_tree(node.left, level + 1, "L: ")
+                self.print_tree(node.left, level + 1, "L: ", format_key)
             if node.right:
-                self.print_tree(node.right, level + 1, "R: ")
+                self.print_tree(node.right, level + 1, "R: ", format_key)
 
     def clear_rotations(self):
         """Reinicia el contador de rotaciones"""
@@ -1,9 +1,17 @@
 """
 Implementación de B-Tree desde cero para índice persistente
+
+La posición de una clave dentro de un nodo se busca con `bisect` y todos los
+recorridos son iterativos, así órdenes grandes (64-256, pensados para un
+índice en disco) cuestan O(log order) por nivel.
 """
 
+from bisect import bisect_left
+
 class BTreeNode:
     """Nodo del B-Tree"""
+    __slots__ = ("leaf", "keys", "children", "values")
+
     def __init__(self, leaf=False):
         self.leaf = leaf
         self.keys = []
@@ -14,100 +22,95 @@ class BTree:
     """B-Tree para índice persistente de configuraciones"""
 
     def __init__(self, order=4):
+        if order < 3:
+            raise ValueError("El orden del B-Tree debe ser al menos 3")
         self.root = BTreeNode(leaf=True)
         self.order = order  # Orden del B-Tree (máximo número de hijos)
+        self.min_keys = (order - 1) // 2  # Mínimo de claves en un nodo no raíz
         self.nodes_count = 1
+        self.keys_count = 0
         self.splits = 0
         self.merges = 0
 
-    def search(self, key, node=None):
+    def search(self, key):
         """Busca una clave en el B-Tree"""
-        if node is None:
-            node = self.root
-
-        i = 0
-        while i < len(node.keys) and key > node.keys[i]:
-            i += 1
-
-        if i < len(node.keys) and key == node.keys[i]:
-            return node.values[i]
-
-        if node.leaf:
-            return None
-
-        return self.search(key, node.children[i])
+        node = self.root
+        while True:
+            keys = node.keys
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                return node.values[i]
+            if node.leaf:
+                return None
+            node = node.children[i]
+
+    def __contains__(self, key):
+        """Indica si la clave existe (aunque su valor sea None)"""
+        node = self.root
+        while True:
+            i = bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                return True
+            if node.leaf:
+                return False
+            node = node.children[i]
 
     def split_child(self, parent, child_index):
-        """Divide un nodo hijo cuando está lleno"""
-        order = self.order
+        """Divide un hijo con `order` claves en dos y sube la clave del medio al padre"""
         child = parent.children[child_index]
+        mid = len(child.keys) // 2
 
-        # Crear nuevo nodo
         new_node = BTreeNode(leaf=child.leaf)
         self.nodes_count += 1
         self.splits += 1
 
         # Mover la clave del medio al padre
-        mid_key = child.keys[order // 2]
-        mid_value = child.values[order // 2]
+        parent.keys.insert(child_index, child.keys[mid])
+        parent.values.insert(child_index, child.values[mid])
 
-        parent.keys.insert(child_index, mid_key)
-        parent.values.insert(child_index, mid_value)
-
-        # Mover las claves de la derecha al nuevo nodo
-        new_node.keys = child.keys[order // 2 + 1:]
-        new_node.values = child.values[order // 2 + 1:]
-
-        # Mover los hijos de la derecha al nuevo nodo
+        # Mover las claves (y los hijos) de la derecha al nuevo nodo
+        new_node.keys = child.keys[mid + 1:]
+        new_node.values = child.values[mid + 1:]
         if not child.leaf:
-            new_node.children = child.children[order // 2 + 1:]
-            child.children = child.children[:order // 2 + 1]
-
-        # Actualizar el nodo original
-        child.keys = child.keys[:order // 2]
-        child.values = child.values[:order // 2]
+            new_node.children = child.children[mid + 1:]
+            del child.children[mid + 1:]
+        del child.keys[mid:]
+        del child.values[mid:]
 
         # Insertar el nuevo nodo en los hijos del padre
         parent.children.insert(child_index + 1, new_node)
 
-    def insert_non_full(self, node, key, value):
-        """Inserta en un nodo que no está lleno"""
-        if node.leaf:
-            # Encontrar la posición correcta
-            i = 0
-            while i < len(node.keys) and key > node.keys[i]:
-                i += 1
-
-            # Insertar la clave y valor
-            node.keys.insert(i, key)
-            node.values.insert(i, value)
-        else:
-            # Encontrar el hijo correcto
-            i = 0
-            while i < len(node.keys) and key > node.keys[i]:
-                i += 1
-
-            # Si el hijo está lleno, dividirlo
-            if len(node.children[i].keys) == self.order - 1:
-                self.split_child(node, i)
-                if key > node.keys[i]:
-                    i += 1
-
-            self.insert_non_full(node.children[i], key, value)
-
     def insert(self, key, value):
-        """Inserta una clave-valor en el B-Tree"""
-        root = self.root
-
-        # Si la raíz está llena
-        if len(root.keys) == self.order - 1:
-            new_root = BTreeNode(leaf=False)
-            new_root.children.append(self.root)
-            self.split_child(new_root, 0)
-            self.root = new_root
-            self.nodes_count += 1
-
-        self.insert_non_full(self.root, key, value)
+        """Inserta una clave-valor; si la clave existe reemplaza su valor. Retorna True si es nueva"""
+        # Descender recordando el camino (padre, índice del hijo)
+        path = []
+        node = self.root
+        while True:
+            i = bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                node.values[i] = value
+                return False
+            if node.leaf:
+                break
+            path.append((node, i))
+            node = node.children[i]
+
+        node.keys.insert(i, key)
+        node.values.insert(i, value)
+        self.keys_count += 1
+
+        # Dividir hacia arriba mientras haya nodos desbordados
+        while len(node.keys) >= self.order:
+            if path:
+                parent, child_index = path.pop()
+            else:
+                parent, child_index = BTreeNode(leaf=False), 0
+                parent.children.append(node)
+                self.root = parent
+                self.nodes_count += 1
+            self.split_child(parent, child_index)
+            node = parent
+        return True
 
     def merge_nodes(self, parent, left_index):
         """Fusiona dos nodos hermanos"""
@@ -131,6 +134,7 @@ class BTree:
         parent.values.pop(left_index)
         parent.children.pop(left_index + 1)
 
+        self.nodes_count -= 1
         self.merges += 1
 
     def borrow_from_prev(self, parent, child_index):
@@ -168,66 +172,58 @@ class BTree:
             child.children.append(sibling.children.pop(0))
 
     def fill_child(self, parent, child_index):
-        """Llena un nodo hijo que tiene menos claves que el mínimo"""
-        if child_index > 0 and len(parent.children[child_index - 1].keys) >= self.order // 2:
+        """Repara un hijo con menos claves que el mínimo; retorna True si hubo fusión"""
+        min_keys = self.min_keys
+        if child_index > 0 and len(parent.children[child_index - 1].keys) > min_keys:
             self.borrow_from_prev(parent, child_index)
-        elif child_index < len(parent.children) - 1 and len(parent.children[child_index + 1].keys) >= self.order // 2:
+        elif child_index < len(parent.children) - 1 and len(parent.children[child_index + 1].keys) > min_keys:
             self.borrow_from_next(parent, child_index)
         else:
-            if child_index > 0:
-                self.merge_nodes(parent, child_index - 1)
-            else:
-                self.merge_nodes(parent, child_index)
-
-    def delete_helper(self, node, key):
-        """Ayudante recursivo para eliminación"""
-        min_keys = self.order // 2
+            self.merge_nodes(parent, child_index - 1 if child_index > 0 else child_index)
+            return True
+        return False
 
-        # Encontrar la posición de la clave
-        i = 0
-        while i < len(node.keys) and key > node.keys[i]:
-            i += 1
-
-        # Si la clave está en este nodo
-        if i < len(node.keys) and node.keys[i] == key:
-            if node.leaf:
-                # Caso 1: Es una hoja, simplemente eliminar
-                node.keys.pop(i)
-                node.values.pop(i)
-            else:
-                # Caso 2: No es hoja
-                if len(node.children[i].keys) >= min_keys:
-                    # Caso 2a: El hijo izquierdo tiene suficientes claves
-                    pred = self.get_predecessor(node.children[i])
-                    node.keys[i] = pred[0]
-                    node.values[i] = pred[1]
-                    self.delete_helper(node.children[i], pred[0])
-                elif len(node.children[i + 1].keys) >= min_keys:
-                    # Caso 2b: El hijo derecho tiene suficientes claves
-                    succ = self.get_successor(node.children[i + 1])
-                    node.keys[i] = succ[0]
-                    node.values[i] = succ[1]
-                    self.delete_helper(node.children[i + 1], succ[0])
-                else:
-                    # Caso 2c: Ambos hijos tienen el mínimo, fusionar
-                    self.merge_nodes(node, i)
-                    self.delete_helper(node.children[i], key)
-        else:
-            # La clave no está en este nodo
+    def delete(self, key):
+        """Elimina una clave del B-Tree; retorna True si existía"""
+        path = []
+        node = self.root
+        while True:
+            i = bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                break
             if node.leaf:
-                return  # No encontrada
-
-            flag = (i == len(node.keys))
-
-            # Si el hijo no tiene suficientes claves, llenarlo
-            if len(node.children[i].keys) < min_keys:
-                self.fill_child(node, i)
-
-            # Si el último hijo ha sido fusionado, usar el hijo anterior
-            if flag and i > len(node.keys):
-                self.delete_helper(node.children[i - 1], key)
-            else:
-                self.delete_helper(node.children[i], key)
+                return False
+            path.append((node, i))
+            node = node.children[i]
+
+        if not node.leaf:
+            # Reemplazar por el predecesor (máximo del subárbol izquierdo) y borrarlo de su hoja
+            target, target_index = node, i
+            path.append((node, i))
+            node = node.children[i]
+            while not node.leaf:
+                path.append((node, len(node.children) - 1))
+                node = node.children[-1]
+            target.keys[target_index] = node.keys[-1]
+            target.values[target_index] = node.values[-1]
+            i = len(node.keys) - 1
+
+        node.keys.pop(i)
+        node.values.pop(i)
+        self.keys_count -= 1
+
+        # Reparar hacia arriba los nodos con menos claves que el mínimo
+        while path and len(node.keys) < self.min_keys:
+            parent, child_index = path.pop()
+            if not self.fill_child(parent, child_index):
+                break
+            node = parent
+
+        # Si la raíz se queda sin claves, su único hijo pasa a ser la raíz
+        if not self.root.keys and not self.root.leaf:
+            self.root = self.root.children[0]
+            self.nodes_count -= 1
+        return True
 
     def get_predecessor(self, node):
         """Obtiene el predecesor de un nodo"""
@@ -243,50 +239,43 @@ class BTree:
             current = current.children[0]
         return (current.keys[0], current.values[0])
 
-    def delete(self, key):
-        """Elimina una clave del B-Tree"""
-        if not self.root:
-            return
-
-        self.delete_helper(self.root, key)
-
-        # Si la raíz se queda sin claves, hacer que su hijo sea la nueva raíz
-        if len(self.root.keys) == 0:
-            if not self.root.leaf:
-                self.root = self.root.children[0]
-                self.nodes_count -= 1
-            else:
-                self.root = None
+    def iter_items(self, node=None):
+        """Genera (clave, valor) en orden del subárbol de node (toda la raíz por defecto) con una pila explícita"""
+        stack = [(node if node is not None else self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if node.leaf:
+                yield from zip(node.keys, node.values)
+                continue
+            # Estado i: ya se recorrió el hijo i - 1; sigue su clave separadora y el hijo i
+            if i > 0:
+                yield node.keys[i - 1], node.values[i - 1]
+            if i + 1 < len(node.children):
+                stack.append((node, i + 1))
+            stack.append((node.children[i], 0))
 
     def inorder_traversal(self, node, result):
         """Recorrido inorder del B-Tree"""
         if node:
-            i = 0
-            for i in range(len(node.keys)):
-                if not node.leaf:
-                    self.inorder_traversal(node.children[i], result)
-                result.append((node.keys[i], node.values[i]))
-            if not node.leaf:
-                self.inorder_traversal(node.children[i + 1], result)
+            result.extend(self.iter_items(node))
 
     def get_all_entries(self):
         """Obtiene todas las entradas ordenadas"""
-        result = []
-        self.inorder_traversal(self.root, result)
-        return result
+        return list(self.iter_items())
 
     def get_height(self, node=None):
         """Calcula la altura del B-Tree"""
         if node is None:
             node = self.root
 
-        if not node:
+        if not node.keys and node.leaf:
             return 0
 
-        if node.leaf:
-            return 1
-
-        return 1 + self.get_height(node.children[0])
+        height = 1
+        while not node.leaf:
+            node = node.children[0]
+            height += 1
+        return height
 
     def get_stats(self):
         """Obtiene estadísticas del B-Tree"""
@@ -294,10 +283,15 @@ class BTree:
             "order": self.order,
             "height": self.get_height(self.root),
             "nodes": self.nodes_count,
+            "keys": self.keys_count,
             "splits": self.splits,
             "merges": self.merges
         }
 
+    def __len__(self):
+        """Retorna el número de claves"""
+        return self.keys_count
+
     def print_tree(self, node=None, level=0):
         """Imprime el B-Tree"""
         if node is None:
@@ -0,0 +1,363 @@
+"""
+Implementación de trie Patricia compacto desde cero: los nodos viven en
+arreglos paralelos (`array`) en lugar de objetos, y los valores se internan
+en una tabla compartida
+
+Cada nodo ocupa una posición en los arreglos de claves, longitudes, hijos e
+identificadores de valor (unos 17 bytes para IPv4). Los valores iguales
+(por ejemplo, miles de prefijos con {'block': True}) comparten una sola
+entrada de la tabla. Las posiciones liberadas se reutilizan.
+"""
+
+from array import array
+
+NIL = -1  # Índice nulo de nodo o de valor
+
+class CompactTrie:
+    """Trie Patricia de bits sobre arreglos paralelos, con la misma interfaz que PatriciaTrie"""
+
+    def __init__(self, width=32):
+        self.width = width
+        self.clear()
+
+    def clear(self):
+        """Elimina todos los prefijos y libera los arreglos"""
+        if self.width <= 32:
+            self.keys = array('I')
+        elif self.width <= 64:
+            self.keys = array('Q')
+        else:
+            self.keys = []  # Claves de más de 64 bits: enteros de Python
+        self.lengths = array('B')
+        self.left = array('i')
+        self.right = array('i')
+        self.value_ids = array('i')
+        self._free_nodes = []
+
+        # Tabla de valores internados con contador de referencias
+        self.values = []
+        self._value_refs = array('I')
+        self._value_index = {}  # Clave hashable del valor -> id
+        self._free_values = []
+
+        self.root = NIL
+        self.prefix_count = 0
+        self.node_count = 0
+
+    def _mask(self, length):
+        """Máscara de red de `length` bits"""
+        return ((1 << length) - 1) << (self.width - length)
+
+    def _bit(self, key, position):
+        """Bit de key en la posición dada (0 = más significativo)"""
+        return (key >> (self.width - 1 - position)) & 1
+
+    def _intern_key(self, value):
+        """Clave hashable para internar value, o None si no se puede internar"""
+        try:
+            if isinstance(value, dict):
+                # El tipo distingue {'ttl-min': 1} de {'ttl-min': True}
+                intern_key = tuple(sorted((key, type(item).__name__, item) for key, item in value.items()))
+            else:
+                intern_key = (type(value).__name__, value)
+            # Los valores anidados (listas, dicts) recién fallan al calcular el hash
+            hash(intern_key)
+            return intern_key
+        except TypeError:
+            return None
+
+    def _intern(self, value):
+        """Retorna el id de value en la tabla, agregándolo si no existe"""
+        intern_key = self._intern_key(value)
+        value_id = self._value_index.get(intern_key, NIL) if intern_key is not None else NIL
+        if value_id == NIL:
+            if self._free_values:
+                value_id = self._free_values.pop()
+                self.values[value_id] = value
+                self._value_refs[value_id] = 0
+            else:
+                value_id = len(self.values)
+                self.values.append(value)
+                self._value_refs.append(0)
+            if intern_key is not None:
+                self._value_index[intern_key] = value_id
+        self._value_refs[value_id] += 1
+        return value_id
+
+    def _release(self, value_id):
+        """Suelta una referencia a un valor; lo libera al llegar a cero"""
+        self._value_refs[value_id] -= 1
+        if self._value_refs[value_id] == 0:
+            intern_key = self._intern_key(self.values[value_id])
+            if intern_key is not None:
+                del self._value_index[intern_key]
+            self.values[value_id] = None
+            self._free_values.append(value_id)
+
+    def _alloc_node(self, key, length, value_id=NIL):
+        """Crea un nodo (reutilizando posiciones libres) y retorna su índice"""
+        self.node_count += 1
+        if self._free_nodes:
+            node = self._free_nodes.pop()
+            self.keys[node] = key
+            self.lengths[node] = length
+            self.left[node] = NIL
+            self.right[node] = NIL
+            self.value_ids[node] = value_id
+            return node
+        self.keys.append(key)
+        self.lengths.append(length)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.value_ids.append(value_id)
+        return len(self.lengths) - 1
+
+    def _free_node(self, node):
+        """Devuelve la posición del nodo a la lista libre"""
+        self.node_count -= 1
+        self.left[node] = NIL
+        self.right[node] = NIL
+        self.value_ids[node] = NIL
+        self._free_nodes.append(node)
+
+    def _set_child(self, node, bit, child):
+        """Asigna el hijo izquierdo (bit 0) o derecho (bit 1) de node"""
+        if bit:
+            self.right[node] = child
+        else:
+            self.left[node] = child
+
+    def _replace_child(self, parent, bit, new):
+        """Sustituye el hijo `bit` de parent (o la raíz) por new"""
+        if parent == NIL:
+            self.root = new
+        else:
+            self._set_child(parent, bit, new)
+
+    def insert(self, key, length, value=None):
+        """Inserta o actualiza el prefijo key/length; retorna True si es nuevo"""
+        if length < 0 or length > self.width:
+            raise ValueError(f"Longitud de prefijo inválida: {length}")
+        width = self.width
+        key &= self._mask(length)
+        keys, lengths = self.keys, self.lengths
+
+        parent, parent_bit = NIL, 0
+        node = self.root
+        while node != NIL:
+            node_key = keys[node]
+            node_length = lengths[node]
+            common = width - (key ^ node_key).bit_length()
+            if common > length:
+                common = length
+            if common > node_length:
+                common = node_length
+
+            if common < node_length:
+                if common == length:
+                    # El nuevo prefijo es ancestro del nodo
+                    new = self._alloc_node(key, length, self._intern(value))
+                    self._set_child(new, self._bit(node_key, length), node)
+                else:
+                    # Bifurcación: nodo intermedio sin valor con ambos hijos
+                    new = self._alloc_node(key & self._mask(common), common)
+                    leaf = self._alloc_node(key, length, self._intern(value))
+                    self._set_child(new, self._bit(key, common), leaf)
+                    self._set_child(new, self._bit(node_key, common), node)
+                self._replace_child(parent, parent_bit, new)
+                self.prefix_count += 1
+                return True
+
+            if length == node_length:
+                old_id = self.value_ids[node]
+                self.value_ids[node] = self._intern(value)
+                if old_id != NIL:
+                    self._release(old_id)
+                    return False
+                self.prefix_count += 1
+                return True
+
+            bit = (key >> (width - 1 - node_length)) & 1
+            child = self.right[node] if bit else self.left[node]
+            if child == NIL:
+                self._set_child(node, bit, self._alloc_node(key, length, self._intern(value)))
+                self.prefix_count += 1
+                return True
+            parent, parent_bit, node = node, bit, child
+
+        self.root = self._alloc_node(key, length, self._intern(value))
+        self.prefix_count += 1
+        return True
+
+    def _find(self, key, length):
+        """Retorna (camino de (ancestro, bit), nodo) del prefijo exacto o (camino, NIL)"""
+        width = self.width
+        key &= self._mask(length)
+        path = []
+        node = self.root
+        while node != NIL:
+            node_length = self.lengths[node]
+            if node_length > length or (key ^ self.keys[node]) >> (width - node_length):
+                return path, NIL
+            if node_length == length:
+                return path, node
+            bit = (key >> (width - 1 - node_length)) & 1
+            path.append((node, bit))
+            node = self.right[node] if bit else self.left[node]
+        return path, NIL
+
+    def exact(self, key, length):
+        """Retorna el valor del prefijo exacto key/length o None"""
+        node = self._find(key, length)[1]
+        if node == NIL or self.value_ids[node] == NIL:
+            return None
+        return self.values[self.value_ids[node]]
+
+    def delete(self, key, length):
+        """Elimina el prefijo key/length; retorna True si existía"""
+        path, node = self._find(key, length)
+        if node == NIL or self.value_ids[node] == NIL:
+            return False
+
+        self._release(self.value_ids[node])
+        self.value_ids[node] = NIL
+        self.prefix_count -= 1
+
+        # Eliminar nodos sin valor que ya no bifurcan
+        while node != NIL and self.value_ids[node] == NIL:
+            parent, parent_bit = path.pop() if path else (NIL, 0)
+            left, right = self.left[node], self.right[node]
+            if left != NIL and right != NIL:
+                break  # Sigue siendo una bifurcación
+
+            self._replace_child(parent, parent_bit, left if left != NIL else right)
+            self._free_node(node)
+            if left != NIL or right != NIL:
+                break
+            # El padre perdió un hijo: puede haber quedado como nodo inútil
+            node = parent
+        return True
+
+    def longest_match(self, address):
+        """Retorna (key, length, value) del prefijo más largo que contiene address, o None"""
+        width = self.width
+        keys, lengths, value_ids = self.keys, self.lengths, self.value_ids
+        left, right = self.left, self.right
+        best = NIL
+        node = self.root
+        while node != NIL:
+            length = lengths[node]
+            if (address ^ keys[node]) >> (width - length):
+                break
+            if value_ids[node] != NIL:
+                best = node
+            if length == width:
+                break
+            node = right[node] if (address >> (width - 1 - length)) & 1 else left[node]
+
+        if best == NIL:
+            return None
+        return keys[best], lengths[best], self.values[value_ids[best]]
+
+    def items(self):
+        """Genera (key, length, value) ordenados por dirección y luego por longitud"""
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            node = stack.pop()
+            value_id = self.value_ids[node]
+            if value_id != NIL:
+                yield self.keys[node], self.lengths[node], self.values[value_id]
+            if self.right[node] != NIL:
+                stack.append(self.right[node])
+            if self.left[node] != NIL:
+                stack.append(self.left[node])
+
+    def compact(self):
+        """Poda nodos sin valor que no bifurcan y re-empaqueta los arreglos en preorden
+
+        Retorna cuántas posiciones de nodo se liberaron.
+        """
+        slots = len(self.lengths)
+        self.root = self._prune(self.root)
+
+        # Nuevas posiciones en preorden (los hijos quedan cerca de su padre)
+        order = []
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if self.right[node] != NIL:
+                stack.append(self.right[node])
+            if self.left[node] != NIL:
+                stack.append(self.left[node])
+        new_index = {node: index for index, node in enumerate(order)}
+        new_index[NIL] = NIL
+
+        # Tabla de valores sin huecos
+        values = []
+        value_refs = array('I')
+        new_value_id = {NIL: NIL}
+        for value_id, value in enumerate(self.values):
+            if self._value_refs[value_id]:
+                new_value_id[value_id] = len(values)
+                values.append(value)
+                value_refs.append(self._value_refs[value_id])
+
+        keys = array(self.keys.typecode) if isinstance(self.keys, array) else []
+        lengths, left, right, value_ids = array('B'), array('i'), array('i'), array('i')
+        for node in order:
+            keys.append(self.keys[node])
+            lengths.append(self.lengths[node])
+            left.append(new_index[self.left[node]])
+            right.append(new_index[self.right[node]])
+            value_ids.append(new_value_id[self.value_ids[node]])
+
+        self.keys, self.lengths, self.left, self.right, self.value_ids = keys, lengths, left, right, value_ids
+        self.values, self._value_refs, self._free_values = values, value_refs, []
+        self._value_index = {}
+        for value_id, value in enumerate(values):
+            intern_key = self._intern_key(value)
+            if intern_key is not None:
+                self._value_index[intern_key] = value_id
+        self._free_nodes = []
+        self.root = 0 if order else NIL
+        return slots - len(order)
+
+    def _prune(self, node):
+        """Poda el subárbol de node y retorna su nueva raíz"""
+        if node == NIL:
+            return NIL
+        self.left[node] = self._prune(self.left[node])
+        self.right[node] = self._prune(self.right[node])
+        left, right = self.left[node], self.right[node]
+        if self.value_ids[node] != NIL or (left != NIL and right != NIL):
+            return node
+        self._free_node(node)
+        return left if left != NIL else right
+
+    def memory_report(self):
+        """Obtiene el uso de memoria de los arreglos de nodos y de la tabla de valores"""
+        node_bytes = sum(len(column) * column.itemsize
+                         for column in (self.lengths, self.left, self.right, self.value_ids))
+        if isinstance(self.keys, array):
+            node_bytes += len(self.keys) * self.keys.itemsize
+        else:
+            node_bytes += len(self.keys) * (8 + (self.width + 7) // 8)
+        return {
+            "slots": len(self.lengths),
+            "free_slots": len(self._free_nodes),
+            "node_bytes": node_bytes,
+            "values": len(self.values) - len(self._free_values)
+        }
+
+    def get_stats(self):
+        """Obtiene estadísticas del trie"""
+        return {
+            "prefixes": self.prefix_count,
+            "nodes": self.node_count,
+            "width": self.width
+        }
+
+    def __len__(self):
+        """Retorna el número de prefijos almacenados"""
+        return self.prefix_count
@@ -0,0 +1,100 @@
+"""
+Implementación de tabla de reenvío DIR-24-8 desde cero para IPv4
+
+Compila un conjunto de prefijos en dos arreglos planos (`array`): una
+primera etapa indexada por los 24 bits altos de la dirección y grupos de
+256 entradas para los prefijos más largos que /24. Cada búsqueda hace a lo
+sumo dos lecturas de memoria.
+"""
+
+import time
+from array import array
+
+# Bit alto de una entrada de tbl24: el resto de la entrada es un grupo de tbl8
+GROUP_FLAG = 0x80000000
+GROUP_SIZE = 256
+
+class Dir248Table:
+    """Tabla DIR-24-8 de solo lectura; se reconstruye con build()"""
+
+    def __init__(self, prefixes=()):
+        self.tbl24 = array('I')
+        self.tbl8 = array('I')
+        self.routes = []  # routes[i - 1] = (key, length, value) de la entrada i
+        self.groups = 0
+        self.builds = 0
+        self.last_build_seconds = 0.0
+        self.build(prefixes)
+
+    def build(self, prefixes):
+        """Compila prefijos (key, length, value) de 32 bits en las dos etapas"""
+        start_time = time.perf_counter()
+
+        # Del más corto al más largo: cada prefijo sobrescribe a los que lo contienen
+        ordered = sorted(prefixes, key=lambda prefix: prefix[1])
+        tbl24 = array('I', [0]) * (1 << 24)
+        tbl8 = array('I')
+        routes = []
+        groups = 0
+
+        for key, length, value in ordered:
+            if length < 0 or length > 32:
+                raise ValueError(f"Longitud de prefijo inválida: {length}")
+            routes.append((key, length, value))
+            index = len(routes)
+
+            if length <= 24:
+                first = key >> 8
+                count = 1 << (24 - length)
+                tbl24[first:first + count] = array('I', [index]) * count
+                continue
+
+            # Prefijo largo: crear el grupo de la /24 heredando su entrada actual
+            slot = key >> 8
+            entry = tbl24[slot]
+            if entry & GROUP_FLAG:
+                group = entry & ~GROUP_FLAG
+            else:
+                group = groups
+                groups += 1
+                tbl8.extend(array('I', [entry]) * GROUP_SIZE)
+                tbl24[slot] = GROUP_FLAG | group
+
+            first = (group << 8) | (key & 0xFF)
+            count = 1 << (32 - length)
+            tbl8[first:first + count] = array('I', [index]) * count
+
+        self.tbl24 = tbl24
+        self.tbl8 = tbl8
+        self.routes = routes
+        self.groups = groups
+        self.builds += 1
+        self.last_build_seconds = time.perf_counter() - start_time
+
+    def longest_match(self, address):
+        """Retorna (key, length, value) del prefijo más largo que contiene address, o None"""
+        entry = self.tbl24[address >> 8]
+        if entry & GROUP_FLAG:
+            entry = self.tbl8[((entry & ~GROUP_FLAG) << 8) | (address & 0xFF)]
+        if not entry:
+            return None
+        return self.routes[entry - 1]
+
+    def memory_report(self):
+        """Obtiene el uso de memoria de ambas etapas"""
+        tbl24_bytes = len(self.tbl24) * self.tbl24.itemsize
+        tbl8_bytes = len(self.tbl8) * self.tbl8.itemsize
+        return {
+            "routes": len(self.routes),
+            "tbl24_entries": len(self.tbl24),
+            "tbl24_bytes": tbl24_bytes,
+            "tbl8_groups": self.groups,
+            "tbl8_bytes": tbl8_bytes,
+            "total_bytes": tbl24_bytes + tbl8_bytes,
+            "builds": self.builds,
+            "last_build_ms": self.last_build_seconds * 1000
+        }
+
+    def __len__(self):
+        """Retorna el número de prefijos compilados"""
+        return len(self.routes)
@@ -0,0 +1,606 @@
+"""
+Implementación de B+Tree persistente en disco desde cero, organizado en
+páginas de tamaño fijo
+
+Estructura del archivo:
+- Página 0: cabecera (raíz, lista libre, número de páginas, contadores)
+- Páginas 1..n: un nodo por página, o una página libre enlazada
+
+Los valores viven solo en las hojas, que están encadenadas en orden de clave;
+los nodos internos guardan copias de claves separadoras. Un recorrido por
+rango baja una vez hasta la primera hoja y luego sigue los enlaces, leyendo
+solo las páginas que produce.
+
+Abrir el índice lee solo la cabecera; cada operación lee a lo sumo las
+páginas del camino raíz-hoja, con una caché LRU de nodos decodificados. Las
+escrituras son inmediatas (write-through), así la caché nunca tiene páginas
+pendientes y desalojar es gratis. Claves y valores son strings.
+"""
+
+import os
+import struct
+from bisect import bisect_left, bisect_right
+
+from .lru_cache import LRUCache
+
+MAGIC = b"BTIDX002"
+# magic, page_size, order, root, free_head, page_count, keys_count, generation, splits, merges
+HEADER = struct.Struct(">8sIIIIIQQQQ")
+NODE_HEADER = struct.Struct(">BHI")  # tipo de página, número de claves, siguiente hoja
+FREE_PAGE = struct.Struct(">BI")  # tipo de página, siguiente página libre
+LENGTH = struct.Struct(">H")
+CHILD = struct.Struct(">I")
+
+LEAF_PAGE = 1
+INTERNAL_PAGE = 2
+FREE_PAGE_TYPE = 0xFF
+NO_PAGE = 0  # La página 0 es la cabecera: nunca es un nodo
+
+class DiskBTreeNode:
+    """Nodo decodificado de una página"""
+    __slots__ = ("page", "leaf", "keys", "values", "children", "next")
+
+    def __init__(self, page, leaf):
+        self.page = page
+        self.leaf = leaf
+        self.keys = []
+        self.values = []  # Solo en hojas
+        self.children = []  # Números de página de los hijos (solo en nodos internos)
+        self.next = NO_PAGE  # Hoja siguiente en orden de clave
+
+class DiskBTree:
+    """B+Tree de strings persistido en un archivo de páginas"""
+
+    # insert_many reconstruye el árbol si el lote tiene al menos esta fracción de sus claves
+    REBUILD_FRACTION = 0.1
+
+    def __init__(self, path, order=32, page_size=8192, cache_size=256):
+        self.path = path
+        self.cache = LRUCache(cache_size)
+        self.page_reads = 0
+        self.page_writes = 0
+
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        # Sin buffer de Python: cada lectura ve lo que escribió otra instancia
+        self._file = open(path, "r+b" if exists else "w+b", buffering=0)
+        if exists:
+            self._read_header()
+        else:
+            if order < 3:
+                raise ValueError("El orden del B-Tree debe ser al menos 3")
+            self.page_size = page_size
+            self.order = order
+            self.root = NO_PAGE
+            self.free_head = NO_PAGE
+            self.page_count = 1
+            self.keys_count = 0
+            self.generation = 0
+            self.splits = 0
+            self.merges = 0
+            self._write_node(self._alloc_node(leaf=True))
+            self.root = 1
+            self._commit()
+
+        self.min_keys = (self.order - 1) // 2
+        # Tamaño máximo de clave + valor para que un nodo lleno quepa en su página
+        self.max_entry_bytes = ((self.page_size - NODE_HEADER.size - CHILD.size * self.order)
+                                // (self.order - 1) - 2 * LENGTH.size)
+        if self.max_entry_bytes < 16:
+            raise ValueError(f"Página de {self.page_size} bytes demasiado chica para orden {self.order}")
+
+    # Cabecera y sincronización
+    def _read_header(self):
+        """Carga la cabecera desde la página 0"""
+        self._file.seek(0)
+        fields = HEADER.unpack(self._file.read(HEADER.size))
+        if fields[0] != MAGIC:
+            raise ValueError(f"{self.path} no es un índice B+Tree compatible")
+        (_, self.page_size, self.order, self.root, self.free_head, self.page_count,
+         self.keys_count, self.generation, self.splits, self.merges) = fields
+
+    def _commit(self):
+        """Escribe la cabecera con una nueva generación"""
+        self.generation += 1
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self.page_size, self.order, self.root, self.free_head,
+                                     self.page_count, self.keys_count, self.generation,
+                                     self.splits, self.merges))
+
+    def _sync(self):
+        """Si otra instancia modificó el archivo, recarga la cabecera y descarta la caché"""
+        self._file.seek(0)
+        generation = HEADER.unpack(self._file.read(HEADER.size))[7]
+        if generation != self.generation:
+            self._read_header()
+            self.cache.clear()
+
+    # Páginas
+    def _read_node(self, page):
+        """Retorna el nodo de la página, desde la caché o decodificándolo del archivo"""
+        node = self.cache.get(page)
+        if node is not None:
+            return node
+
+        self._file.seek(page * self.page_size)
+        data = self._file.read(self.page_size)
+        self.page_reads += 1
+        page_type, count, next_page = NODE_HEADER.unpack_from(data, 0)
+        node = DiskBTreeNode(page, page_type == LEAF_PAGE)
+        node.next = next_page
+        offset = NODE_HEADER.size
+        for target in ((node.keys, node.values) if node.leaf else (node.keys,)):
+            for _ in range(count):
+                length = LENGTH.unpack_from(data, offset)[0]
+                offset += LENGTH.size
+                target.append(data[offset:offset + length].decode("utf-8"))
+                offset += length
+        if not node.leaf:
+            node.children = list(struct.unpack_from(f">{count + 1}I", data, offset))
+
+        self.cache.put(page, node)
+        return node
+
+    def _write_node(self, node):
+        """Codifica el nodo y lo escribe en su página"""
+        parts = [NODE_HEADER.pack(LEAF_PAGE if node.leaf else INTERNAL_PAGE, len(node.keys), node.next)]
+        for source in ((node.keys, node.values) if node.leaf else (node.keys,)):
+            for text in source:
+                encoded = text.encode("utf-8")
+                parts.append(LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+        if not node.leaf:
+            parts.append(struct.pack(f">{len(node.children)}I", *node.children))
+        data = b"".join(parts)
+
+        self._file.seek(node.page * self.page_size)
+        self._file.write(data.ljust(self.page_size, b"\0"))
+        self.page_writes += 1
+        self.cache.put(node.page, node)
+
+    def _alloc_node(self, leaf):
+        """Crea un nodo en una página libre o al final del archivo"""
+        if self.free_head != NO_PAGE:
+            page = self.free_head
+            self._file.seek(page * self.page_size)
+            self.free_head = FREE_PAGE.unpack(self._file.read(FREE_PAGE.size))[1]
+            self.page_reads += 1
+        else:
+            page = self.page_count
+            self.page_count += 1
+        return DiskBTreeNode(page, leaf)
+
+    def _free_page(self, page):
+        """Agrega la página a la lista libre"""
+        self._file.seek(page * self.page_size)
+        self._file.write(FREE_PAGE.pack(FREE_PAGE_TYPE, self.free_head))
+        self.page_writes += 1
+        self.free_head = page
+        self.cache.remove(page)
+
+    def _free_pages(self):
+        """Retorna las páginas de la lista libre en orden de la lista"""
+        pages = []
+        page = self.free_head
+        while page != NO_PAGE:
+            pages.append(page)
+            self._file.seek(page * self.page_size)
+            page = FREE_PAGE.unpack(self._file.read(FREE_PAGE.size))[1]
+        return pages
+
+    # Operaciones
+    def _find_leaf(self, key, path=None):
+        """Baja hasta la hoja que contendría key; si se da path, agrega (nodo, índice del hijo)"""
+        node = self._read_node(self.root)
+        while not node.leaf:
+            # Las claves iguales al separador están en el subárbol derecho
+            i = bisect_right(node.keys, key)
+            if path is not None:
+                path.append((node, i))
+            node = self._read_node(node.children[i])
+        return node
+
+    def search(self, key):
+        """Busca una clave; retorna su valor o None"""
+        self._sync()
+        leaf = self._find_leaf(key)
+        i = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return leaf.values[i]
+        return None
+
+    def __contains__(self, key):
+        """Indica si la clave existe"""
+        return self.search(key) is not None
+
+    def _check_entry(self, key, value):
+        """Valida que clave + valor quepan en una página"""
+        if len(key.encode("utf-8")) + len(value.encode("utf-8")) > self.max_entry_bytes:
+            raise ValueError(f"Clave y valor exceden {self.max_entry_bytes} bytes: {key}")
+
+    def insert(self, key, value):
+        """Inserta o reemplaza una clave; retorna True si es nueva"""
+        self._check_entry(key, value)
+        self._sync()
+        is_new = self._insert(key, value)
+        self._commit()
+        return is_new
+
+    def _insert(self, key, value):
+        """Inserta sin sincronizar ni escribir la cabecera"""
+        path = []
+        node = self._find_leaf(key, path)
+        i = bisect_left(node.keys, key)
+        if i < len(node.keys) and node.keys[i] == key:
+            node.values[i] = value
+            self._write_node(node)
+            return False
+
+        node.keys.insert(i, key)
+        node.values.insert(i, value)
+        self.keys_count += 1
+
+        # Dividir hacia arriba mientras haya nodos desbordados
+        while len(node.keys) >= self.order:
+            if path:
+                parent, child_index = path.pop()
+            else:
+                parent, child_index = self._alloc_node(leaf=False), 0
+                parent.children.append(node.page)
+                self.root = parent.page
+            self._split_child(parent, child_index, node)
+            node = parent
+        self._write_node(node)
+        return True
+
+    def insert_many(self, items, fill_factor=0.9):
+        """Inserta un lote de (clave, valor); retorna cuántas claves son nuevas
+
+        El lote se ordena (ante claves repetidas gana el último valor). Un lote
+        chico se inserta en orden, aprovechando que los caminos consecutivos
+        ya están en caché; uno grande respecto al árbol se mezcla con las
+        hojas existentes y el árbol se reconstruye de abajo hacia arriba.
+        """
+        batch = sorted(dict(items).items())
+        for key, value in batch:
+            self._check_entry(key, value)
+        self._sync()
+
+        if len(batch) < self.keys_count * self.REBUILD_FRACTION:
+            added = sum(self._insert(key, value) for key, value in batch)
+            self._commit()
+            return added
+
+        old_count = self.keys_count
+        self._rebuild(self._merge_sorted(self.range(), batch), fill_factor)
+        return self.keys_count - old_count
+
+    @staticmethod
+    def _merge_sorted(existing, batch):
+        """Mezcla dos secuencias ordenadas de (clave, valor); ante empates gana batch"""
+        batch = iter(batch)
+        pending = next(batch, None)
+        for key, value in existing:
+            while pending is not None and pending[0] < key:
+                yield pending
+                pending = next(batch, None)
+            if pending is not None and pending[0] == key:
+                yield pending
+                pending = next(batch, None)
+            else:
+                yield key, value
+        while pending is not None:
+            yield pending
+            pending = next(batch, None)
+
+    def bulk_load(self, items, fill_factor=0.9):
+        """Carga un árbol vacío desde un iterador de (clave, valor) ordenado por clave
+
+        Construye las hojas llenas al fill_factor y luego cada nivel interno,
+        sin splits. Las claves deben ser estrictamente crecientes.
+        """
+        self._sync()
+        if self.keys_count:
+            raise ValueError("bulk_load requiere un árbol vacío; use insert_many")
+        self._rebuild(items, fill_factor)
+        return self.keys_count
+
+    def _rebuild(self, items, fill_factor):
+        """Reemplaza el árbol por uno construido de abajo hacia arriba desde items ordenados"""
+        if not 0.5 <= fill_factor <= 1:
+            raise ValueError("fill_factor debe estar entre 0.5 y 1")
+        old_pages = self._node_pages()
+        # Se toma la lista libre completa antes de sobrescribir sus páginas: si
+        # el proceso se corta a mitad, esas páginas se pierden pero el árbol y
+        # la lista libre en disco siguen siendo consistentes
+        detached = self._free_pages()
+        if detached:
+            self.free_head = NO_PAGE
+            self._commit()
+        # Se reutilizan en orden creciente, así las hojas nuevas quedan contiguas
+        spare = sorted(detached, reverse=True)
+        try:
+            root, count = self._build(items, fill_factor, spare)
+        except ValueError:
+            # La raíz no cambió: el árbol anterior sigue intacto y las páginas tomadas vuelven a la lista
+            self._read_header()
+            self.cache.clear()
+            for page in reversed(detached):
+                self._free_page(page)
+            self._commit()
+            raise
+
+        self.root = root
+        self.keys_count = count
+        for page in old_pages + spare:
+            self._free_page(page)
+        self._commit()
+
+    def _node_pages(self):
+        """Retorna las páginas de todos los nodos (las hojas no se leen)"""
+        pages = [self.root]
+        stack = [self.root]
+        while stack:
+            node = self._read_node(stack.pop())
+            if not node.leaf:
+                pages.extend(node.children)
+                if not self._read_node(node.children[0]).leaf:
+                    stack.extend(node.children)
+        return pages
+
+    def _append_node(self, leaf, spare):
+        """Crea un nodo en una página de spare o al final del archivo"""
+        if spare:
+            return DiskBTreeNode(spare.pop(), leaf)
+        node = DiskBTreeNode(self.page_count, leaf)
+        self.page_count += 1
+        return node
+
+    def _build(self, items, fill_factor, spare):
+        """Escribe las páginas del árbol nuevo (primero en las de spare); retorna (raíz, claves)
+
+        Las páginas del árbol actual no se tocan: items puede estar leyéndolo.
+        """
+        leaf_size = max(self.min_keys, min(self.order - 1, int((self.order - 1) * fill_factor)))
+        fanout = max(self.min_keys + 1, min(self.order, int(self.order * fill_factor)))
+
+        # Hojas: se escriben a medida que se llenan, reteniendo las dos últimas
+        level = []  # (primera clave, página) de cada nodo del nivel
+        previous, current = None, self._append_node(True, spare)
+        last_key = None
+        count = 0
+        for key, value in items:
+            if last_key is not None and key <= last_key:
+                raise ValueError(f"Claves no ordenadas o repetidas: {last_key!r}, {key!r}")
+            self._check_entry(key, value)
+            if len(current.keys) == leaf_size:
+                if previous is not None:
+                    self._write_node(previous)
+                    level.append((previous.keys[0], previous.page))
+                previous, current = current, self._append_node(True, spare)
+                previous.next = current.page
+            current.keys.append(key)
+            current.values.append(value)
+            last_key = key
+            count += 1
+
+        # La última hoja puede quedar bajo el mínimo: se reparte con la anterior o se fusiona
+        if previous is not None and len(current.keys) < self.min_keys:
+            keys = previous.keys + current.keys
+            values = previous.values + current.values
+            if len(keys) <= self.order - 1:
+                previous.keys, previous.values, previous.next = keys, values, NO_PAGE
+                spare.append(current.page)  # La página sin usar se libera al terminar
+                current = None
+            else:
+                half = len(keys) // 2
+                previous.keys, current.keys = keys[:half], keys[half:]
+                previous.values, current.values = values[:half], values[half:]
+        for node in (previous, current):
+            if node is not None:
+                self._write_node(node)
+                level.append((node.keys[0] if node.keys else "", node.page))
+
+        # Niveles internos: grupos de fanout hijos hasta que quede una sola raíz
+        while len(level) > 1:
+            groups = [level[i:i + fanout] for i in range(0, len(level), fanout)]
+            if len(groups) > 1 and len(groups[-1]) < self.min_keys + 1:
+                children = groups[-2] + groups.pop()
+                if len(children) <= self.order:
+                    groups[-1] = children
+                else:
+                    half = len(children) // 2
+                    groups[-1:] = [children[:half], children[half:]]
+            level = []
+            for group in groups:
+                node = self._append_node(False, spare)
+                node.keys = [first_key for first_key, _ in group[1:]]
+                node.children = [page for _, page in group]
+                self._write_node(node)
+                level.append((group[0][0], node.page))
+        return level[0][1], count
+
+    def _split_child(self, parent, child_index, child):
+        """Divide child en dos y agrega el separador a parent (que se escribe después)"""
+        mid = len(child.keys) // 2
+        right = self._alloc_node(child.leaf)
+        if child.leaf:
+            # La hoja derecha conserva todas sus claves; el padre recibe una copia de la primera
+            right.keys = child.keys[mid:]
+            right.values = child.values[mid:]
+            right.next = child.next
+            child.next = right.page
+            separator = right.keys[0]
+            del child.values[mid:]
+        else:
+            right.keys = child.keys[mid + 1:]
+            right.children = child.children[mid + 1:]
+            separator = child.keys[mid]
+            del child.children[mid + 1:]
+        del child.keys[mid:]
+
+        parent.keys.insert(child_index, separator)
+        parent.children.insert(child_index + 1, right.page)
+        self._write_node(child)
+        self._write_node(right)
+        self.splits += 1
+
+    def delete(self, key):
+        """Elimina una clave; retorna True si existía"""
+        self._sync()
+        path = []
+        node = self._find_leaf(key, path)
+        i = bisect_left(node.keys, key)
+        if i == len(node.keys) or node.keys[i] != key:
+            return False
+
+        # Los separadores que copian la clave borrada siguen siendo cotas válidas
+        node.keys.pop(i)
+        node.values.pop(i)
+        self.keys_count -= 1
+
+        # Reparar hacia arriba los nodos con menos claves que el mínimo
+        while node is not None and path and len(node.keys) < self.min_keys:
+            parent, child_index = path.pop()
+            node = parent if self._fill_child(parent, child_index, node) else None
+        if node is not None:
+            self._write_node(node)
+
+        # Si la raíz se queda sin claves, su único hijo pasa a ser la raíz
+        root = self._read_node(self.root)
+        if not root.keys and not root.leaf:
+            self.root = root.children[0]
+            self._free_page(root.page)
+        self._commit()
+        return True
+
+    def _fill_child(self, parent, child_index, child):
+        """Repara un hijo con pocas claves; retorna True si hubo fusión (parent queda sin escribir)"""
+        if child_index > 0:
+            left = self._read_node(parent.children[child_index - 1])
+            if len(left.keys) > self.min_keys:
+                if child.leaf:
+                    child.keys.insert(0, left.keys.pop())
+                    child.values.insert(0, left.values.pop())
+                    parent.keys[child_index - 1] = child.keys[0]
+                else:
+                    child.keys.insert(0, parent.keys[child_index - 1])
+                    parent.keys[child_index - 1] = left.keys.pop()
+                    child.children.insert(0, left.children.pop())
+                for node in (left, child, parent):
+                    self._write_node(node)
+                return False
+        if child_index < len(parent.children) - 1:
+            right = self._read_node(parent.children[child_index + 1])
+            if len(right.keys) > self.min_keys:
+                if child.leaf:
+                    child.keys.append(right.keys.pop(0))
+                    child.values.append(right.values.pop(0))
+                    parent.keys[child_index] = right.keys[0]
+                else:
+                    child.keys.append(parent.keys[child_index])
+                    parent.keys[child_index] = right.keys.pop(0)
+                    child.children.append(right.children.pop(0))
+                for node in (right, child, parent):
+                    self._write_node(node)
+                return False
+
+        # Fusionar con un hermano: el de la izquierda absorbe al de la derecha
+        if child_index > 0:
+            left_index, left_node, right_node = child_index - 1, left, child
+        else:
+            left_index, left_node, right_node = child_index, child, right
+        separator = parent.keys.pop(left_index)
+        if left_node.leaf:
+            left_node.values.extend(right_node.values)
+            left_node.next = right_node.next
+        else:
+            left_node.keys.append(separator)
+            left_node.children.extend(right_node.children)
+        left_node.keys.extend(right_node.keys)
+        parent.children.pop(left_index + 1)
+        self._write_node(left_node)
+        self._free_page(right_node.page)
+        self.merges += 1
+        return True
+
+    def range(self, start=None, end=None):
+        """Genera (clave, valor) con start <= clave <= end en orden, siguiendo el enlace entre hojas
+
+        None deja el extremo abierto. Las hojas se leen a medida que se consumen.
+        """
+        self._sync()
+        if start is None:
+            node = self._read_node(self.root)
+            while not node.leaf:
+                node = self._read_node(node.children[0])
+            i = 0
+        else:
+            node = self._find_leaf(start)
+            i = bisect_left(node.keys, start)
+        while True:
+            # Copias: el consumidor puede modificar el árbol entre dos valores
+            keys, values, next_page = list(node.keys), list(node.values), node.next
+            for j in range(i, len(keys)):
+                if end is not None and keys[j] > end:
+                    return
+                yield keys[j], values[j]
+            if next_page == NO_PAGE:
+                return
+            node = self._read_node(next_page)
+            i = 0
+
+    def prefix(self, prefix):
+        """Genera (clave, valor) de las claves que empiezan con prefix, en orden"""
+        for key, value in self.range(prefix):
+            if not key.startswith(prefix):
+                return
+            yield key, value
+
+    def iter_items(self):
+        """Genera (clave, valor) en orden recorriendo las hojas enlazadas"""
+        return self.range()
+
+    def get_all_entries(self):
+        """Obtiene todas las entradas ordenadas"""
+        return list(self.iter_items())
+
+    def get_height(self):
+        """Calcula la altura (0 si está vacío)"""
+        self._sync()
+        node = self._read_node(self.root)
+        if node.leaf and not node.keys:
+            return 0
+        height = 1
+        while not node.leaf:
+            node = self._read_node(node.children[0])
+            height += 1
+        return height
+
+    def get_stats(self):
+        """Obtiene estadísticas del índice y de su caché de páginas"""
+        height = self.get_height()
+        free_pages = len(self._free_pages())
+        return {
+            "order": self.order,
+            "height": height,
+            "nodes": self.page_count - 1 - free_pages,
+            "keys": self.keys_count,
+            "splits": self.splits,
+            "merges": self.merges,
+            "page_size": self.page_size,
+            "pages": self.page_count,
+            "free_pages": free_pages,
+            "page_reads": self.page_reads,
+            "page_writes": self.page_writes,
+            "cache": self.cache.get_stats()
+        }
+
+    def __len__(self):
+        """Retorna el número de claves"""
+        self._sync()
+        return self.keys_count
+
+    def close(self):
+        """Cierra el archivo del índice"""
+        if not self._file.closed:
+            self._file.close()
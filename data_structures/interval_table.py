@@ -0,0 +1,87 @@
+"""
+Implementación de tabla de intervalos desde cero para longest prefix match
+por lotes sobre direcciones IPv4
+
+Aplana un conjunto de prefijos anidados en intervalos disjuntos del espacio
+de direcciones: `starts[i]` es el inicio del intervalo i e `ids[i]` el índice
+en `values` del prefijo más largo que lo cubre (-1 si ninguno). Una búsqueda
+es una búsqueda binaria sobre `starts`; con NumPy disponible, un lote
+completo se resuelve con una sola llamada vectorizada a `searchsorted`.
+"""
+
+from array import array
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa bisect por dirección
+    np = None
+
+NO_MATCH = -1
+
+class IntervalTable:
+    """Tabla de intervalos de solo lectura; se reconstruye con build()"""
+
+    def __init__(self, prefixes=(), width=32):
+        self.width = width
+        self.starts = array('I' if width <= 32 else 'Q')
+        self.ids = array('i')
+        self.values = []
+        self._np_starts = None
+        self._np_ids = None
+        self.build(prefixes)
+
+    def build(self, prefixes):
+        """Aplana prefijos (key, length, value) ordenados por dirección y luego por longitud"""
+        width = self.width
+        starts = array(self.starts.typecode)
+        ids = array('i')
+        values = []
+
+        def emit(start, value_id):
+            # Un intervalo que empieza donde otro empezó lo reemplaza
+            if starts and starts[-1] == start:
+                ids[-1] = value_id
+            elif not ids or ids[-1] != value_id:
+                starts.append(start)
+                ids.append(value_id)
+
+        emit(0, NO_MATCH)
+        open_prefixes = []  # (último address, id) de los prefijos que contienen al actual
+        for key, length, value in prefixes:
+            # Cerrar los prefijos que terminan antes de este
+            while open_prefixes and open_prefixes[-1][0] < key:
+                end = open_prefixes.pop()[0]
+                emit(end + 1, open_prefixes[-1][1] if open_prefixes else NO_MATCH)
+            values.append(value)
+            emit(key, len(values) - 1)
+            open_prefixes.append((key + (1 << (width - length)) - 1, len(values) - 1))
+
+        while open_prefixes:
+            end = open_prefixes.pop()[0]
+            if end + 1 < (1 << width):
+                emit(end + 1, open_prefixes[-1][1] if open_prefixes else NO_MATCH)
+
+        self.starts = starts
+        self.ids = ids
+        self.values = values
+        if np is not None:
+            self._np_starts = np.frombuffer(starts, dtype=np.uint32 if width <= 32 else np.uint64)
+            self._np_ids = np.frombuffer(ids, dtype=np.int32)
+
+    def lookup(self, address):
+        """Retorna el índice en values del prefijo más largo que contiene address, o -1"""
+        return self.ids[bisect_right(self.starts, address) - 1]
+
+    def lookup_many(self, addresses):
+        """Índices en values para un lote de direcciones enteras (arreglo NumPy si está disponible)"""
+        if np is not None:
+            addresses = np.asarray(addresses, dtype=self._np_starts.dtype)
+            return self._np_ids[np.searchsorted(self._np_starts, addresses, side='right') - 1]
+
+        starts, ids = self.starts, self.ids
+        return array('i', [ids[bisect_right(starts, address) - 1] for address in addresses])
+
+    def __len__(self):
+        """Retorna el número de intervalos"""
+        return len(self.starts)
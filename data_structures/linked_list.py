@@ -4,39 +4,58 @@ Implementación de Lista Enlazada desde cero
 
 class Node:
     """Nodo de la lista enlazada"""
+    __slots__ = ("data", "next")
+
     def __init__(self, data):
         self.data = data
         self.next = None
 
+class DoublyNode(Node):
+    """Nodo con referencia al anterior (modo doblemente enlazado)"""
+    __slots__ = ("prev",)
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.prev = None
+
 class LinkedList:
-    """Lista enlazada simple"""
+    """Lista enlazada simple (o doble) con referencia a la cola"""
 
-    def __init__(self):
+    def __init__(self, doubly=False):
         self.head = None
+        self.tail = None
         self.size = 0
+        self.doubly = doubly
+        self._node_class = DoublyNode if doubly else Node
 
     def is_empty(self):
         """Verifica si la lista está vacía"""
         return self.head is None
 
     def append(self, data):
-        """Agrega un elemento al final de la lista"""
-        new_node = Node(data)
-        if self.is_empty():
+        """Agrega un elemento al final de la lista y retorna su nodo"""
+        new_node = self._node_class(data)
+        if self.tail is None:
             self.head = new_node
         else:
-            current = self.head
-            while current.next:
-                current = current.next
-            current.next = new_node
+            if self.doubly:
+                new_node.prev = self.tail
+            self.tail.next = new_node
+        self.tail = new_node
         self.size += 1
+        return new_node
 
     def prepend(self, data):
-        """Agrega un elemento al inicio de la lista"""
-        new_node = Node(data)
+        """Agrega un elemento al inicio de la lista y retorna su nodo"""
+        new_node = self._node_class(data)
         new_node.next = self.head
+        if self.head is None:
+            self.tail = new_node
+        elif self.doubly:
+            self.head.prev = new_node
         self.head = new_node
         self.size += 1
+        return new_node
 
     def insert_at(self, index, data):
         """Inserta un elemento en una posición específica"""
@@ -44,48 +63,114 @@ class LinkedList:
             raise IndexError("Índice fuera de rango")
 
         if index == 0:
-            self.prepend(data)
-            return
+            return self.prepend(data)
+        if index == self.size:
+            return self.append(data)
 
-        new_node = Node(data)
+        new_node = self._node_class(data)
         current = self.head
         for i in range(index - 1):
             current = current.next
 
         new_node.next = current.next
+        if self.doubly:
+            new_node.prev = current
+            current.next.prev = new_node
         current.next = new_node
         self.size += 1
+        return new_node
+
+    def _unlink(self, node, previous):
+        """Desenlaza un nodo dado su predecesor (None si es la cabeza)"""
+        if previous is None:
+            self.head = node.next
+        else:
+            previous.next = node.next
+
+        if node.next is None:
+            self.tail = previous
+        elif self.doubly:
+            node.next.prev = previous
+
+        node.next = None
+        if self.doubly:
+            node.prev = None
+        self.size -= 1
+        return node.data
 
     def remove_at(self, index):
         """Remueve un elemento en una posición específica"""
         if index < 0 or index >= self.size:
             raise IndexError("Índice fuera de rango")
 
-        if index == 0:
-            data = self.head.data
-            self.head = self.head.next
-            self.size -= 1
-            return data
+        previous = None
+        current = self.head
+        for i in range(index):
+            previous = current
+            current = current.next
+
+        return self._unlink(current, previous)
+
+    def remove_node(self, node):
+        """Remueve un nodo conocido: O(1) en modo doble, O(n) en modo simple"""
+        if self.doubly:
+            return self._unlink(node, node.prev)
 
+        previous = None
         current = self.head
-        for i in range(index - 1):
+        while current is not None and current is not node:
+            previous = current
             current = current.next
 
-        data = current.next.data
-        current.next = current.next.next
-        self.size -= 1
-        return data
+        if current is None:
+            raise ValueError("El nodo no pertenece a la lista")
+        return self._unlink(current, previous)
+
+    def move_to_end(self, node):
+        """Mueve un nodo conocido al final de la lista: O(1) en modo doble"""
+        if node is self.tail:
+            return
+        self.remove_node(node)
+        if self.doubly:
+            node.prev = self.tail
+        self.tail.next = node
+        self.tail = node
+        self.size += 1
+
+    def remove(self, data):
+        """Remueve la primera aparición de un elemento en un solo recorrido"""
+        previous = None
+        current = self.head
+        while current:
+            if current.data == data:
+                self._unlink(current, previous)
+                return True
+            previous = current
+            current = current.next
+        return False
 
     def get(self, index):
         """Obtiene el elemento en una posición específica"""
         if index < 0 or index >= self.size:
             raise IndexError("Índice fuera de rango")
 
+        if index == self.size - 1:
+            return self.tail.data
+
         current = self.head
         for i in range(index):
             current = current.next
         return current.data
 
+    def find_node(self, data):
+        """Encuentra el primer nodo que contiene un elemento"""
+        current = self.head
+        while current:
+            if current.data == data:
+                return current
+            current = current.next
+        return None
+
     def index_of(self, data):
         """Encuentra el índice de un elemento"""
         current = self.head
@@ -99,11 +184,12 @@ class LinkedList:
 
     def contains(self, data):
         """Verifica si un elemento existe en la lista"""
-        return self.index_of(data) != -1
+        return self.find_node(data) is not None
 
     def clear(self):
         """Limpia la lista"""
         self.head = None
+        self.tail = None
         self.size = 0
 
     def __len__(self):
@@ -0,0 +1,74 @@
+"""
+Implementación de caché LRU desde cero: diccionario para acceso O(1) y
+lista doblemente enlazada para el orden de uso
+"""
+
+from .linked_list import LinkedList
+
+class LRUCache:
+    """Caché acotada que desaloja la entrada usada hace más tiempo"""
+
+    def __init__(self, capacity=1024):
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser mayor que cero")
+        self.capacity = capacity
+        self._nodes = {}  # Clave -> nodo de la lista con data = (clave, valor)
+        self._order = LinkedList(doubly=True)  # Cabeza = menos reciente
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Obtiene un valor y lo marca como el más reciente"""
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._order.move_to_end(node)
+        return node.data[1]
+
+    def put(self, key, value):
+        """Agrega o actualiza un valor; desaloja el menos reciente si está lleno"""
+        node = self._nodes.get(key)
+        if node is not None:
+            node.data = (key, value)
+            self._order.move_to_end(node)
+            return
+
+        self._nodes[key] = self._order.append((key, value))
+        if len(self._nodes) > self.capacity:
+            oldest_key = self._order.remove_node(self._order.head)[0]
+            del self._nodes[oldest_key]
+            self.evictions += 1
+
+    def remove(self, key):
+        """Elimina una entrada; retorna True si existía"""
+        node = self._nodes.pop(key, None)
+        if node is None:
+            return False
+        self._order.remove_node(node)
+        return True
+
+    def clear(self):
+        """Vacía la caché conservando los contadores"""
+        self._nodes = {}
+        self._order.clear()
+
+    def get_stats(self):
+        """Obtiene estadísticas de uso de la caché"""
+        return {
+            "size": len(self._nodes),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def __contains__(self, key):
+        """Verifica si una clave está en caché sin alterar el orden"""
+        return key in self._nodes
+
+    def __len__(self):
+        """Retorna el número de entradas"""
+        return len(self._nodes)
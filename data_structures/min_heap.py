@@ -0,0 +1,68 @@
+"""
+Implementación de Min-Heap binario desde cero sobre una lista
+
+El elemento en la posición i tiene sus hijos en 2i+1 y 2i+2; push y pop
+restauran la propiedad de heap con un recorrido de a lo sumo O(log n) niveles.
+Los elementos se comparan con `<`, así tuplas (prioridad, desempate, dato)
+funcionan directamente.
+"""
+
+class MinHeap:
+    """Cola de prioridad que extrae siempre el menor elemento"""
+
+    def __init__(self):
+        self._items = []
+
+    def push(self, item):
+        """Agrega un elemento en O(log n)"""
+        items = self._items
+        items.append(item)
+        # Subir el elemento mientras sea menor que su padre
+        i = len(items) - 1
+        while i > 0:
+            parent = (i - 1) // 2
+            if not item < items[parent]:
+                break
+            items[i] = items[parent]
+            i = parent
+        items[i] = item
+
+    def pop(self):
+        """Extrae el menor elemento en O(log n)"""
+        items = self._items
+        if not items:
+            raise IndexError("El heap está vacío")
+        smallest = items[0]
+        last = items.pop()
+        if items:
+            # Bajar el último elemento desde la raíz hasta su lugar
+            size = len(items)
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size and items[child + 1] < items[child]:
+                    child += 1
+                if not items[child] < last:
+                    break
+                items[i] = items[child]
+                i = child
+            items[i] = last
+        return smallest
+
+    def peek(self):
+        """Retorna el menor elemento sin extraerlo (None si está vacío)"""
+        return self._items[0] if self._items else None
+
+    def is_empty(self):
+        """Verifica si el heap está vacío"""
+        return not self._items
+
+    def clear(self):
+        """Elimina todos los elementos"""
+        self._items = []
+
+    def __len__(self):
+        """Retorna el número de elementos"""
+        return len(self._items)
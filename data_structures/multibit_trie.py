@@ -0,0 +1,232 @@
+"""
+Implementación de trie multibit (stride configurable) desde cero para
+longest prefix match sobre direcciones enteras de 32 (IPv4) o 128 (IPv6) bits
+
+Cada nodo consume `stride` bits de la dirección con un arreglo de
+2**stride entradas. Los prefijos cuya longitud no es múltiplo del stride se
+expanden (controlled prefix expansion) a todas las entradas que cubren, así
+una búsqueda visita como máximo width / stride nodos: 4 para IPv4 y 16 para
+IPv6 con stride 8, 32 para IPv6 con stride 4.
+"""
+
+class MultibitNode:
+    """Nodo del trie: entradas expandidas, hijos y los prefijos originales del nivel"""
+    __slots__ = ("entries", "children", "prefixes", "child_count")
+
+    def __init__(self, fanout):
+        self.entries = [None] * fanout  # (key, length, value) del prefijo más largo por entrada
+        self.children = None  # Se crea al agregar el primer hijo
+        self.prefixes = {}  # (key, length) -> value, para recalcular entradas al borrar
+        self.child_count = 0
+
+class MultibitTrie:
+    """Trie multibit para prefijos de `width` bits con nodos de `stride` bits"""
+
+    def __init__(self, width=32, stride=8):
+        if stride < 1 or width % stride:
+            raise ValueError(f"El stride {stride} debe dividir el ancho {width}")
+        self.width = width
+        self.stride = stride
+        self.fanout = 1 << stride
+        self.levels = width // stride
+        self.root = None
+        self.default = None  # Prefijo /0 como (0, 0, value)
+        self.prefix_count = 0
+        self.node_count = 0
+
+    def _mask(self, length):
+        """Máscara de red de `length` bits"""
+        return ((1 << length) - 1) << (self.width - length)
+
+    def _chunk(self, key, level):
+        """Índice de la entrada de key en el nodo del nivel dado"""
+        return (key >> (self.width - self.stride * (level + 1))) & (self.fanout - 1)
+
+    def _span(self, key, length):
+        """Retorna (nivel, primera entrada, cantidad de entradas) que ocupa el prefijo"""
+        level = (length - 1) // self.stride
+        return level, self._chunk(key, level), 1 << (self.stride * (level + 1) - length)
+
+    def insert(self, key, length, value=None):
+        """Inserta o actualiza el prefijo key/length; retorna True si es nuevo"""
+        if length < 0 or length > self.width:
+            raise ValueError(f"Longitud de prefijo inválida: {length}")
+        key &= self._mask(length)
+
+        if length == 0:
+            is_new = self.default is None
+            self.default = (0, 0, value)
+            if is_new:
+                self.prefix_count += 1
+            return is_new
+
+        if self.root is None:
+            self.root = MultibitNode(self.fanout)
+            self.node_count += 1
+
+        level, first, count = self._span(key, length)
+        node = self.root
+        for depth in range(level):
+            index = self._chunk(key, depth)
+            if node.children is None:
+                node.children = [None] * self.fanout
+            child = node.children[index]
+            if child is None:
+                child = node.children[index] = MultibitNode(self.fanout)
+                node.child_count += 1
+                self.node_count += 1
+            node = child
+
+        is_new = (key, length) not in node.prefixes
+        node.prefixes[(key, length)] = value
+        if is_new:
+            self.prefix_count += 1
+
+        # Expansión: cada entrada conserva el prefijo más largo que la cubre
+        entry = (key, length, value)
+        entries = node.entries
+        for index in range(first, first + count):
+            current = entries[index]
+            if current is None or current[1] <= length:
+                entries[index] = entry
+        return is_new
+
+    def _find(self, key, length):
+        """Retorna (camino de (nodo, índice), nodo del prefijo) o (camino, None)"""
+        level = (length - 1) // self.stride
+        path = []
+        node = self.root
+        for depth in range(level):
+            if node is None or node.children is None:
+                return path, None
+            index = self._chunk(key, depth)
+            path.append((node, index))
+            node = node.children[index]
+        return path, node
+
+    def exact(self, key, length):
+        """Retorna el valor del prefijo exacto key/length o None"""
+        key &= self._mask(length)
+        if length == 0:
+            return self.default[2] if self.default is not None else None
+        node = self._find(key, length)[1]
+        if node is None:
+            return None
+        return node.prefixes.get((key, length))
+
+    def delete(self, key, length):
+        """Elimina el prefijo key/length; retorna True si existía"""
+        if length < 0 or length > self.width:
+            return False
+        key &= self._mask(length)
+        if length == 0:
+            if self.default is None:
+                return False
+            self.default = None
+            self.prefix_count -= 1
+            return True
+
+        path, node = self._find(key, length)
+        if node is None or (key, length) not in node.prefixes:
+            return False
+        del node.prefixes[(key, length)]
+        self.prefix_count -= 1
+
+        # Recalcular las entradas que cubría con los prefijos restantes del nodo
+        level, first, count = self._span(key, length)
+        last = first + count
+        entries = node.entries
+        for index in range(first, last):
+            entries[index] = None
+        for (other_key, other_length), value in node.prefixes.items():
+            other_first, other_count = self._span(other_key, other_length)[1:]
+            low = max(first, other_first)
+            high = min(last, other_first + other_count)
+            for index in range(low, high):
+                current = entries[index]
+                if current is None or current[1] <= other_length:
+                    entries[index] = (other_key, other_length, value)
+
+        # Podar los nodos que quedaron sin prefijos ni hijos
+        while not node.prefixes and node.child_count == 0:
+            self.node_count -= 1
+            if not path:
+                self.root = None
+                break
+            parent, index = path.pop()
+            parent.children[index] = None
+            parent.child_count -= 1
+            node = parent
+        return True
+
+    def longest_match(self, address):
+        """Retorna (key, length, value) del prefijo más largo que contiene address, o None"""
+        best = self.default
+        node = self.root
+        shift = self.width
+        stride = self.stride
+        index_mask = self.fanout - 1
+        while node is not None:
+            shift -= stride
+            index = (address >> shift) & index_mask
+            entry = node.entries[index]
+            if entry is not None:
+                best = entry
+            children = node.children
+            if children is None:
+                break
+            node = children[index]
+        return best
+
+    def items(self):
+        """Genera (key, length, value) ordenados por dirección y luego por longitud"""
+        found = [self.default] if self.default is not None else []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            found.extend((key, length, value) for (key, length), value in node.prefixes.items())
+            if node.children is not None:
+                stack.extend(child for child in node.children if child is not None)
+        found.sort(key=lambda item: (item[0], item[1]))
+        return iter(found)
+
+    def compact(self):
+        """Elimina nodos sin prefijos ni hijos y listas de hijos vacías; retorna cuántos nodos se liberaron"""
+        before = self.node_count
+        if self.root is not None and self._prune(self.root):
+            self.root = None
+            self.node_count -= 1
+        return before - self.node_count
+
+    def _prune(self, node):
+        """Poda los hijos de node; retorna True si node quedó vacío"""
+        if node.children is not None:
+            for index, child in enumerate(node.children):
+                if child is not None and self._prune(child):
+                    node.children[index] = None
+                    node.child_count -= 1
+                    self.node_count -= 1
+            if node.child_count == 0:
+                node.children = None
+        return not node.prefixes and node.children is None
+
+    def clear(self):
+        """Elimina todos los prefijos"""
+        self.root = None
+        self.default = None
+        self.prefix_count = 0
+        self.node_count = 0
+
+    def get_stats(self):
+        """Obtiene estadísticas del trie"""
+        return {
+            "prefixes": self.prefix_count,
+            "nodes": self.node_count,
+            "width": self.width,
+            "stride": self.stride,
+            "levels": self.levels
+        }
+
+    def __len__(self):
+        """Retorna el número de prefijos almacenados"""
+        return self.prefix_count
@@ -0,0 +1,220 @@
+"""
+Implementación de Trie Patricia (radix binario con compresión de caminos)
+desde cero para longest prefix match sobre direcciones enteras
+"""
+
+class PatriciaNode:
+    """Nodo del trie: prefijo (key, length) y dos hijos según el bit siguiente"""
+    __slots__ = ("key", "length", "value", "has_value", "children")
+
+    def __init__(self, key, length, value=None, has_value=False):
+        self.key = key
+        self.length = length
+        self.value = value
+        self.has_value = has_value
+        self.children = [None, None]
+
+class PatriciaTrie:
+    """Trie Patricia de bits para prefijos de `width` bits (32 = IPv4, 128 = IPv6)
+
+    Solo existen nodos para los prefijos almacenados y para las bifurcaciones
+    entre ellos, por lo que una búsqueda recorre como máximo `width` niveles
+    y normalmente muchos menos.
+    """
+
+    def __init__(self, width=32):
+        self.width = width
+        self.root = None
+        self.prefix_count = 0
+        self.node_count = 0
+
+    def _mask(self, length):
+        """Máscara de red de `length` bits"""
+        return ((1 << length) - 1) << (self.width - length)
+
+    def _bit(self, key, position):
+        """Bit de key en la posición dada (0 = más significativo)"""
+        return (key >> (self.width - 1 - position)) & 1
+
+    def _replace_child(self, parent, old, new):
+        """Sustituye old por new bajo parent (o en la raíz)"""
+        if parent is None:
+            self.root = new
+        elif parent.children[0] is old:
+            parent.children[0] = new
+        else:
+            parent.children[1] = new
+
+    def insert(self, key, length, value=None):
+        """Inserta o actualiza el prefijo key/length; retorna True si es nuevo"""
+        if length < 0 or length > self.width:
+            raise ValueError(f"Longitud de prefijo inválida: {length}")
+        width = self.width
+        key &= self._mask(length)
+
+        parent = None
+        node = self.root
+        while node is not None:
+            # Longitud del prefijo común entre key/length y el nodo
+            diff = key ^ node.key
+            common = width - diff.bit_length()
+            if common > length:
+                common = length
+            if common > node.length:
+                common = node.length
+
+            if common < node.length:
+                if common == length:
+                    # El nuevo prefijo es ancestro del nodo
+                    new = PatriciaNode(key, length, value, True)
+                    new.children[self._bit(node.key, length)] = node
+                    self.node_count += 1
+                else:
+                    # Bifurcación: nodo intermedio sin valor con ambos hijos
+                    new = PatriciaNode(key & self._mask(common), common)
+                    leaf = PatriciaNode(key, length, value, True)
+                    new.children[self._bit(key, common)] = leaf
+                    new.children[self._bit(node.key, common)] = node
+                    self.node_count += 2
+                self._replace_child(parent, node, new)
+                self.prefix_count += 1
+                return True
+
+            if length == node.length:
+                is_new = not node.has_value
+                node.value = value
+                node.has_value = True
+                if is_new:
+                    self.prefix_count += 1
+                return is_new
+
+            bit = (key >> (width - 1 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = PatriciaNode(key, length, value, True)
+                self.node_count += 1
+                self.prefix_count += 1
+                return True
+            parent, node = node, child
+
+        self.root = PatriciaNode(key, length, value, True)
+        self.node_count += 1
+        self.prefix_count += 1
+        return True
+
+    def _find(self, key, length):
+        """Retorna (camino de ancestros, nodo) del prefijo exacto o (camino, None)"""
+        width = self.width
+        key &= self._mask(length)
+        path = []
+        node = self.root
+        while node is not None:
+            if node.length > length or (key ^ node.key) >> (width - node.length):
+                return path, None
+            if node.length == length:
+                return path, node
+            path.append(node)
+            node = node.children[(key >> (width - 1 - node.length)) & 1]
+        return path, None
+
+    def exact(self, key, length):
+        """Retorna el valor del prefijo exacto key/length o None"""
+        node = self._find(key, length)[1]
+        if node is None or not node.has_value:
+            return None
+        return node.value
+
+    def delete(self, key, length):
+        """Elimina el prefijo key/length; retorna True si existía"""
+        path, node = self._find(key, length)
+        if node is None or not node.has_value:
+            return False
+
+        node.value = None
+        node.has_value = False
+        self.prefix_count -= 1
+        self._compact(path, node)
+        return True
+
+    def _compact(self, path, node):
+        """Elimina nodos sin valor que ya no bifurcan"""
+        while node is not None and not node.has_value:
+            parent = path.pop() if path else None
+            left, right = node.children
+            if left is not None and right is not None:
+                return  # Sigue siendo una bifurcación
+
+            self._replace_child(parent, node, left if left is not None else right)
+            self.node_count -= 1
+            if left is not None or right is not None:
+                return
+            # El padre perdió un hijo: puede haber quedado como nodo inútil
+            node = parent
+
+    def longest_match(self, address):
+        """Retorna (key, length, value) del prefijo más largo que contiene address, o None"""
+        width = self.width
+        best = None
+        node = self.root
+        while node is not None:
+            length = node.length
+            if (address ^ node.key) >> (width - length):
+                break
+            if node.has_value:
+                best = node
+            if length == width:
+                break
+            node = node.children[(address >> (width - 1 - length)) & 1]
+
+        if best is None:
+            return None
+        return best.key, best.length, best.value
+
+    def items(self):
+        """Genera (key, length, value) ordenados por dirección y luego por longitud"""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.has_value:
+                yield node.key, node.length, node.value
+            left, right = node.children
+            if right is not None:
+                stack.append(right)
+            if left is not None:
+                stack.append(left)
+
+    def compact(self):
+        """Elimina nodos sin valor que no bifurcan; retorna cuántos nodos se liberaron"""
+        before = self.node_count
+        self.root = self._prune(self.root)
+        return before - self.node_count
+
+    def _prune(self, node):
+        """Poda el subárbol de node y retorna su nueva raíz"""
+        if node is None:
+            return None
+        node.children[0] = self._prune(node.children[0])
+        node.children[1] = self._prune(node.children[1])
+        left, right = node.children
+        if node.has_value or (left is not None and right is not None):
+            return node
+        self.node_count -= 1
+        return left if left is not None else right
+
+    def clear(self):
+        """Elimina todos los prefijos"""
+        self.root = None
+        self.prefix_count = 0
+        self.node_count = 0
+
+    def get_stats(self):
+        """Obtiene estadísticas del trie"""
+        return {
+            "prefixes": self.prefix_count,
+            "nodes": self.node_count,
+            "width": self.width
+        }
+
+    def __len__(self):
+        """Retorna el número de prefijos almacenados"""
+        return self.prefix_count
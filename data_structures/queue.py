@@ -1,47 +1,118 @@
 """
-Implementación de Cola desde cero usando lista enlazada
+Implementación de Cola desde cero usando un buffer circular (ring buffer)
 """
 
-from .linked_list import LinkedList
-
 class Queue:
-    """Cola FIFO (First In, First Out)"""
+    """Cola FIFO (First In, First Out) sobre un arreglo circular redimensionable"""
+
+    MIN_CAPACITY = 8
+
+    def __init__(self, capacity=MIN_CAPACITY):
+        self._capacity = max(capacity, self.MIN_CAPACITY)
+        self._buffer = [None] * self._capacity
+        self._head = 0  # Índice del frente de la cola
+        self._count = 0
 
-    def __init__(self):
-        self.items = LinkedList()
+    def _grow(self):
+        """Duplica la capacidad del buffer manteniendo el orden FIFO"""
+        old = self._buffer
+        old_capacity = self._capacity
+        head = self._head
+
+        # Copiar los elementos en orden al inicio del nuevo buffer
+        new_buffer = old[head:] + old[:head]
+        new_buffer.extend([None] * old_capacity)
+
+        self._buffer = new_buffer
+        self._capacity = old_capacity * 2
+        self._head = 0
 
     def is_empty(self):
         """Verifica si la cola está vacía"""
-        return self.items.is_empty()
+        return self._count == 0
 
     def enqueue(self, item):
         """Agrega un elemento al final de la cola"""
-        self.items.append(item)
+        if self._count == self._capacity:
+            self._grow()
+        self._buffer[(self._head + self._count) % self._capacity] = item
+        self._count += 1
+
+    def enqueue_many(self, items):
+        """Agrega varios elementos al final de la cola en orden"""
+        for item in items:
+            if self._count == self._capacity:
+                self._grow()
+            self._buffer[(self._head + self._count) % self._capacity] = item
+            self._count += 1
 
     def dequeue(self):
         """Remueve y retorna el elemento del frente de la cola"""
-        if self.is_empty():
+        if self._count == 0:
             raise IndexError("La cola está vacía")
-        return self.items.remove_at(0)
+        item = self._buffer[self._head]
+        self._buffer[self._head] = None  # Liberar referencia
+        self._head = (self._head + 1) % self._capacity
+        self._count -= 1
+        return item
+
+    def drain(self, n=None):
+        """Remueve y retorna hasta n elementos del frente (todos si n es None)"""
+        count = self._count if n is None else min(n, self._count)
+        if count <= 0:
+            return []
+
+        head = self._head
+        end = head + count
+        buffer = self._buffer
+
+        if end <= self._capacity:
+            batch = buffer[head:end]
+            buffer[head:end] = [None] * count
+        else:
+            # El lote da la vuelta al final del buffer
+            wrap = end - self._capacity
+            batch = buffer[head:] + buffer[:wrap]
+            buffer[head:] = [None] * (self._capacity - head)
+            buffer[:wrap] = [None] * wrap
+
+        self._head = end % self._capacity
+        self._count -= count
+        if self._count == 0:
+            self._head = 0
+        return batch
 
     def peek(self):
         """Retorna el elemento del frente sin removerlo"""
-        if self.is_empty():
+        if self._count == 0:
             raise IndexError("La cola está vacía")
-        return self.items.get(0)
+        return self._buffer[self._head]
 
     def size(self):
         """Retorna el tamaño de la cola"""
-        return len(self.items)
+        return self._count
 
     def clear(self):
         """Limpia la cola"""
-        self.items.clear()
+        self._capacity = self.MIN_CAPACITY
+        self._buffer = [None] * self._capacity
+        self._head = 0
+        self._count = 0
+
+    def __iter__(self):
+        """Itera del frente al final sin modificar la cola"""
+        buffer = self._buffer
+        capacity = self._capacity
+        head = self._head
+        for i in range(self._count):
+            yield buffer[(head + i) % capacity]
 
     def __str__(self):
         """Representación en string de la cola"""
-        return f"Queue({self.items})"
+        if self._count == 0:
+            return "Queue([])"
+        return "Queue([" + " -> ".join(str(item) for item in self) + "])"
 
     def __len__(self):
         """Retorna el tamaño de la cola"""
-        return self.size()
+        return self._count
@@ -0,0 +1,70 @@
+"""
+Implementación de Buffer Circular de capacidad fija desde cero
+"""
+
+class RingBuffer:
+    """Buffer circular acotado: al llenarse sobrescribe el elemento más antiguo"""
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser mayor que cero")
+        self.capacity = capacity
+        self._buffer = [None] * capacity
+        self._start = 0  # Índice del elemento más antiguo
+        self._count = 0
+
+    def is_empty(self):
+        """Verifica si el buffer está vacío"""
+        return self._count == 0
+
+    def is_full(self):
+        """Verifica si el buffer alcanzó su capacidad"""
+        return self._count == self.capacity
+
+    def append(self, item):
+        """Agrega un elemento; retorna el elemento desalojado o None"""
+        if self._count < self.capacity:
+            self._buffer[(self._start + self._count) % self.capacity] = item
+            self._count += 1
+            return None
+
+        evicted = self._buffer[self._start]
+        self._buffer[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def get(self, index):
+        """Obtiene el elemento en la posición lógica (0 = más antiguo, -1 = más reciente)"""
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("Índice fuera de rango")
+        return self._buffer[(self._start + index) % self.capacity]
+
+    def last(self, n):
+        """Retorna los n elementos más recientes en orden de llegada"""
+        n = min(n, self._count)
+        first = self._count - n
+        return [self._buffer[(self._start + i) % self.capacity] for i in range(first, self._count)]
+
+    def clear(self):
+        """Limpia el buffer"""
+        self._buffer = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+
+    def __iter__(self):
+        """Itera del más antiguo al más reciente sin modificar el buffer"""
+        buffer = self._buffer
+        capacity = self.capacity
+        start = self._start
+        for i in range(self._count):
+            yield buffer[(start + i) % capacity]
+
+    def __len__(self):
+        """Retorna el número de elementos almacenados"""
+        return self._count
+
+    def __str__(self):
+        """Representación en string del buffer"""
+        return "RingBuffer([" + " -> ".join(str(item) for item in self) + "])"
@@ -1,189 +1,149 @@
 """
-Implementación de Trie N-ario desde cero para prefijos IP y políticas
+Implementación de Trie de prefijos IP y políticas desde cero
+
+Los prefijos IPv4 se guardan en un trie binario con compresión de caminos
+(PatriciaTrie), en su variante sobre arreglos paralelos con políticas
+internadas (engine="compact") o en un trie de stride fijo (engine="multibit");
+en todos los casos cualquier longitud de máscara (/0 a /32) se resuelve
+correctamente. Los prefijos IPv6 usan siempre el trie multibit, que recorre
+como máximo 128 / stride nodos por búsqueda.
 """
 
-class TrieNode:
-    """Nodo del Trie"""
-    def __init__(self):
-        self.children = {}  # Diccionario para hijos (0-255 para IPv4)
-        self.is_end_of_prefix = False
-        self.policy = None  # Política asociada al prefijo
-        self.prefix = None  # Prefijo completo para este nodo
+from .addressing import ip_to_int, int_to_ip, ipv6_to_int, int_to_ipv6, is_ipv6, parse_prefix_length
+from .patricia_trie import PatriciaTrie
+from .multibit_trie import MultibitTrie
+from .compact_trie import CompactTrie
+from .interval_table import IntervalTable
 
 class Trie:
-    """Trie N-ario para prefijos IP y políticas jerárquicas"""
-
-    def __init__(self):
-        self.root = TrieNode()
-        self.nodes_count = 1
-
-    def _ip_to_parts(self, ip):
-        """Convierte IP string a lista de octetos"""
-        return [int(x) for x in ip.split('.')]
-
-    def _parts_to_ip(self, parts):
-        """Convierte lista de octetos a IP string"""
-        return '.'.join(str(x) for x in parts)
-
-    def _get_prefix_length(self, mask):
-        """Calcula la longitud del prefijo de la máscara"""
-        mask_parts = self._ip_to_parts(mask)
-        length = 0
-        for octet in mask_parts:
-            if octet == 255:
-                length += 8
-            else:
-                # Contar bits en el último octeto
-                while octet > 0:
-                    length += octet & 1
-                    octet >>= 1
-                break
-        return length
+    """Trie de prefijos IPv4/IPv6 para políticas jerárquicas"""
+
+    def __init__(self, engine="patricia", stride=8):
+        if engine == "patricia":
+            self._engine = PatriciaTrie(32)
+        elif engine == "compact":
+            self._engine = CompactTrie(32)
+        elif engine == "multibit":
+            self._engine = MultibitTrie(32, stride)
+        else:
+            raise ValueError(f"Motor de trie desconocido: {engine}")
+        self.engine = engine
+        # Cada prefijo guarda solo su política; el texto 'red/len' se arma al consultar
+        self._engine6 = MultibitTrie(128, stride)
+        # Tabla aplanada para lookup_many, reconstruida si cambian los prefijos IPv4
+        self._version = 0
+        self._batch_table = None
+        self._batch_version = -1
+
+    @property
+    def nodes_count(self):
+        """Número de nodos del trie"""
+        return self._engine.node_count + self._engine6.node_count
+
+    def _format_prefix(self, engine, network, prefix_length):
+        """Formatea (red, longitud) como 'red/len' según el ancho del motor"""
+        if engine.width == 128:
+            return f"{int_to_ipv6(network)}/{prefix_length}"
+        return f"{int_to_ip(network)}/{prefix_length}"
+
+    def _prefix_key(self, prefix_ip, mask):
+        """Retorna (motor, red enmascarada, longitud) del prefijo"""
+        if is_ipv6(prefix_ip):
+            # IPv6: la máscara es una longitud de prefijo ('64' o '/64')
+            prefix_length = parse_prefix_length(mask, 128)
+            network = ipv6_to_int(prefix_ip) & (((1 << prefix_length) - 1) << (128 - prefix_length))
+            return self._engine6, network, prefix_length
+
+        prefix_length = parse_prefix_length(mask)
+        network_mask = ((1 << prefix_length) - 1) << (32 - prefix_length)
+        network = ip_to_int(prefix_ip) & network_mask
+        return self._engine, network, prefix_length
 
     def insert(self, prefix_ip, mask, policy=None):
-        """Inserta un prefijo IP con su política"""
-        prefix_parts = self._ip_to_parts(prefix_ip)
-        mask_parts = self._ip_to_parts(mask)
-        prefix_length = self._get_prefix_length(mask)
-
-        current = self.root
-
-        # Construir el camino según la máscara
-        for i in range(len(prefix_parts)):
-            octet = prefix_parts[i]
-            mask_octet = mask_parts[i]
-
-            # Solo considerar bits según la máscara
-            masked_octet = octet & mask_octet
-
-            if masked_octet not in current.children:
-                current.children[masked_octet] = TrieNode()
-                self.nodes_count += 1
-
-            current = current.children[masked_octet]
-
-            # Si hemos alcanzado la longitud del prefijo, marcar el final
-            if i == len(prefix_parts) - 1:
-                current.is_end_of_prefix = True
-                current.policy = policy
-                current.prefix = f"{prefix_ip}/{prefix_length}"
-
-    def search_exact(self, ip):
-        """Busca un prefijo exacto"""
-        ip_parts = self._ip_to_parts(ip)
-        current = self.root
-
-        for octet in ip_parts:
-            if octet not in current.children:
-                return None
-            current = current.children[octet]
-
-        if current.is_end_of_prefix:
-            return current.policy
-        return None
+        """Inserta o reemplaza un prefijo IP con su política; retorna True si es nuevo"""
+        engine, network, prefix_length = self._prefix_key(prefix_ip, mask)
+        self._version += 1
+        return engine.insert(network, prefix_length, policy)
+
+    def search_exact(self, ip, mask=None):
+        """Busca un prefijo exacto (/32 o /128 si no se indica máscara)"""
+        if mask is None:
+            mask = "128" if is_ipv6(ip) else "255.255.255.255"
+        engine, network, prefix_length = self._prefix_key(ip, mask)
+        return engine.exact(network, prefix_length)
 
     def search_longest_prefix(self, ip):
         """Busca el prefijo más largo que coincida (longest prefix match)"""
-        ip_parts = self._ip_to_parts(ip)
-        current = self.root
-        best_match = None
-        best_policy = None
-
-        for octet in ip_parts:
-            if octet not in current.children:
-                break
-
-            current = current.children[octet]
-
-            # Actualizar mejor coincidencia si este es un prefijo válido
-            if current.is_end_of_prefix:
-                best_match = current.prefix
-                best_policy = current.policy
-
-        return best_match, best_policy
+        if is_ipv6(ip):
+            engine, address = self._engine6, ipv6_to_int(ip)
+        else:
+            engine, address = self._engine, ip_to_int(ip)
+        match = engine.longest_match(address)
+        if match is None:
+            return None, None
+        return self._format_prefix(engine, match[0], match[1]), match[2]
 
     def delete(self, prefix_ip, mask):
-        """Elimina un prefijo del Trie"""
-        prefix_parts = self._ip_to_parts(prefix_ip)
-        mask_parts = self._ip_to_parts(mask)
-
-        def _delete_recursive(node, parts, mask_parts, depth=0):
-            if depth == len(parts):
-                if node.is_end_of_prefix:
-                    node.is_end_of_prefix = False
-                    node.policy = None
-                    node.prefix = None
-                    return len(node.children) == 0
-                return False
-
-            octet = parts[depth]
-            mask_octet = mask_parts[depth]
-            masked_octet = octet & mask_octet
-
-            if masked_octet not in node.children:
-                return False
-
-            should_delete_child = _delete_recursive(
-                node.children[masked_octet],
-                parts,
-                mask_parts,
-                depth + 1
-            )
-
-            if should_delete_child:
-                del node.children[masked_octet]
-                self.nodes_count -= 1
-            else:
-                return False
-
-            # Si este nodo ya no tiene hijos y no es fin de prefijo, puede eliminarse
-            return len(node.children) == 0 and not node.is_end_of_prefix
-
-        _delete_recursive(self.root, prefix_parts, mask_parts)
+        """Elimina un prefijo del Trie; retorna True si existía"""
+        engine, network, prefix_length = self._prefix_key(prefix_ip, mask)
+        self._version += 1
+        return engine.delete(network, prefix_length)
+
+    def lookup_many(self, ips):
+        """Longest prefix match IPv4 por lotes
+
+        ips es un arreglo NumPy uint32 o una secuencia de enteros o strings
+        'a.b.c.d'. Retorna (ids, tabla): ids[i] es el índice en tabla de
+        (prefijo, política) para ips[i], o -1 si ningún prefijo coincide.
+        """
+        if self._batch_version != self._version:
+            self._batch_table = IntervalTable(
+                (network, prefix_length, (self._format_prefix(self._engine, network, prefix_length), policy))
+                for network, prefix_length, policy in self._engine.items())
+            self._batch_version = self._version
+        if not hasattr(ips, "dtype"):
+            ips = [ip_to_int(ip) if isinstance(ip, str) else ip for ip in ips]
+        return self._batch_table.lookup_many(ips), self._batch_table.values
 
     def get_all_prefixes(self):
-        """Obtiene todos los prefijos en el Trie"""
-        result = []
-
-        def traverse(node, current_path):
-            if node.is_end_of_prefix:
-                result.append((node.prefix, node.policy))
-
-            for octet, child in node.children.items():
-                traverse(child, current_path + [octet])
-
-        traverse(self.root, [])
-        return result
+        """Obtiene todos los prefijos en el Trie (IPv4 y luego IPv6)"""
+        return [(self._format_prefix(engine, network, prefix_length), policy)
+                for engine in (self._engine, self._engine6)
+                for network, prefix_length, policy in engine.items()]
 
     def get_stats(self):
-        """Obtiene estadísticas del Trie"""
+        """Obtiene estadísticas del Trie en O(1) (los motores llevan los contadores)"""
         return {
             "nodes": self.nodes_count,
-            "prefixes": len(self.get_all_prefixes())
+            "prefixes": len(self)
         }
 
-    def print_trie(self, node=None, level=0, prefix=""):
-        """Imprime el Trie en forma jerárquica"""
-        if node is None:
-            node = self.root
-
-        indent = "  " * level
-
-        if node.is_end_of_prefix:
-            policy_str = f" {{{node.policy}}}" if node.policy else ""
-            print(f"{indent}{node.prefix}{policy_str}")
-
-        for octet in sorted(node.children.keys()):
-            child = node.children[octet]
-            if child.is_end_of_prefix:
-                policy_str = f" {{{child.policy}}}" if child.policy else ""
-                print(f"{indent}├── {octet}/8{policy_str}")
-                self.print_trie(child, level + 1, f"{prefix}.{octet}")
-            else:
-                print(f"{indent}├── {octet}")
-                self.print_trie(child, level + 1, f"{prefix}.{octet}")
+    def compact(self):
+        """Poda ramas muertas y re-empaqueta los motores; retorna cuántos nodos se liberaron"""
+        return self._engine.compact() + self._engine6.compact()
+
+    def __len__(self):
+        """Retorna el número de prefijos IPv4 e IPv6"""
+        return self._engine.prefix_count + self._engine6.prefix_count
+
+    def print_trie(self, prefix=""):
+        """Imprime el Trie en forma jerárquica: cada prefijo bajo el más largo que lo contiene"""
+        for engine in (self._engine, self._engine6):
+            width = engine.width
+            parents = []  # (red, longitud) de los ancestros del prefijo actual
+            for network, prefix_length, policy in engine.items():
+                while parents and (parents[-1][1] >= prefix_length or
+                                   (network ^ parents[-1][0]) >> (width - parents[-1][1])):
+                    parents.pop()
+                level = len(parents)
+                policy_str = f" {{{policy}}}" if policy else ""
+                branch = "├── " if level > 0 else ""
+                prefix_str = self._format_prefix(engine, network, prefix_length)
+                print(f"{prefix}{'  ' * level}{branch}{prefix_str}{policy_str}")
+                parents.append((network, prefix_length))
 
     def clear(self):
         """Limpia el Trie"""
-        self.root = TrieNode()
-        self.nodes_count = 1
+        self._engine.clear()
+        self._engine6.clear()
+        self._version += 1
@@ -5,6 +5,7 @@ Muestra las funcionalidades principales del sistema
 """
 
 from cli import CLIParser
+from data_structures.addressing import parse_prefix_length
 from network import Network
 from utils import ErrorLogger
 
@@ -13,7 +14,7 @@ def demo_basico():
     print("=== DEMO: Funcionamiento Básico ===\n")
 
     # Inicializar componentes
-    network = Network()
+    network = Network(snapshot_dir="snapshots")
     error_logger = ErrorLogger()
 
     # Crear dispositivos
@@ -116,7 +117,7 @@ def demo_trie():
     print("Insertando políticas en el Trie...")
     for prefix, mask, policy in politicas:
         trie.insert(prefix, mask, policy)
-        print(f"  ✓ Insertada: {prefix}/{trie._get_prefix_length(mask)} -> {policy}")
+        print(f"  ✓ Insertada: {prefix}/{parse_prefix_length(mask)} -> {policy}")
 
     print("\nBuscando longest prefix match para diferentes IPs:")
     test_ips = ["192.168.1.10", "10.0.5.100", "172.16.1.1", "192.168.2.50", "8.8.8.8"]
@@ -6,7 +6,7 @@ Interfaz CLI inspirada en Cisco IOS
 
 from cli import CLIParser
 from network import Network
-from utils import ErrorLogger
+from utils import ErrorLogger, ErrorLogSink
 
 def main():
     """Función principal del simulador"""
@@ -17,8 +17,10 @@ def main():
     print()
 
     # Inicializar componentes del simulador
-    network = Network()
-    error_logger = ErrorLogger()
+    network = Network(snapshot_dir="snapshots")
+    error_logger = ErrorLogger(aggregate=True)  # Agrupa ráfagas de descartes idénticos
+    error_sink = ErrorLogSink("logs")  # Persistencia asíncrona del registro
+    error_logger.attach_sink(error_sink)
 
     # Crear dispositivos por defecto para testing
     network.add_device("Router1", "router", error_logger)
@@ -73,6 +75,8 @@ def main():
     except Exception as e:
         error_logger.log_error("SYSTEM", "CRITICAL", f"Error crítico del sistema: {str(e)}", "")
         print(f"Error crítico: {e}")
+    finally:
+        error_sink.close()
 
 if __name__ == "__main__":
     main()
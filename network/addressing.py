@@ -0,0 +1,33 @@
+"""
+Utilidades de direccionamiento para la tabla de rutas: claves enteras
+empaquetadas (red, longitud de prefijo). La conversión de direcciones y
+máscaras IPv4/IPv6 vive en data_structures.addressing y se reexporta aquí.
+"""
+
+from data_structures.addressing import (PREFIX_MASKS, ip_to_int, int_to_ip, mask_to_prefix_length,
+                                        prefix_length_to_mask, is_ipv6, ipv6_to_int, int_to_ipv6,
+                                        parse_prefix_length)
+
+# Bits reservados para la longitud de prefijo en la clave (0..32 cabe en 6)
+PREFIX_LENGTH_BITS = 6
+PREFIX_LENGTH_MASK = (1 << PREFIX_LENGTH_BITS) - 1
+
+def make_route_key(network, length):
+    """Empaqueta (red entera, longitud) en una clave que ordena por red y luego por longitud"""
+    return (network << PREFIX_LENGTH_BITS) | length
+
+def split_route_key(key):
+    """Desempaqueta una clave de ruta en (red entera, longitud)"""
+    return key >> PREFIX_LENGTH_BITS, key & PREFIX_LENGTH_MASK
+
+def format_route_key(key):
+    """Formatea una clave de ruta como 'a.b.c.d/len'"""
+    return f"{int_to_ip(key >> PREFIX_LENGTH_BITS)}/{key & PREFIX_LENGTH_MASK}"
+
+def parse_route_key(text):
+    """Convierte 'a.b.c.d/len' en clave de ruta (la red se enmascara)"""
+    prefix, length = text.split('/')
+    length = int(length)
+    if length < 0 or length > 32:
+        raise ValueError(f"Longitud de prefijo inválida: {text}")
+    return make_route_key(ip_to_int(prefix) & PREFIX_MASKS[length], length)
@@ -2,7 +2,13 @@
 Implementación de la clase Device para el simulador de red
 """
 
-from data_structures import LinkedList, Queue, Stack, AVLTree, Trie
+from data_structures import (LinkedList, Queue, Stack, AVLTree, Trie, PatriciaTrie, MultibitTrie,
+                             Dir248Table, IntervalTable, LRUCache)
+from .addressing import (PREFIX_MASKS, ip_to_int, mask_to_prefix_length, make_route_key,
+                         format_route_key, parse_route_key, is_ipv6, ipv6_to_int, int_to_ipv6,
+                         parse_prefix_length)
+from .pipeline import ForwardingPipeline
+from .scheduler import DEPARTURE
 
 class Interface:
     """Representa una interfaz de red de un dispositivo"""
@@ -13,19 +19,28 @@ class Interface:
         self.mask = None
         self.status = "down"  # "up" o "down"
         self.connected_to = None  # (device_name, interface_name)
-        self.neighbors = LinkedList()  # Lista de dispositivos conectados
+        self.neighbors = LinkedList(doubly=True)  # Lista de dispositivos conectados
+        self._neighbor_nodes = {}  # Vecino -> nodo de la lista (remoción O(1))
         self.input_queue = Queue()  # Cola de paquetes entrantes
         self.output_queue = Queue()  # Cola de paquetes salientes
+        self.on_change = None  # Callback del dispositivo ante cambios de estado o conexión
+
+    def _notify_change(self):
+        """Avisa al dispositivo que cambió algo que afecta el reenvío"""
+        if self.on_change is not None:
+            self.on_change(self)
 
     def set_ip(self, ip, mask=None):
         """Configura la dirección IP de la interfaz"""
         self.ip_address = ip
         self.mask = mask or "255.255.255.0"
+        self._notify_change()
 
     def set_status(self, status):
         """Cambia el estado de la interfaz"""
-        if status in ["up", "down"]:
+        if status in ["up", "down"] and status != self.status:
             self.status = status
+            self._notify_change()
 
     def is_up(self):
         """Verifica si la interfaz está activa"""
@@ -34,21 +49,23 @@ class Interface:
     def connect_to(self, device_name, interface_name):
         """Conecta esta interfaz a otra"""
         self.connected_to = (device_name, interface_name)
+        self._notify_change()
 
     def disconnect(self):
         """Desconecta esta interfaz"""
         self.connected_to = None
+        self._notify_change()
 
     def add_neighbor(self, neighbor_device):
         """Agrega un dispositivo vecino"""
-        if not self.neighbors.contains(neighbor_device):
-            self.neighbors.append(neighbor_device)
+        if neighbor_device not in self._neighbor_nodes:
+            self._neighbor_nodes[neighbor_device] = self.neighbors.append(neighbor_device)
 
     def remove_neighbor(self, neighbor_device):
         """Remueve un dispositivo vecino"""
-        if self.neighbors.contains(neighbor_device):
-            index = self.neighbors.index_of(neighbor_device)
-            self.neighbors.remove_at(index)
+        node = self._neighbor_nodes.pop(neighbor_device, None)
+        if node is not None:
+            self.neighbors.remove_node(node)
 
     def __str__(self):
         status = "UP" if self.is_up() else "DOWN"
@@ -58,27 +75,59 @@ class Interface:
 class Device:
     """Representa un dispositivo en la red (router, switch, host, firewall)"""
 
+    # Máximo de destinos con decisión de reenvío en caché
+    DECISION_CACHE_SIZE = 1024
+    # Motor IPv4 del Trie de políticas ("compact" reduce la memoria con muchas políticas)
+    POLICY_TRIE_ENGINE = "patricia"
+    # A partir de este número de destinos únicos, el pipeline usa búsquedas por lote
+    BATCH_LOOKUP_THRESHOLD = 256
+
     def __init__(self, name, device_type="router", error_logger=None):
         self.name = name
         self.device_type = device_type  # "router", "switch", "host", "firewall"
         self.status = "online"  # "online" o "offline"
         self.interfaces = {}  # Diccionario de interfaces por nombre
         self.routing_table = AVLTree()  # Tabla de rutas usando AVL
-        self.policy_trie = Trie()  # Trie para políticas de prefijos IP
+        self.fib = PatriciaTrie(32)  # FIB para longest prefix match, sincronizada con la tabla AVL
+        self.compiled_fib = None  # Tabla DIR-24-8 opcional (ver enable_compiled_fib)
+        self._compiled_fib_dirty = False
+        self._batch_fib = None  # IntervalTable para find_routes_many, por generación de rutas
+        self._batch_fib_generation = -1
+        self.fib6 = MultibitTrie(128, 8)  # Rutas IPv6 (tabla y FIB): a lo sumo 16 nodos por búsqueda
+        self.policy_trie = Trie(self.POLICY_TRIE_ENGINE)  # Trie para políticas de prefijos IP
         self.arp_table = {}  # Tabla ARP simple (IP -> MAC/interface)
         self.history = Stack()  # Historial de paquetes recibidos
         self.packets_sent = 0
         self.packets_received = 0
         self.packets_dropped = 0
         self.error_logger = error_logger  # Sistema de logging de errores
+        self.on_work = None  # Callback (dispositivo, interfaz, tipo, paquete) al encolar paquetes, lo usa el planificador
+        self.on_transmit = None  # Callback (dispositivo, interfaz, paquete) -> bool que entrega al vecino
+
+        # Caché de decisiones por destino; las claves incluyen las generaciones
+        # de rutas, políticas e interfaces, así un cambio invalida lo anterior
+        self.decision_cache = LRUCache(self.DECISION_CACHE_SIZE)
+        self.route_generation = 0
+        self.policy_generation = 0
+        self.interface_generation = 0
+
+        # Etapas clasificar -> política -> ruta -> ARP -> TTL -> encolar, por lotes
+        self.pipeline = ForwardingPipeline()
 
     def add_interface(self, interface_name):
         """Agrega una nueva interfaz al dispositivo"""
         if interface_name not in self.interfaces:
-            self.interfaces[interface_name] = Interface(interface_name)
+            interface = Interface(interface_name)
+            interface.on_change = self._on_interface_change
+            self.interfaces[interface_name] = interface
+            self.interface_generation += 1
             return True
         return False
 
+    def _on_interface_change(self, interface):
+        """Invalida las decisiones en caché al cambiar una interfaz"""
+        self.interface_generation += 1
+
     def get_interface(self, interface_name):
         """Obtiene una interfaz por nombre"""
         return self.interfaces.get(interface_name)
@@ -110,16 +159,67 @@ class Device:
         return True
 
     # Métodos de tabla de rutas (usando AVL)
+    def _parse_prefix(self, prefix, mask):
+        """Retorna (red enmascarada, longitud de prefijo) como enteros"""
+        prefix_length = parse_prefix_length(mask)
+        return ip_to_int(prefix) & PREFIX_MASKS[prefix_length], prefix_length
+
+    def _parse_prefix6(self, prefix, mask):
+        """Retorna (red IPv6 enmascarada, longitud); la máscara es una longitud ('64' o '/64')"""
+        prefix_length = parse_prefix_length(mask, 128)
+        network_mask = ((1 << prefix_length) - 1) << (128 - prefix_length)
+        return ipv6_to_int(prefix) & network_mask, prefix_length
+
     def add_route(self, prefix, mask, next_hop, metric=1):
         """Agrega una ruta a la tabla de rutas"""
-        route_key = f"{prefix}/{self._mask_to_prefix_length(mask)}"
+        if is_ipv6(prefix):
+            network, prefix_length = self._parse_prefix6(prefix, mask)
+            self.fib6.insert(network, prefix_length, {"next_hop": next_hop, "metric": metric, "mask": mask})
+            self.route_generation += 1
+            return
+        network, prefix_length = self._parse_prefix(prefix, mask)
         route_value = {"next_hop": next_hop, "metric": metric, "mask": mask}
-        self.routing_table.insert_key(route_key, route_value)
+        self.routing_table.insert_key(make_route_key(network, prefix_length), route_value)
+        self.fib.insert(network, prefix_length, route_value)
+        self._compiled_fib_dirty = True
+        self.route_generation += 1
+
+    def add_routes(self, routes):
+        """Agrega en bloque rutas (prefix, mask, next_hop, metric); retorna cuántas son nuevas"""
+        prefix_lengths = {}
+        items = []
+        added6 = 0
+        for prefix, mask, next_hop, metric in routes:
+            if is_ipv6(prefix):
+                network, prefix_length = self._parse_prefix6(prefix, mask)
+                route_value = {"next_hop": next_hop, "metric": metric, "mask": mask}
+                added6 += self.fib6.insert(network, prefix_length, route_value)
+                continue
+            prefix_length = prefix_lengths.get(mask)
+            if prefix_length is None:
+                prefix_length = prefix_lengths[mask] = parse_prefix_length(mask)
+            network = ip_to_int(prefix) & PREFIX_MASKS[prefix_length]
+            route_value = {"next_hop": next_hop, "metric": metric, "mask": mask}
+            items.append((make_route_key(network, prefix_length), route_value))
+            self.fib.insert(network, prefix_length, route_value)
+
+        # sort es estable: ante claves repetidas from_sorted conserva la última
+        items.sort(key=lambda item: item[0])
+        self._compiled_fib_dirty = True
+        self.route_generation += 1
+        return self.routing_table.union(items) + added6
 
     def remove_route(self, prefix, mask):
         """Remueve una ruta de la tabla de rutas"""
-        route_key = f"{prefix}/{self._mask_to_prefix_length(mask)}"
-        self.routing_table.delete_key(route_key)
+        if is_ipv6(prefix):
+            self.fib6.delete(*self._parse_prefix6(prefix, mask))
+            self.route_generation += 1
+            return
+        network, prefix_length = self._parse_prefix(prefix, mask)
+        self.routing_table.delete_key(make_route_key(network, prefix_length))
+        self.fib.delete(network, prefix_length)
+        self._compiled_fib_dirty = True
+        self.route_generation += 1
 
     def find_route(self, destination_ip):
         """Busca la mejor ruta para un destino (longest prefix match)"""
@@ -130,47 +230,108 @@ class Device:
         if policy and policy.get("block"):
             return None
 
-        # Buscar en la tabla de rutas AVL
-        # Para simplificar, buscar el prefijo más largo posible
-        ip_parts = destination_ip.split('.')
-        for prefix_len in range(32, -1, -1):
-            prefix = '.'.join(ip_parts[:prefix_len//8])
-            if prefix_len % 8 != 0:
-                # Manejar prefijos no alineados a octetos
-                last_octet = int(ip_parts[prefix_len//8])
-                mask_bits = prefix_len % 8
-                mask = (0xFF << (8 - mask_bits)) & 0xFF
-                prefix = f"{'.'.join(ip_parts[:prefix_len//8])}.{last_octet & mask}"
-
-            route_key = f"{prefix}/{prefix_len}"
-            route = self.routing_table.search_key(route_key)
-            if route:
-                return route
-
-        return None
+        return self._lookup_route(destination_ip)
+
+    def _lookup_route(self, destination_ip):
+        """Longest prefix match en la FIB, sin considerar políticas"""
+        if is_ipv6(destination_ip):
+            match = self.fib6.longest_match(ipv6_to_int(destination_ip))
+            return match[2] if match is not None else None
+
+        # Tabla compilada si está activa, si no un solo recorrido del trie Patricia
+        address = ip_to_int(destination_ip)
+        if self.compiled_fib is not None:
+            if self._compiled_fib_dirty:
+                self.compiled_fib.build(self.fib.items())
+                self._compiled_fib_dirty = False
+            match = self.compiled_fib.longest_match(address)
+        else:
+            match = self.fib.longest_match(address)
+
+        if match is None:
+            return None
+        return match[2]
+
+    def find_routes_many(self, destination_ips):
+        """Longest prefix match IPv4 por lotes, sin considerar políticas
+
+        destination_ips es un arreglo NumPy uint32 o una secuencia de enteros o
+        strings. Retorna (ids, rutas): ids[i] es el índice en rutas de la ruta
+        de destination_ips[i], o -1 si no hay ruta.
+        """
+        if self._batch_fib_generation != self.route_generation:
+            self._batch_fib = IntervalTable(self.fib.items())
+            self._batch_fib_generation = self.route_generation
+        if not hasattr(destination_ips, "dtype"):
+            destination_ips = [ip_to_int(ip) if isinstance(ip, str) else ip for ip in destination_ips]
+        return self._batch_fib.lookup_many(destination_ips), self._batch_fib.values
+
+    def _select_output_interface(self, route):
+        """Elige la interfaz de salida para una ruta: la conectada cuya subred contiene al next_hop"""
+        candidates = [iface for iface in self.interfaces.values() if iface.is_up() and iface.connected_to]
+        next_hop = route["next_hop"]
+        if not is_ipv6(next_hop):
+            next_hop_int = ip_to_int(next_hop)
+            for iface in candidates:
+                if iface.ip_address and not is_ipv6(iface.ip_address):
+                    mask = ip_to_int(iface.mask)
+                    if ip_to_int(iface.ip_address) & mask == next_hop_int & mask:
+                        return iface
+        # Next hop fuera de las subredes configuradas: cualquier interfaz conectada
+        return candidates[0] if candidates else None
+
+    def _decision_key(self, destination_ip):
+        """Clave de la caché de decisiones: incluye las generaciones, así un cambio invalida lo anterior"""
+        return (destination_ip, self.route_generation, self.policy_generation, self.interface_generation)
+
+    def enable_compiled_fib(self, enabled=True):
+        """Activa o desactiva la tabla DIR-24-8 (~64 MB) para búsquedas de solo lectura"""
+        if not enabled:
+            self.compiled_fib = None
+        elif self.compiled_fib is None:
+            self.compiled_fib = Dir248Table(self.fib.items())
+            self._compiled_fib_dirty = False
+
+    def get_fib_stats(self):
+        """Obtiene estadísticas de la FIB y, si está activa, de la tabla compilada"""
+        stats = {"trie": self.fib.get_stats(), "trie6": self.fib6.get_stats(), "compiled": None}
+        if self.compiled_fib is not None:
+            stats["compiled"] = self.compiled_fib.memory_report()
+            stats["compiled"]["stale"] = self._compiled_fib_dirty
+        return stats
 
     def _mask_to_prefix_length(self, mask):
         """Convierte máscara a longitud de prefijo"""
-        mask_parts = mask.split('.')
-        length = 0
-        for part in mask_parts:
-            octet = int(part)
-            while octet > 0:
-                length += octet & 1
-                octet >>= 1
-        return length
+        return mask_to_prefix_length(mask)
 
     # Métodos de políticas (usando Trie)
     def set_policy(self, prefix, mask, policy_type, value=None):
         """Establece una política para un prefijo"""
         policy = {policy_type: value}
         self.policy_trie.insert(prefix, mask, policy)
+        self.policy_generation += 1
 
     def remove_policy(self, prefix, mask):
         """Remueve una política para un prefijo"""
         self.policy_trie.delete(prefix, mask)
+        self.policy_generation += 1
 
     # Métodos de manejo de paquetes
+    def _notify_work(self, interface, kind, packet=None):
+        """Avisa al planificador que la cola de la interfaz tiene paquetes"""
+        if self.on_work is not None:
+            self.on_work(self, interface, kind, packet)
+
+    def _transmit(self, interface, packet):
+        """Entrega el paquete al vecino de la interfaz; sin red asociada, sale por la interfaz"""
+        if self.on_transmit is None:
+            return True
+        return self.on_transmit(self, interface, packet)
+
+    def _local_addresses(self):
+        """Direcciones IP configuradas en las interfaces"""
+        return {iface.ip_address for iface in self.interfaces.values() if iface.ip_address}
+
     def receive_packet(self, packet):
         """Recibe un paquete y lo procesa"""
         if not self.is_online():
@@ -197,24 +358,16 @@ class Device:
             self.packets_dropped += 1
             return False
 
-        # Encontrar la interfaz de salida
-        next_hop = route["next_hop"]
-        output_interface = None
-
-        # Buscar interfaz que pueda alcanzar el next_hop
-        for iface_name, interface in self.interfaces.items():
-            if interface.is_up() and interface.connected_to:
-                # Simplificación: asumir que podemos alcanzar el next_hop
-                output_interface = interface
-                break
+        # Encontrar la interfaz de salida según el next_hop
+        output_interface = self._select_output_interface(route)
 
         if not output_interface:
             self.packets_dropped += 1
             return False
 
-        # Agregar paquete a la cola de salida
+        # Agregar paquete a la cola de salida; se cuenta como enviado al salir por el pipeline
         output_interface.output_queue.enqueue(packet)
-        self.packets_sent += 1
+        self._notify_work(output_interface, DEPARTURE, packet)
 
         return True
 
@@ -223,100 +376,89 @@ class Device:
         if not self.is_online():
             return
 
-        # Procesar colas de salida (enviar paquetes)
+        # Procesar colas de entrada (recibir o reenviar) y de salida (enviar paquetes)
         for interface in self.interfaces.values():
-            while not interface.output_queue.is_empty():
-                packet = interface.output_queue.dequeue()
-
-                # 1. Lookup de políticas en el trie n-ario
-                prefix_match, policy = self.policy_trie.search_longest_prefix(packet.destination_ip)
-
-                # 2. Verificar si el paquete viola alguna política
-                packet_dropped = False
-                drop_reason = ""
-
-                if policy:
-                    if policy.get("block"):
-                        packet_dropped = True
-                        drop_reason = f"Paquete bloqueado por política en prefijo {prefix_match}"
-                    elif policy.get("ttl-min") and packet.ttl < policy["ttl-min"]:
-                        packet_dropped = True
-                        drop_reason = f"TTL {packet.ttl} insuficiente (mínimo {policy['ttl-min']}) para prefijo {prefix_match}"
-
-                if packet_dropped:
-                    self.packets_dropped += 1
-                    # Registrar error en el log
-                    if self.error_logger:
-                        self.error_logger.log_error(
-                            "PolicyViolation",
-                            "WARNING",
-                            drop_reason,
-                            f"packet from {packet.source_ip} to {packet.destination_ip}"
-                        )
-                    continue
-
-                # 3. Si pasa las políticas, consultar tabla AVL para elegir siguiente salto
-                route = self.find_route(packet.destination_ip)
-
-                if route:
-                    # Encontrar interfaz de salida
-                    next_hop = route["next_hop"]
-                    output_interface = None
-
-                    # Buscar interfaz que pueda alcanzar el next_hop
-                    for iface_name, iface in self.interfaces.items():
-                        if iface.is_up() and iface.connected_to:
-                            # Para simplificar, asumir que podemos alcanzar el next_hop
-                            output_interface = iface
-                            break
-
-                    if output_interface:
-                        # 4. Para vecinos directos, validar mediante tabla ARP
-                        if next_hop in self.arp_table:
-                            # ARP hit - enviar directamente
-                            self.packets_sent += 1
-                            packet.ttl -= 1
-                        else:
-                            # ARP miss - aprender interfaz y enviar
-                            self.arp_table[next_hop] = output_interface.name
-                            self.packets_sent += 1
-                            packet.ttl -= 1
-                    else:
-                        # No hay interfaz de salida disponible
-                        self.packets_dropped += 1
-                        if self.error_logger:
-                            self.error_logger.log_error(
-                                "NoRouteToHost",
-                                "ERROR",
-                                f"No hay ruta disponible para {packet.destination_ip}",
-                                f"packet from {packet.source_ip}"
-                            )
-                else:
-                    # No se encontró ruta en la tabla AVL
-                    self.packets_dropped += 1
-                    if self.error_logger:
-                        self.error_logger.log_error(
-                            "NoRouteToHost",
-                            "ERROR",
-                            f"No hay ruta disponible para {packet.destination_ip}",
-                            f"packet from {packet.source_ip}"
-                        )
-
-                # Verificar TTL después del procesamiento
-                if packet.ttl <= 0:
-                    self.packets_dropped += 1
-                    if self.error_logger:
-                        self.error_logger.log_error(
-                            "TTLExpired",
-                            "INFO",
-                            f"TTL expiró para paquete de {packet.source_ip} a {packet.destination_ip}",
-                            ""
-                        )
+            self.process_input_queue(interface)
+            self.process_output_queue(interface)
+
+    @staticmethod
+    def _take_due(queue, until):
+        """Extrae del frente los paquetes con due_time <= until (todos si until es None)
+
+        Cada cola se llena con un retardo fijo, así sus due_time no decrecen.
+        """
+        if until is None:
+            return queue.drain()
+        due = 0
+        for packet in queue:
+            if packet.due_time is not None and packet.due_time > until:
+                break
+            due += 1
+        return queue.drain(due)
+
+    def process_input_queue(self, interface, until=None):
+        """Entrega los paquetes dirigidos a este dispositivo y reenvía el resto; retorna cuántos había
+
+        Con until solo se toman los paquetes que ya llegaron en ese instante.
+        """
+        if not self.is_online():
+            return 0
+
+        packets = self._take_due(interface.input_queue, until)
+        local_addresses = self._local_addresses()
+        transit = []
+        for packet in packets:
+            packet.add_to_path(self.name)
+            if packet.destination_ip in local_addresses:
+                packet.mark_arrived()
+                self.receive_packet(packet)
+            else:
+                transit.append(packet)
+        if transit:
+            self._forward(transit)
+        return len(packets)
+
+    def process_output_queue(self, interface, until=None):
+        """Procesa el lote de paquetes de la cola de salida de una interfaz; retorna cuántos había
+
+        Con until solo se toman los paquetes cuyo instante de salida ya llegó.
+        """
+        if not self.is_online():
+            return 0
+
+        # Extraer el lote de la cola en una sola operación
+        packets = self._take_due(interface.output_queue, until)
+        for packet in packets:
+            packet.add_to_path(self.name)
+        self._forward(packets)
+        return len(packets)
+
+    def _forward(self, packets):
+        """Pasa el lote por el pipeline de reenvío (política, ruta, ARP, TTL y entrega al vecino)"""
+        if packets:
+            self.pipeline.run(self, packets)
 
     # Métodos de consulta
     def get_routing_table(self):
         """Obtiene la tabla de rutas"""
-        return self.routing_table.get_all_routes()
+        return list(self.iter_routes())
+
+    def iter_routes(self, start=None, stop=None):
+        """Itera ('a.b.c.d/len', ruta) en orden sin copiar la tabla; start/stop en el mismo formato
+
+        Sin rango, las rutas IPv6 se generan a continuación de las IPv4.
+        """
+        start_key = parse_route_key(start) if start is not None else None
+        stop_key = parse_route_key(stop) if stop is not None else None
+        for key, value in self.routing_table.iter_items(start_key, stop_key):
+            yield format_route_key(key), value
+        if start is None and stop is None:
+            for network, prefix_length, value in self.fib6.items():
+                yield f"{int_to_ipv6(network)}/{prefix_length}", value
+
+    def route_count(self):
+        """Número de rutas IPv4 e IPv6"""
+        return len(self.routing_table) + len(self.fib6)
 
     def get_history(self, limit=None):
         """Obtiene el historial de paquetes"""
@@ -345,9 +487,10 @@ class Device:
             "packets_sent": self.packets_sent,
             "packets_received": self.packets_received,
             "packets_dropped": self.packets_dropped,
-            "routing_table_entries": len(self.routing_table.get_all_routes()),
+            "routing_table_entries": self.route_count(),
             "interfaces_count": len(self.interfaces),
-            "routing_stats": self.routing_table.get_stats()
+            "routing_stats": self.routing_table.get_stats(),
+            "decision_cache": self.decision_cache.get_stats()
         }
 
     def __str__(self):
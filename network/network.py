@@ -3,17 +3,64 @@ Implementación de la clase Network para el simulador
 """
 
 from .device import Device
-from data_structures import LinkedList, BTree
+from .scheduler import EventScheduler, DEPARTURE, ARRIVAL
+from data_structures import LinkedList, DiskBTree, RingBuffer
+import os
+import tempfile
 import time
 
 class Network:
     """Clase principal que representa la red completa"""
 
-    def __init__(self):
+    # Archivo del índice de snapshots dentro de snapshot_dir
+    SNAPSHOT_INDEX_FILE = "index.db"
+    # Unidades de tiempo simulado entre que un paquete se encola y se procesa
+    PROCESSING_DELAY = 1
+    # Unidades de tiempo que tarda un paquete en cruzar un enlace
+    LINK_DELAY = 1
+    # Instantes con actividad cuyos contadores de throughput se conservan
+    THROUGHPUT_HISTORY = 1024
+
+    def __init__(self, snapshot_dir=None):
         self.devices = {}  # Diccionario de dispositivos por nombre
-        self.connections = LinkedList()  # Lista de conexiones
-        self.snapshots = BTree()  # B-Tree para snapshots de configuración
+        self.connections = LinkedList(doubly=True)  # Lista de conexiones
+        self._connection_nodes = {}  # (dev1, iface1, dev2, iface2) -> nodo
+        # Sin directorio explícito los snapshots viven en un directorio temporal que se borra al cerrar
+        self._temp_dir = None
+        if snapshot_dir is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix="snapshots-")
+            snapshot_dir = self._temp_dir.name
+        self.snapshot_dir = snapshot_dir
+        self.snapshots = self._open_snapshot_index()  # B-Tree en disco para snapshots de configuración
         self.current_device = None  # Dispositivo actual en la sesión CLI
+        self.clock = 0  # Tiempo simulado
+        self.scheduler = EventScheduler()  # Eventos de colas con paquetes pendientes
+        self.throughput = RingBuffer(self.THROUGHPUT_HISTORY)  # Contadores por instante con eventos
+
+    def _open_snapshot_index(self):
+        """Abre el índice de snapshots; si no existe, lo crea a partir de los .cfg del directorio"""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, self.SNAPSHOT_INDEX_FILE)
+        is_new = not os.path.exists(path)
+        try:
+            index = DiskBTree(path)
+        except ValueError:
+            # Índice de un formato anterior: se descarta y se reconstruye
+            os.remove(path)
+            is_new = True
+            index = DiskBTree(path)
+        if is_new:
+            # Claves ordenadas: carga de abajo hacia arriba, sin splits
+            keys = sorted(name[:-len(".cfg")] for name in os.listdir(self.snapshot_dir) if name.endswith(".cfg"))
+            index.bulk_load((key, os.path.join(self.snapshot_dir, f"{key}.cfg")) for key in keys)
+        return index
+
+    def close(self):
+        """Cierra el índice de snapshots (y borra el directorio si era temporal)"""
+        self.snapshots.close()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
 
     def add_device(self, name, device_type="router", error_logger=None):
         """Agrega un nuevo dispositivo a la red"""
@@ -21,7 +68,7 @@ class Network:
             return False
 
         device = Device(name, device_type, error_logger)
-        self.devices[name] = device
+        self._register_device(device)
 
         # Agregar interfaces por defecto según el tipo
         if device_type == "router":
@@ -35,6 +82,12 @@ class Network:
 
         return True
 
+    def _register_device(self, device):
+        """Agrega el dispositivo y lo conecta al planificador y a la entrega entre vecinos"""
+        device.on_work = self._schedule_work
+        device.on_transmit = self._transmit
+        self.devices[device.name] = device
+
     def remove_device(self, name):
         """Remueve un dispositivo de la red"""
         if name not in self.devices:
@@ -63,6 +116,13 @@ class Network:
         device = self.get_device(device_name)
         if device:
             device.set_status(status)
+            if device.is_online():
+                # Los paquetes que quedaron encolados mientras estaba offline vuelven a programarse
+                for interface in device.interfaces.values():
+                    if not interface.input_queue.is_empty():
+                        self._schedule_work(device, interface, ARRIVAL)
+                    if not interface.output_queue.is_empty():
+                        self._schedule_work(device, interface, DEPARTURE)
             return True
         return False
 
@@ -107,7 +167,9 @@ class Network:
             "device2": device2,
             "iface2": iface2
         }
-        self.connections.append(connection)
+        connection_key = (dev1_name, iface1_name, device2, iface2)
+        if connection_key not in self._connection_nodes:
+            self._connection_nodes[connection_key] = self.connections.append(connection)
 
         # Agregar vecinos
         iface1_obj.add_neighbor(device2)
@@ -142,12 +204,9 @@ class Network:
         iface2_obj.disconnect()
 
         # Remover de lista de conexiones
-        for i in range(len(self.connections)):
-            conn = self.connections.get(i)
-            if (conn["device1"] == dev1_name and conn["iface1"] == iface1_name and
-                conn["device2"] == device2 and conn["iface2"] == iface2):
-                self.connections.remove_at(i)
-                break
+        node = self._connection_nodes.pop((dev1_name, iface1_name, device2, iface2), None)
+        if node is not None:
+            self.connections.remove_node(node)
 
         # Remover vecinos
         iface1_obj.remove_neighbor(device2)
@@ -155,10 +214,81 @@ class Network:
 
         return True
 
+    def _schedule_work(self, device, interface, kind, packet=None):
+        """Programa el procesamiento de la cola de una interfaz (y marca el paquete recién encolado)"""
+        time = self.clock + self.PROCESSING_DELAY
+        if packet is not None:
+            packet.due_time = time
+        self.scheduler.schedule(time, device.name, interface.name, kind)
+
+    def _transmit(self, device, interface, packet):
+        """Pone el paquete en la cola de entrada del vecino conectado; retorna False si el enlace está caído"""
+        peer_name, peer_interface_name = interface.connected_to
+        peer = self.devices.get(peer_name)
+        peer_interface = peer.get_interface(peer_interface_name) if peer else None
+        if peer_interface is None or not peer_interface.is_up():
+            return False
+
+        packet.due_time = self.clock + self.LINK_DELAY
+        peer_interface.input_queue.enqueue(packet)
+        self.scheduler.schedule(packet.due_time, peer.name, peer_interface.name, ARRIVAL)
+        return True
+
+    def _handle_event(self, event):
+        """Procesa la cola indicada por el evento y acumula el throughput de su instante"""
+        device = self.devices.get(event.device_name)
+        interface = device.get_interface(event.interface_name) if device else None
+        if interface is None:
+            return 0  # El dispositivo o la interfaz ya no existen
+
+        received, dropped = device.packets_received, device.packets_dropped
+        # Solo los paquetes que vencen en este instante: los posteriores tienen su propio evento
+        if event.kind == ARRIVAL:
+            processed = device.process_input_queue(interface, event.time)
+        else:
+            processed = device.process_output_queue(interface, event.time)
+
+        record = self.throughput.get(-1) if not self.throughput.is_empty() else None
+        if record is None or record["time"] != event.time:
+            record = {"time": event.time, "processed": 0, "delivered": 0, "dropped": 0}
+            self.throughput.append(record)
+        record["processed"] += processed
+        record["delivered"] += device.packets_received - received
+        record["dropped"] += device.packets_dropped - dropped
+        return processed
+
+    def get_throughput(self, limit=None):
+        """Contadores (tiempo, procesados, entregados, descartados) de los últimos instantes con actividad"""
+        return self.throughput.last(limit if limit is not None else len(self.throughput))
+
+    def run_until(self, time):
+        """Procesa en orden los eventos con tiempo <= time y deja el reloj en time
+
+        Solo se tocan los dispositivos con colas pendientes. Retorna el número
+        de paquetes procesados.
+        """
+        processed = 0
+        scheduler = self.scheduler
+        while True:
+            next_time = scheduler.next_time()
+            if next_time is None or next_time > time:
+                break
+            event = scheduler.pop()
+            self.clock = event.time
+            processed += self._handle_event(event)
+        self.clock = max(self.clock, time)
+        return processed
+
+    def run_until_idle(self, max_time=None):
+        """Procesa eventos hasta que no quede ninguno (o hasta max_time); retorna paquetes procesados"""
+        processed = 0
+        while len(self.scheduler) and (max_time is None or self.scheduler.next_time() <= max_time):
+            processed += self.run_until(self.scheduler.next_time())
+        return processed
+
     def tick(self):
-        """Avanza un paso de simulación (procesa todas las colas)"""
-        for device in self.devices.values():
-            device.process_queues()
+        """Avanza una unidad de tiempo simulado; retorna los paquetes procesados"""
+        return self.run_until(self.clock + 1)
 
     def send_packet(self, source_ip, dest_ip, message, ttl=64):
         """Envía un paquete desde una IP fuente a una IP destino"""
@@ -184,6 +314,7 @@ class Network:
 
         # Agregar a la cola de salida del dispositivo fuente
         source_interface.output_queue.enqueue(packet)
+        self._schedule_work(source_device, source_interface, DEPARTURE, packet)
 
         return True, "Paquete encolado para envío"
 
@@ -194,12 +325,15 @@ class Network:
         total_packets_dropped = 0
         total_hops = 0
         packet_count = 0
+        decision_cache = {"hits": 0, "misses": 0, "evictions": 0}
 
         for device in self.devices.values():
             stats = device.get_statistics()
             total_packets_sent += stats["packets_sent"]
             total_packets_received += stats["packets_received"]
             total_packets_dropped += stats["packets_dropped"]
+            for counter in decision_cache:
+                decision_cache[counter] += stats["decision_cache"][counter]
 
             # Calcular hops promedio
             for packet in device.get_history():
@@ -224,7 +358,8 @@ class Network:
             "average_hops": avg_hops,
             "top_talker": top_talker,
             "devices_online": len([d for d in self.devices.values() if d.is_online()]),
-            "total_devices": len(self.devices)
+            "total_devices": len(self.devices),
+            "decision_cache": decision_cache
         }
 
     def save_snapshot(self, key=None):
@@ -245,32 +380,30 @@ class Network:
                 config_lines.append(f"interface {iface_name}")
                 if interface.ip_address:
                     config_lines.append(f"  ip address {interface.ip_address}")
-                config_lines.append(f"  {'no ' if not interface.is_up() else ''}shutdown")
+                config_lines.append(f"  {'no ' if interface.is_up() else ''}shutdown")
                 config_lines.append("exit")
 
             # Rutas
-            for route_key, route_value in device.get_routing_table():
+            for route_key, route_value in device.iter_routes():
                 prefix, mask_len = route_key.split('/')
                 config_lines.append(f"ip route {prefix} {route_value['mask']} via {route_value['next_hop']} metric {route_value['metric']}")
 
             config_lines.append("")
 
         # Guardar conexiones
-        for i in range(len(self.connections)):
-            conn = self.connections.get(i)
+        for conn in self.connections:
             config_lines.append(f"connect {conn['device1']} {conn['iface1']} {conn['device2']} {conn['iface2']}")
 
         config_content = "\n".join(config_lines)
 
         # Guardar en archivo
-        filename = f"snapshots/{key}.cfg"
+        filename = os.path.join(self.snapshot_dir, f"{key}.cfg")
         try:
             with open(filename, 'w') as f:
                 f.write(config_content)
-        except:
-            # Si no existe el directorio, crearlo
-            import os
-            os.makedirs("snapshots", exist_ok=True)
+        except FileNotFoundError:
+            # Si se borró el directorio, crearlo
+            os.makedirs(self.snapshot_dir, exist_ok=True)
             with open(filename, 'w') as f:
                 f.write(config_content)
 
@@ -302,6 +435,10 @@ class Network:
         lines = config_content.strip().split('\n')
         current_device = None
         current_interface = None
+        # Las rutas se cargan en bloque al final para no rebalancear por línea
+        pending_routes = {}
+        # El estado de las interfaces se aplica al final: connect exige interfaces apagadas
+        pending_status = []
 
         for line in lines:
             line = line.strip()
@@ -315,7 +452,7 @@ class Network:
                 device_type = "router"  # default
                 # Buscar el tipo en la siguiente línea si existe
                 current_device = Device(device_name, device_type)
-                self.devices[device_name] = current_device
+                self._register_device(current_device)
 
             elif parts[0] == "device-type" and current_device:
                 current_device.device_type = parts[1]
@@ -331,22 +468,30 @@ class Network:
                 current_interface.set_ip(ip, mask)
 
             elif parts[0] in ["shutdown", "no"] and current_interface:
-                if parts[0] == "no":
-                    current_interface.set_status("up")
-                else:
-                    current_interface.set_status("down")
+                pending_status.append((current_interface, "up" if parts[0] == "no" else "down"))
 
             elif parts[0] == "connect":
                 dev1, iface1, dev2, iface2 = parts[1], parts[2], parts[3], parts[4]
-                self.connect(iface1, dev2, iface2)
+                self.connect(f"{dev1}.{iface1}", dev2, iface2)
 
             elif parts[0] == "ip" and parts[1] == "route" and current_device:
                 prefix = parts[2]
                 mask = parts[3]
                 next_hop = parts[5]  # via
                 metric = int(parts[7]) if len(parts) > 7 else 1
-                current_device.add_route(prefix, mask, next_hop, metric)
+                pending_routes.setdefault(current_device, []).append((prefix, mask, next_hop, metric))
+
+        for device, routes in pending_routes.items():
+            device.add_routes(routes)
+        for interface, status in pending_status:
+            interface.set_status(status)
 
     def get_snapshots(self):
         """Obtiene lista de snapshots disponibles"""
         return self.snapshots.get_all_entries()
+
+    def iter_snapshots(self, start=None, end=None, prefix=None):
+        """Genera (clave, archivo) en orden, entre start y end o con el prefijo dado"""
+        if prefix is not None:
+            return self.snapshots.prefix(prefix)
+        return self.snapshots.range(start, end)
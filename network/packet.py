@@ -17,6 +17,7 @@ class Packet:
         self.path = []  # Lista de dispositivos por los que ha pasado
         self.timestamp = datetime.now()
         self.arrival_time = None  # Timestamp de llegada al destino
+        self.due_time = None  # Instante simulado desde el que su cola puede procesarlo
         self.ttl_expired = False
 
     def add_to_path(self, device_name):
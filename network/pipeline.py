@@ -0,0 +1,252 @@
+"""
+Pipeline de reenvío por etapas para Device
+
+Los paquetes drenados de una cola recorren, como un lote, las etapas
+clasificar → política → ruta → ARP → TTL → encolar. Cada etapa recibe el lote
+completo y descarta los paquetes que no pasan, así el costo de cada una se
+amortiza: las búsquedas de políticas y rutas se hacen una vez por destino
+único (con búsquedas por lote a partir de Device.BATCH_LOOKUP_THRESHOLD) y
+la caché de decisiones se consulta una vez por destino.
+
+Las etapas son objetos con un `name` y `__call__(batch)`; el pipeline de cada
+dispositivo se puede modificar (`replace`, `insert_before`, `remove`) y mide
+llamadas, paquetes, descartes y tiempo por etapa (`get_profile`).
+"""
+
+import time
+
+from .addressing import ip_to_int, is_ipv6
+
+class PacketBatch:
+    """Lote de paquetes con sus decisiones de reenvío por destino único"""
+
+    def __init__(self, device, packets):
+        self.device = device
+        self.packets = packets
+        self.slots = []  # Índice del destino de cada paquete en `destinations`
+        self.destinations = []  # Destinos únicos del lote
+        # Decisión por destino único (posición = slot)
+        self.prefixes = []
+        self.policies = []
+        self.routes = []
+        self.interfaces = []
+        self.pending = []  # Slots sin decisión en caché: los resuelven las etapas de política y ruta
+
+    def retain(self, keep):
+        """Conserva los paquetes (y sus slots) cuyo flag en keep es verdadero"""
+        self.packets = [packet for packet, flag in zip(self.packets, keep) if flag]
+        self.slots = [slot for slot, flag in zip(self.slots, keep) if flag]
+
+    def drop(self, error_type, severity, template, command, args):
+        """Cuenta un paquete descartado y lo registra (formateo diferido) si hay logger"""
+        device = self.device
+        device.packets_dropped += 1
+        if device.error_logger is not None:
+            device.error_logger.log_error(error_type, severity, template, command, args)
+
+class ClassifyStage:
+    """Agrupa los paquetes por destino y consulta la caché de decisiones una vez por destino"""
+    name = "classify"
+
+    def __call__(self, batch):
+        device = batch.device
+        slot_of = {}
+        for packet in batch.packets:
+            destination = packet.destination_ip
+            slot = slot_of.get(destination)
+            if slot is None:
+                slot = slot_of[destination] = len(batch.destinations)
+                batch.destinations.append(destination)
+            batch.slots.append(slot)
+
+        for slot, destination in enumerate(batch.destinations):
+            decision = device.decision_cache.get(device._decision_key(destination))
+            if decision is None:
+                decision = (None, None, None, None)
+                batch.pending.append(slot)
+            prefix_match, policy, route, output_interface = decision
+            batch.prefixes.append(prefix_match)
+            batch.policies.append(policy)
+            batch.routes.append(route)
+            batch.interfaces.append(output_interface)
+
+class PolicyStage:
+    """Busca la política de cada destino pendiente y aplica block / ttl-min por paquete"""
+    name = "policy"
+
+    def __call__(self, batch):
+        device = batch.device
+        pending = batch.pending
+        ipv4 = [slot for slot in pending if not is_ipv6(batch.destinations[slot])]
+        if len(ipv4) >= device.BATCH_LOOKUP_THRESHOLD:
+            ids, table = device.policy_trie.lookup_many([ip_to_int(batch.destinations[slot]) for slot in ipv4])
+            for slot, policy_id in zip(ipv4, ids):
+                if policy_id >= 0:
+                    batch.prefixes[slot], batch.policies[slot] = table[policy_id]
+            pending = [slot for slot in pending if is_ipv6(batch.destinations[slot])]
+        for slot in pending:
+            batch.prefixes[slot], batch.policies[slot] = device.policy_trie.search_longest_prefix(batch.destinations[slot])
+
+        keep = []
+        for packet, slot in zip(batch.packets, batch.slots):
+            policy = batch.policies[slot]
+            if policy:
+                if policy.get("block"):
+                    reason = "Paquete bloqueado por política en prefijo {2}"
+                elif policy.get("ttl-min") and packet.ttl < policy["ttl-min"]:
+                    reason = "TTL {3} insuficiente (mínimo {4}) para prefijo {2}"
+                else:
+                    reason = None
+                if reason is not None:
+                    batch.drop("PolicyViolation", "WARNING", reason, "packet from {0} to {1}",
+                               (packet.source_ip, packet.destination_ip, batch.prefixes[slot],
+                                packet.ttl, policy.get("ttl-min")))
+                    keep.append(False)
+                    continue
+            keep.append(True)
+        batch.retain(keep)
+
+class RouteStage:
+    """Resuelve ruta e interfaz de salida por destino pendiente, guarda la decisión y descarta sin ruta"""
+    name = "route"
+
+    def __call__(self, batch):
+        device = batch.device
+        routable = [slot for slot in batch.pending
+                    if not (batch.policies[slot] and batch.policies[slot].get("block"))]
+        ipv4 = [slot for slot in routable if not is_ipv6(batch.destinations[slot])]
+        if len(ipv4) >= device.BATCH_LOOKUP_THRESHOLD:
+            ids, table = device.find_routes_many([ip_to_int(batch.destinations[slot]) for slot in ipv4])
+            for slot, route_id in zip(ipv4, ids):
+                batch.routes[slot] = table[route_id] if route_id >= 0 else None
+            routable = [slot for slot in routable if is_ipv6(batch.destinations[slot])]
+        for slot in routable:
+            batch.routes[slot] = device._lookup_route(batch.destinations[slot])
+
+        egress = {}  # Next hop -> interfaz de salida, una selección por next hop del lote
+        for slot in batch.pending:
+            route = batch.routes[slot]
+            if route:
+                next_hop = route["next_hop"]
+                if next_hop not in egress:
+                    egress[next_hop] = device._select_output_interface(route)
+                batch.interfaces[slot] = egress[next_hop]
+            device.decision_cache.put(device._decision_key(batch.destinations[slot]),
+                                      (batch.prefixes[slot], batch.policies[slot],
+                                       batch.routes[slot], batch.interfaces[slot]))
+        batch.pending = []
+
+        keep = []
+        for packet, slot in zip(batch.packets, batch.slots):
+            if batch.routes[slot] and batch.interfaces[slot]:
+                keep.append(True)
+                continue
+            # Sin ruta en la tabla o sin interfaz de salida disponible
+            batch.drop("NoRouteToHost", "ERROR", "No hay ruta disponible para {1}", "packet from {0}",
+                       (packet.source_ip, packet.destination_ip))
+            keep.append(False)
+        batch.retain(keep)
+
+class ArpStage:
+    """Aprende la interfaz de cada next hop del lote (una vez por destino)"""
+    name = "arp"
+
+    def __call__(self, batch):
+        arp_table = batch.device.arp_table
+        for slot in set(batch.slots):
+            next_hop = batch.routes[slot]["next_hop"]
+            if next_hop not in arp_table:
+                arp_table[next_hop] = batch.interfaces[slot].name
+
+class TtlStage:
+    """Decrementa el TTL de cada paquete y descarta los que expiran"""
+    name = "ttl"
+
+    def __call__(self, batch):
+        keep = []
+        for packet in batch.packets:
+            alive = packet.decrement_ttl()
+            if not alive:
+                batch.drop("TTLExpired", "INFO", "TTL expiró para paquete de {0} a {1}", "",
+                           (packet.source_ip, packet.destination_ip))
+            keep.append(alive)
+        batch.retain(keep)
+
+class EnqueueStage:
+    """Entrega cada paquete al vecino de su interfaz de salida"""
+    name = "enqueue"
+
+    def __call__(self, batch):
+        device = batch.device
+        for packet, slot in zip(batch.packets, batch.slots):
+            output_interface = batch.interfaces[slot]
+            if device._transmit(output_interface, packet):
+                device.packets_sent += 1
+            else:
+                batch.drop("LinkDown", "WARNING", "Enlace caído en {2} para paquete a {1}", "packet from {0}",
+                           (packet.source_ip, packet.destination_ip, output_interface.name))
+
+class ForwardingPipeline:
+    """Secuencia de etapas que procesa lotes de paquetes, con perfil por etapa"""
+
+    def __init__(self, stages=None):
+        if stages is None:
+            stages = [ClassifyStage(), PolicyStage(), RouteStage(), ArpStage(), TtlStage(), EnqueueStage()]
+        self.stages = []
+        self.profile = {}  # Nombre de etapa -> contadores
+        for stage in stages:
+            self._add(len(self.stages), stage)
+
+    def _add(self, position, stage):
+        """Inserta una etapa en la posición dada y crea sus contadores"""
+        if any(existing.name == stage.name for existing in self.stages):
+            raise ValueError(f"Ya existe una etapa '{stage.name}'")
+        self.stages.insert(position, stage)
+        self.profile[stage.name] = {"calls": 0, "packets": 0, "dropped": 0, "seconds": 0.0}
+
+    def _position(self, name):
+        """Posición de la etapa con ese nombre"""
+        for position, stage in enumerate(self.stages):
+            if stage.name == name:
+                return position
+        raise KeyError(f"No existe la etapa '{name}'")
+
+    def replace(self, name, stage):
+        """Reemplaza la etapa `name` por otra (p. ej. una versión vectorizada)"""
+        position = self._position(name)
+        del self.profile[self.stages.pop(position).name]
+        self._add(position, stage)
+
+    def insert_before(self, name, stage):
+        """Agrega una etapa antes de la etapa `name`"""
+        self._add(self._position(name), stage)
+
+    def remove(self, name):
+        """Quita la etapa `name`"""
+        del self.profile[self.stages.pop(self._position(name)).name]
+
+    def run(self, device, packets):
+        """Procesa el lote por todas las etapas; retorna el lote final"""
+        batch = PacketBatch(device, packets)
+        for stage in self.stages:
+            if not batch.packets:
+                break
+            entering = len(batch.packets)
+            dropped = device.packets_dropped
+            start = time.perf_counter()
+            stage(batch)
+            stats = self.profile[stage.name]
+            stats["seconds"] += time.perf_counter() - start
+            stats["calls"] += 1
+            stats["packets"] += entering
+            stats["dropped"] += device.packets_dropped - dropped
+        return batch
+
+    def get_profile(self):
+        """Contadores por etapa en orden de ejecución"""
+        return [(stage.name, dict(self.profile[stage.name])) for stage in self.stages]
+
+    def reset_profile(self):
+        """Pone a cero los contadores de todas las etapas"""
+        for stats in self.profile.values():
+            stats.update(calls=0, packets=0, dropped=0, seconds=0.0)
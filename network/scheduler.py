@@ -0,0 +1,87 @@
+"""
+Planificador de eventos discretos para el simulador
+
+Un evento indica que la cola de una interfaz tiene paquetes que procesar en
+un instante de tiempo simulado: salida (DEPARTURE, output_queue) o llegada
+(ARRIVAL, input_queue). Los eventos se ordenan en un MinHeap por (tiempo,
+secuencia), así los de igual tiempo salen en el orden en que se programaron.
+
+Cada cola tiene a lo sumo un evento pendiente por instante: los paquetes
+que vencen en el mismo instante se procesan en un solo lote, y el costo de
+avanzar el reloj depende de las colas activas, no del número de
+dispositivos. Eventos de una misma cola en instantes distintos no se
+combinan, así un paquete nunca se procesa antes de su instante.
+"""
+
+from data_structures import MinHeap
+
+DEPARTURE = "departure"
+ARRIVAL = "arrival"
+
+class Event:
+    """Trabajo pendiente en una cola de interfaz en un instante dado"""
+    __slots__ = ("time", "device_name", "interface_name", "kind")
+
+    def __init__(self, time, device_name, interface_name, kind):
+        self.time = time
+        self.device_name = device_name
+        self.interface_name = interface_name
+        self.kind = kind
+
+    def __str__(self):
+        return f"t={self.time} {self.kind} {self.device_name}.{self.interface_name}"
+
+class EventScheduler:
+    """Cola de eventos por tiempo con un evento pendiente por cola de interfaz e instante"""
+
+    def __init__(self):
+        self._heap = MinHeap()
+        self._sequence = 0  # Desempate FIFO entre eventos del mismo instante
+        self._pending = set()  # (dispositivo, interfaz, tipo, tiempo) de los eventos pendientes
+        self.scheduled = 0
+        self.coalesced = 0
+        self.processed = 0
+
+    def schedule(self, time, device_name, interface_name, kind=DEPARTURE):
+        """Programa trabajo en una cola; retorna False si ya había un evento en ese instante"""
+        key = (device_name, interface_name, kind, time)
+        if key in self._pending:
+            self.coalesced += 1
+            return False
+
+        self._pending.add(key)
+        self._heap.push((time, self._sequence, Event(time, device_name, interface_name, kind)))
+        self._sequence += 1
+        self.scheduled += 1
+        return True
+
+    def next_time(self):
+        """Tiempo del próximo evento (None si no hay)"""
+        top = self._heap.peek()
+        return top[0] if top is not None else None
+
+    def pop(self):
+        """Extrae el próximo evento"""
+        _, _, event = self._heap.pop()
+        self._pending.discard((event.device_name, event.interface_name, event.kind, event.time))
+        self.processed += 1
+        return event
+
+    def clear(self):
+        """Descarta todos los eventos pendientes"""
+        self._heap.clear()
+        self._pending.clear()
+
+    def get_stats(self):
+        """Obtiene estadísticas del planificador"""
+        return {
+            "pending": len(self._heap),
+            "scheduled": self.scheduled,
+            "coalesced": self.coalesced,
+            "processed": self.processed,
+            "next_time": self.next_time()
+        }
+
+    def __len__(self):
+        """Retorna el número de eventos pendientes"""
+        return len(self._heap)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Pruebas del AVLTree iterativo y su uso como tabla de rutas"""
+
+import random
+
+from data_structures import AVLTree
+from network import Device
+
+def _check_balanced(node):
+    """Verifica alturas y factor de balance; retorna la altura del subárbol"""
+    if node is None:
+        return 0
+    left = _check_balanced(node.left)
+    right = _check_balanced(node.right)
+    assert abs(left - right) <= 1
+    assert node.height == 1 + max(left, right)
+    return node.height
+
+def test_avl_random_operations():
+    """Inserciones y eliminaciones aleatorias mantienen el árbol balanceado"""
+    print("=== Probando AVLTree iterativo ===")
+    random.seed(7)
+    tree = AVLTree()
+    expected = {}
+
+    for _ in range(3000):
+        key = random.randint(0, 400)
+        if random.random() < 0.6:
+            tree.insert_key(key, key * 2)
+            expected[key] = key * 2
+        else:
+            tree.delete_key(key)
+            expected.pop(key, None)
+
+    assert tree.get_all_routes() == sorted(expected.items())
+    assert tree.nodes_count == len(expected)
+    _check_balanced(tree.root)
+    assert sum(tree.get_stats()["rotations"].values()) > 0
+
+    for key in range(401):
+        node = tree.search_key(key)
+        assert (node.value if node else None) == expected.get(key)
+
+    print(f"Nodos: {tree.nodes_count}, altura: {tree.get_tree_height()}")
+
+def test_avl_ordered_queries():
+    """iter_items, range, floor y ceiling recorren el árbol sin materializarlo"""
+    print("=== Probando consultas ordenadas del AVL ===")
+    tree = AVLTree()
+    for key in range(0, 100, 10):
+        tree.insert_key(key, str(key))
+
+    assert len(tree) == 10
+    assert [key for key, _ in tree.iter_items(25, 60)] == [30, 40, 50]
+    assert [key for key, _ in tree.iter_items(stop=20)] == [0, 10]
+    assert [key for key, _ in tree.range(30, 60)] == [30, 40, 50, 60]
+    assert list(tree.range(91, 99)) == []
+
+    assert tree.floor(35) == (30, "30")
+    assert tree.floor(40) == (40, "40")
+    assert tree.floor(-1) is None
+    assert tree.ceiling(35) == (40, "40")
+    assert tree.ceiling(91) is None
+
+    # El iterador es perezoso: se puede tomar solo el primer elemento
+    assert next(iter(tree)) == (0, "0")
+
+def test_avl_bulk_build_and_merge():
+    """from_sorted construye un árbol balanceado; union/difference combinan tablas"""
+    print("=== Probando construcción y combinación en bloque ===")
+    tree = AVLTree.from_sorted((key, "a") for key in range(0, 1000, 2))
+    assert len(tree) == 500
+    _check_balanced(tree.root)
+
+    other = AVLTree()
+    for key in range(0, 1000, 3):
+        other.insert_key(key, "b")
+
+    assert tree.union(other) == 333 - 166  # Múltiplos de 3 impares
+    _check_balanced(tree.root)
+    assert len(tree) == len(tree.get_all_routes()) == 667
+    assert tree.search_key(6).value == "b"  # Prevalece el valor de other
+    assert tree.search_key(4).value == "a"
+    assert len(other) == 334  # other no se modifica
+
+    assert tree.difference(other) == 334
+    _check_balanced(tree.root)
+    assert [key for key, _ in tree] == [key for key in range(0, 1000, 2) if key % 3]
+
+    try:
+        AVLTree.from_sorted([(2, None), (1, None)])
+        assert False, "from_sorted debería rechazar claves desordenadas"
+    except ValueError:
+        pass
+
+def test_device_add_routes():
+    """add_routes carga rutas en bloque; la última ruta repetida prevalece"""
+    router = Device("R1", "router")
+    router.add_route("10.0.0.1", "255.255.255.255", "192.168.1.1", 1)
+    added = router.add_routes([
+        ("10.0.0.2", "255.255.255.255", "192.168.1.2", 1),
+        ("10.0.0.1", "255.255.255.255", "192.168.1.3", 2),
+        ("10.0.0.2", "255.255.255.255", "192.168.1.4", 3),
+    ])
+    assert added == 1
+    assert len(router.routing_table) == 2
+    assert router.find_route("10.0.0.1")["next_hop"] == "192.168.1.3"
+    assert router.find_route("10.0.0.2")["metric"] == 3
+
+def test_integer_route_keys():
+    """Las rutas se indexan por entero pero se muestran como 'a.b.c.d/len'"""
+    print("=== Probando claves enteras de ruta ===")
+    router = Device("R1", "router")
+    router.add_route("10.1.2.3", "255.255.0.0", "192.168.1.1", 1)  # Se enmascara a 10.1.0.0
+    router.add_route("10.1.2.0", "255.255.255.0", "192.168.1.2", 1)
+    router.add_route("2.0.0.0", "255.0.0.0", "192.168.1.3", 1)
+
+    # Orden numérico: 2.x antes que 10.x
+    assert [key for key, _ in router.get_routing_table()] == [
+        "2.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24"]
+    assert router.find_route("10.1.2.200")["next_hop"] == "192.168.1.2"
+    assert router.find_route("10.1.9.9")["next_hop"] == "192.168.1.1"
+    assert router.find_route("11.0.0.1") is None
+
+    router.remove_route("10.1.2.0", "255.255.255.0")
+    assert router.find_route("10.1.2.200")["next_hop"] == "192.168.1.1"
+
+def test_fib_follows_route_table():
+    """La FIB Patricia se mantiene sincronizada con add_route/remove_route"""
+    print("=== Probando FIB Patricia del dispositivo ===")
+    router = Device("R1", "router")
+    router.add_route("0.0.0.0", "0.0.0.0", "192.168.1.254", 100)
+    router.add_route("172.16.0.0", "255.240.0.0", "192.168.1.1", 1)
+    router.add_routes([("172.16.5.0", "255.255.255.128", "192.168.1.2", 1)])
+
+    assert len(router.fib) == len(router.routing_table) == 3
+    assert router.find_route("172.16.5.100")["next_hop"] == "192.168.1.2"
+    assert router.find_route("172.16.5.200")["next_hop"] == "192.168.1.1"
+    assert router.find_route("8.8.8.8")["next_hop"] == "192.168.1.254"
+
+    router.remove_route("0.0.0.0", "0.0.0.0")
+    assert router.find_route("8.8.8.8") is None
+    assert len(router.fib) == 2
+
+def test_compiled_fib_rebuilds_lazily():
+    """La FIB compilada se recompila en la primera búsqueda tras un cambio"""
+    router = Device("R1", "router")
+    router.add_route("10.0.0.0", "255.0.0.0", "192.168.1.1", 1)
+    router.enable_compiled_fib()
+    assert router.find_route("10.1.2.3")["next_hop"] == "192.168.1.1"
+
+    router.add_route("10.1.2.0", "255.255.255.240", "192.168.1.2", 1)
+    assert router.get_fib_stats()["compiled"]["stale"]
+    assert router.find_route("10.1.2.3")["next_hop"] == "192.168.1.2"
+    assert router.find_route("10.1.2.30")["next_hop"] == "192.168.1.1"
+    assert router.get_fib_stats()["compiled"]["builds"] == 2
+
+    router.remove_route("10.0.0.0", "255.0.0.0")
+    assert router.find_route("10.1.2.30") is None
+    router.enable_compiled_fib(False)
+    assert router.get_fib_stats()["compiled"] is None
+
+def test_find_route_returns_route():
+    """find_route retorna el diccionario de la ruta, no el nodo del árbol"""
+    print("=== Probando Device.find_route ===")
+    router = Device("R1", "router")
+    router.add_route("10.0.0.1", "255.255.255.255", "192.168.1.2", 5)
+
+    route = router.find_route("10.0.0.1")
+    assert route["next_hop"] == "192.168.1.2"
+    assert route["metric"] == 5
+    assert router.find_route("10.0.0.2") is None
+
+if __name__ == "__main__":
+    test_avl_random_operations()
+    test_avl_ordered_queries()
+    test_avl_bulk_build_and_merge()
+    test_device_add_routes()
+    test_integer_route_keys()
+    test_fib_follows_route_table()
+    test_compiled_fib_rebuilds_lazily()
+    test_find_route_returns_route()
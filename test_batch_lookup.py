@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Pruebas del longest prefix match por lotes (tabla de intervalos, Trie.lookup_many, Device.find_routes_many)"""
+
+import random
+
+from data_structures import IntervalTable, PatriciaTrie, Trie
+from data_structures.interval_table import np
+from network import Device, Packet
+from network.addressing import PREFIX_MASKS, int_to_ip, prefix_length_to_mask
+
+def test_interval_table_matches_patricia():
+    """Cada dirección cae en el intervalo del prefijo más largo que la contiene"""
+    print("=== Probando IntervalTable ===")
+    random.seed(21)
+    trie = PatriciaTrie(32)
+    for _ in range(800):
+        length = random.choice([0, 4, 8, 12, 16, 24, 30, 32])
+        key = random.getrandbits(32) & 0xF0F0FFFF & PREFIX_MASKS[length]
+        trie.insert(key, length, (key, length))
+
+    table = IntervalTable(trie.items())
+    addresses = [random.getrandbits(32) & 0xF0F0FFFF for _ in range(3000)]
+    addresses += [0, 0xFFFFFFFF] + [key for key, _, _ in trie.items()]
+    ids = table.lookup_many(addresses)
+    for address, value_id in zip(addresses, ids):
+        match = trie.longest_match(address)
+        assert (table.values[value_id] if value_id >= 0 else None) == (match[2] if match else None)
+        assert table.lookup(address) == value_id
+
+    assert list(IntervalTable([]).lookup_many([0, 5])) == [-1, -1]
+
+def test_trie_lookup_many():
+    """lookup_many coincide con search_longest_prefix y ve los cambios del Trie"""
+    print("=== Probando Trie.lookup_many ===")
+    random.seed(22)
+    trie = Trie()
+    for _ in range(300):
+        length = random.randint(8, 28)
+        trie.insert(int_to_ip(random.getrandbits(32) & 0x0A3FFFFF), prefix_length_to_mask(length),
+                    {"ttl-min": length})
+
+    ips = [int_to_ip(random.getrandbits(32) & 0x0A3FFFFF) for _ in range(2000)]
+    ids, table = trie.lookup_many(ips)
+    assert [table[i] if i >= 0 else (None, None) for i in ids] == [trie.search_longest_prefix(ip) for ip in ips]
+
+    trie.insert("10.0.0.0", "255.0.0.0", {"block": True})
+    ids, table = trie.lookup_many(["10.255.0.1"])
+    assert table[ids[0]] == ("10.0.0.0/8", {"block": True})
+
+    if np is not None:
+        ids, table = trie.lookup_many(np.array([0x0AFF0001], dtype=np.uint32))
+        assert table[ids[0]][0] == "10.0.0.0/8"
+
+def _router(routes):
+    router = Device("R1", "router")
+    router.add_interface("g0/0")
+    iface = router.get_interface("g0/0")
+    iface.set_status("up")
+    iface.connect_to("R2", "g0/0")
+    for prefix, mask in routes:
+        router.add_route(prefix, mask, "192.168.1.2", 1)
+    return router, iface
+
+def test_device_find_routes_many():
+    """La búsqueda de rutas por lote coincide con find_route y se invalida al cambiar rutas"""
+    router, _ = _router([("10.0.0.0", "255.0.0.0"), ("10.1.0.0", "255.255.0.0")])
+    ids, routes = router.find_routes_many(["10.1.2.3", "10.2.0.1", "11.0.0.1"])
+    assert [routes[i]["mask"] if i >= 0 else None for i in ids] == ["255.255.0.0", "255.0.0.0", None]
+
+    router.remove_route("10.0.0.0", "255.0.0.0")
+    ids, routes = router.find_routes_many(["10.2.0.1"])
+    assert ids[0] == -1
+
+def test_process_queues_batch_matches_per_packet():
+    """Un lote grande produce los mismos contadores que el procesamiento por paquete"""
+    print("=== Probando process_queues por lotes ===")
+    random.seed(23)
+    destinations = [f"10.{random.randint(0, 3)}.{random.randint(0, 255)}.1" for _ in range(600)]
+    destinations += ["2001:db8::1"] * 5
+
+    results = []
+    for threshold in (10 ** 9, 1):
+        router, iface = _router([("10.0.0.0", "255.0.0.0")])
+        router.add_route("2001:db8::", "32", "fe80::1", 1)
+        router.BATCH_LOOKUP_THRESHOLD = threshold
+        router.set_policy("10.1.0.0", "255.255.0.0", "block", True)
+        router.set_policy("10.2.0.0", "255.255.0.0", "ttl-min", 10)
+        for i, destination in enumerate(destinations):
+            iface.output_queue.enqueue(Packet("192.168.1.1", destination, "x", 5 + i % 10))
+        router.process_queues()
+        results.append((router.packets_sent, router.packets_dropped))
+
+    assert results[0] == results[1]
+    assert results[0][0] > 0 and results[0][1] > 0
+
+if __name__ == "__main__":
+    test_interval_table_matches_patricia()
+    test_trie_lookup_many()
+    test_device_find_routes_many()
+    test_process_queues_batch_matches_per_packet()
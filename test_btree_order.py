@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Pruebas del B-Tree con órdenes pequeños y grandes contra un diccionario"""
+
+import random
+
+from data_structures import BTree
+
+def _check_invariants(tree):
+    """Claves ordenadas, ocupación mínima/máxima y todas las hojas a la misma profundidad"""
+    leaf_depths = set()
+    stack = [(tree.root, 0, None, None)]
+    nodes = 0
+    while stack:
+        node, depth, low, high = stack.pop()
+        nodes += 1
+        assert node.keys == sorted(node.keys)
+        assert len(node.keys) <= tree.order - 1
+        if node is not tree.root:
+            assert len(node.keys) >= tree.min_keys
+        assert all((low is None or key > low) and (high is None or key < high) for key in node.keys)
+        if node.leaf:
+            leaf_depths.add(depth)
+            continue
+        assert len(node.children) == len(node.keys) + 1
+        bounds = [low] + node.keys + [high]
+        for i, child in enumerate(node.children):
+            stack.append((child, depth + 1, bounds[i], bounds[i + 1]))
+    assert len(leaf_depths) <= 1
+    assert nodes == tree.nodes_count
+
+def test_btree_random_operations():
+    """insert/search/delete coinciden con un dict para varios órdenes"""
+    print("=== Probando B-Tree con distintos órdenes ===")
+    random.seed(31)
+    for order in (3, 4, 5, 64, 256):
+        tree = BTree(order=order)
+        expected = {}
+        for step in range(6000):
+            key = f"snapshot_{random.randint(0, 2500):05d}"
+            if random.random() < 0.6:
+                assert tree.insert(key, step) == (key not in expected)
+                expected[key] = step
+            else:
+                assert tree.delete(key) == (key in expected)
+                expected.pop(key, None)
+            if step % 1000 == 0:
+                _check_invariants(tree)
+
+        _check_invariants(tree)
+        assert len(tree) == len(expected)
+        assert tree.get_all_entries() == sorted(expected.items())
+        for key, value in expected.items():
+            assert tree.search(key) == value
+        assert tree.search("snapshot_x") is None
+
+        for key in list(expected):
+            assert tree.delete(key)
+        _check_invariants(tree)
+        assert tree.get_stats()["height"] == 0 and tree.get_all_entries() == []
+        print(f"   order={order}: splits={tree.splits} merges={tree.merges}")
+
+if __name__ == "__main__":
+    test_btree_random_operations()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Pruebas de la caché LRU y de la caché de decisiones de reenvío por dispositivo"""
+
+from data_structures import LRUCache
+from network import Device, Packet
+
+def test_lru_cache_eviction():
+    """La entrada menos usada recientemente es la desalojada"""
+    print("=== Probando LRUCache ===")
+    cache = LRUCache(capacity=3)
+    for key in "abc":
+        cache.put(key, key.upper())
+
+    assert cache.get("a") == "A"  # "b" pasa a ser la menos reciente
+    cache.put("d", "D")
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert len(cache) == 3
+
+    cache.put("c", "C2")  # Actualizar también la marca como reciente
+    cache.put("e", "E")
+    assert "a" not in cache
+    assert cache.get("c") == "C2"
+
+    assert cache.get_stats() == {"size": 3, "capacity": 3, "hits": 2, "misses": 1, "evictions": 2}
+    assert cache.remove("c")
+    assert not cache.remove("c")
+
+def _router_with_link():
+    router = Device("R1", "router")
+    router.add_interface("g0/0")
+    iface = router.get_interface("g0/0")
+    iface.set_status("up")
+    iface.connect_to("R2", "g0/0")
+    router.add_route("10.0.0.0", "255.0.0.0", "192.168.1.2", 1)
+    return router, iface
+
+def _send(router, iface, destination, count=1, ttl=64):
+    for _ in range(count):
+        iface.output_queue.enqueue(Packet("192.168.1.1", destination, "hola", ttl))
+    router.process_queues()
+
+def test_decision_cache_hits_and_invalidation():
+    """Los paquetes al mismo destino reutilizan la decisión hasta que algo cambia"""
+    print("=== Probando caché de decisiones ===")
+    router, iface = _router_with_link()
+
+    # Un lote consulta la caché una vez por destino; el lote siguiente la reutiliza
+    _send(router, iface, "10.1.1.1", count=50)
+    stats = router.decision_cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+    _send(router, iface, "10.1.1.1", count=49)
+    stats = router.decision_cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert router.packets_sent == 99
+
+    # Cambio de política: el bloqueo se aplica de inmediato
+    router.set_policy("10.1.0.0", "255.255.0.0", "block", True)
+    _send(router, iface, "10.1.1.1")
+    assert router.packets_dropped == 1
+
+    # Quitar la política y la ruta: ahora no hay ruta
+    router.remove_policy("10.1.0.0", "255.255.0.0")
+    router.remove_route("10.0.0.0", "255.0.0.0")
+    _send(router, iface, "10.1.1.1")
+    assert router.packets_dropped == 2
+
+    # Interfaz caída: sin interfaz de salida aunque vuelva la ruta
+    router.add_route("10.0.0.0", "255.0.0.0", "192.168.1.2", 1)
+    iface.set_status("down")
+    _send(router, iface, "10.1.1.1")
+    assert router.packets_dropped == 3
+
+    iface.set_status("up")
+    _send(router, iface, "10.1.1.1")
+    assert router.packets_sent == 100
+    assert router.decision_cache.get_stats()["misses"] == 5
+
+def test_decision_cache_keeps_ttl_check_per_packet():
+    """La política ttl-min se evalúa con el TTL de cada paquete"""
+    router, iface = _router_with_link()
+    router.set_policy("10.0.0.0", "255.0.0.0", "ttl-min", 10)
+
+    _send(router, iface, "10.2.2.2", ttl=64)
+    _send(router, iface, "10.2.2.2", ttl=5)
+    assert router.packets_sent == 1
+    assert router.packets_dropped == 1
+    assert router.decision_cache.hits == 1
+
+if __name__ == "__main__":
+    test_lru_cache_eviction()
+    test_decision_cache_hits_and_invalidation()
+    test_decision_cache_keeps_ttl_check_per_packet()
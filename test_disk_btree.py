@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Pruebas del B-Tree paginado en disco y del índice persistente de snapshots"""
+
+import os
+import random
+import tempfile
+
+from cli import CLIParser
+from data_structures import DiskBTree
+from network import Network
+from utils import ErrorLogger
+
+def test_disk_btree_random_operations():
+    """insert/search/delete coinciden con un dict y sobreviven a reabrir el archivo"""
+    print("=== Probando DiskBTree ===")
+    random.seed(41)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.db")
+        tree = DiskBTree(path, order=5, page_size=512, cache_size=8)
+        expected = {}
+        for step in range(4000):
+            key = f"snapshot_{random.randint(0, 1500):05d}"
+            if random.random() < 0.6:
+                value = f"snapshots/{key}_{step}.cfg"
+                assert tree.insert(key, value) == (key not in expected)
+                expected[key] = value
+            else:
+                assert tree.delete(key) == (key in expected)
+                expected.pop(key, None)
+
+        assert len(tree) == len(expected)
+        assert tree.get_all_entries() == sorted(expected.items())
+        stats = tree.get_stats()
+        # Las páginas liberadas por fusiones se reutilizan
+        assert stats["nodes"] + stats["free_pages"] + 1 == stats["pages"]
+        tree.close()
+
+        # Reabrir: solo se lee la cabecera y cada búsqueda toca O(altura) páginas
+        tree = DiskBTree(path, cache_size=8)
+        assert (tree.order, tree.page_size) == (5, 512)
+        assert tree.page_reads == 0
+        height = tree.get_height()
+        for key, value in list(expected.items())[:50]:
+            reads = tree.page_reads
+            assert tree.search(key) == value
+            assert tree.page_reads - reads <= height
+        assert tree.search("snapshot_x") is None
+
+        for key in list(expected):
+            assert tree.delete(key)
+        assert tree.get_all_entries() == [] and tree.get_height() == 0
+        tree.close()
+
+def test_disk_btree_range_and_prefix():
+    """Los recorridos por rango siguen las hojas enlazadas y solo leen lo que consumen"""
+    print("=== Probando recorridos por rango del B+Tree ===")
+    random.seed(43)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.db")
+        tree = DiskBTree(path, order=6, page_size=512, cache_size=4)
+        keys = sorted(f"snapshot_{value}" for value in random.sample(range(1_700_000_000, 1_800_000_000), 3000))
+        for key in random.sample(keys, len(keys)):
+            tree.insert(key, key + ".cfg")
+        for key in keys[::7]:
+            tree.delete(key)
+        expected = [key for i, key in enumerate(keys) if i % 7]
+
+        assert [key for key, _ in tree.range()] == expected
+        start, end = keys[500], keys[900]
+        assert [key for key, _ in tree.range(start, end)] == [key for key in expected if start <= key <= end]
+        assert [key for key, _ in tree.range(end, start)] == []
+        assert [key for key, _ in tree.prefix("snapshot_17")] == [key for key in expected if key.startswith("snapshot_17")]
+        assert list(tree.prefix("zzz")) == []
+
+        # Los primeros 3 resultados solo leen el camino hasta la primera hoja (y quizá la siguiente)
+        tree.close()
+        tree = DiskBTree(path, cache_size=4)
+        scan = tree.range(keys[1000])
+        assert [next(scan)[0] for _ in range(3)] == [key for key in expected if key >= keys[1000]][:3]
+        assert tree.page_reads <= tree.get_height() + 1
+        tree.close()
+
+def test_disk_btree_bulk_load_and_insert_many():
+    """La carga masiva produce nodos llenos al fill_factor y insert_many mezcla lotes"""
+    print("=== Probando carga masiva del B+Tree ===")
+    random.seed(47)
+    with tempfile.TemporaryDirectory() as directory:
+        items = [(f"snapshot_{i:07d}", f"{i}.cfg") for i in range(0, 20000, 2)]
+        loose = DiskBTree(os.path.join(directory, "loose.db"), order=16, page_size=1024)
+        packed = DiskBTree(os.path.join(directory, "packed.db"), order=16, page_size=1024)
+        assert loose.bulk_load(iter(items), fill_factor=0.5) == len(items)
+        assert packed.bulk_load(iter(items), fill_factor=1.0) == len(items)
+        assert loose.get_all_entries() == packed.get_all_entries() == items
+        assert packed.get_stats()["nodes"] < loose.get_stats()["nodes"]
+        assert packed.get_stats()["splits"] == 0
+
+        # Un lote chico se inserta en orden; uno grande reconstruye el árbol
+        expected = dict(items)
+        for size in (50, 8000):
+            batch = [(f"snapshot_{random.randint(0, 40000):07d}", f"lote{size}") for _ in range(size)]
+            new_keys = len({key for key, _ in batch} - expected.keys())
+            assert packed.insert_many(batch) == new_keys
+            expected.update(batch)
+            assert packed.get_all_entries() == sorted(expected.items())
+            stats = packed.get_stats()
+            assert stats["nodes"] + stats["free_pages"] + 1 == stats["pages"]
+        for key in random.sample(sorted(expected), 100):
+            assert packed.search(key) == expected[key]
+
+        # Claves desordenadas o repetidas: error y el árbol sigue vacío
+        empty = DiskBTree(os.path.join(directory, "empty.db"), order=4, page_size=256)
+        for bad in ([("b", "1"), ("a", "2")], [("a", "1"), ("a", "2")]):
+            try:
+                empty.bulk_load(bad)
+                assert False, "Se esperaba ValueError"
+            except ValueError:
+                pass
+        assert len(empty) == 0 and empty.get_all_entries() == []
+        try:
+            packed.bulk_load(items)
+            assert False, "Se esperaba ValueError"
+        except ValueError:
+            pass
+        for tree in (loose, packed, empty):
+            tree.close()
+
+def test_disk_btree_rebuild_reuses_free_pages():
+    """Las reconstrucciones repetidas reutilizan la lista libre: el archivo no crece"""
+    print("=== Probando reutilización de páginas en insert_many ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.db")
+        tree = DiskBTree(path, order=8, page_size=512)
+        keys = [f"snapshot_{i:05d}" for i in range(2000)]
+        tree.bulk_load((key, "0.cfg") for key in keys)
+        pages = []
+        for round_number in range(1, 8):
+            assert tree.insert_many((key, f"{round_number}.cfg") for key in keys) == 0
+            stats = tree.get_stats()
+            assert stats["nodes"] + stats["free_pages"] + 1 == stats["pages"]
+            pages.append(stats["pages"])
+        # Tras la primera reconstrucción el árbol nuevo cabe en las páginas liberadas
+        assert len(set(pages[1:])) == 1 and pages[0] == pages[-1]
+        assert os.path.getsize(path) <= pages[-1] * 512
+        assert tree.get_all_entries() == [(key, "7.cfg") for key in keys]
+
+        # Una carga fallida devuelve las páginas tomadas a la lista libre
+        for key in keys:
+            tree.delete(key)
+        free_pages = tree.get_stats()["free_pages"]
+        try:
+            tree.bulk_load([("b", "1"), ("a", "2")])
+            assert False, "Se esperaba ValueError"
+        except ValueError:
+            pass
+        assert tree.get_stats()["free_pages"] == free_pages
+        assert tree.get_stats()["pages"] == pages[-1]
+        tree.bulk_load((key, "8.cfg") for key in keys)
+        assert tree.get_stats()["pages"] == pages[-1]
+        assert tree.search(keys[-1]) == "8.cfg"
+        tree.close()
+
+def test_disk_btree_shared_file():
+    """Dos instancias sobre el mismo archivo ven los cambios de la otra"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.db")
+        first = DiskBTree(path, order=4, page_size=256)
+        second = DiskBTree(path)
+        for i in range(20):
+            first.insert(f"k{i:02d}", f"v{i}")
+        assert second.search("k07") == "v7"
+        second.delete("k07")
+        assert first.search("k07") is None
+        assert len(first) == 19
+        first.close()
+        second.close()
+
+def test_disk_btree_rejects_oversized_entries():
+    """Una entrada que no cabe en la página se rechaza antes de modificar el árbol"""
+    with tempfile.TemporaryDirectory() as directory:
+        tree = DiskBTree(os.path.join(directory, "index.db"), order=4, page_size=256)
+        try:
+            tree.insert("x" * 100, "y" * 100)
+            assert False, "Se esperaba ValueError"
+        except ValueError:
+            pass
+        assert len(tree) == 0
+        tree.close()
+
+def test_network_snapshot_index_persists():
+    """El índice se reconstruye desde los .cfg y sobrevive a un reinicio"""
+    print("=== Probando índice persistente de snapshots ===")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("previo.cfg", "previo-2.cfg"):
+            with open(os.path.join(directory, name), "w") as f:
+                f.write("hostname R9\n")
+
+        network = Network(snapshot_dir=directory)
+        network.add_device("R1", "router")
+        assert [key for key, _ in network.get_snapshots()] == ["previo", "previo-2"]
+        ok, filename = network.save_snapshot("lab")
+        assert ok and filename == os.path.join(directory, "lab.cfg")
+        network.close()
+
+        restarted = Network(snapshot_dir=directory)
+        assert [key for key, _ in restarted.get_snapshots()] == ["lab", "previo", "previo-2"]
+        ok, _ = restarted.load_snapshot("lab")
+        assert ok and "R1" in restarted.devices
+
+        cli = CLIParser(restarted, ErrorLogger())
+        for key in ("snapshot_1700000300", "snapshot_1700000100", "snapshot_1700000200"):
+            restarted.save_snapshot(key)
+        assert cli.parse_command("show snapshots limit 2").splitlines()[1:] == [
+            f"  lab -> {os.path.join(directory, 'lab.cfg')}",
+            f"  previo -> {os.path.join(directory, 'previo.cfg')}"]
+        output = cli.parse_command("show snapshots from snapshot_1700000150 to snapshot_1700000300")
+        assert [line.split()[0] for line in output.splitlines()[1:]] == ["snapshot_1700000200", "snapshot_1700000300"]
+        output = cli.parse_command("show snapshots prefix snapshot_ limit 1")
+        assert [line.split()[0] for line in output.splitlines()[1:]] == ["snapshot_1700000100"]
+        assert cli.parse_command("show snapshots limit x").startswith("Sintaxis")
+        restarted.close()
+
+if __name__ == "__main__":
+    test_disk_btree_random_operations()
+    test_disk_btree_range_and_prefix()
+    test_disk_btree_bulk_load_and_insert_many()
+    test_disk_btree_rebuild_reuses_free_pages()
+    test_disk_btree_shared_file()
+    test_disk_btree_rejects_oversized_entries()
+    test_network_snapshot_index_persists()
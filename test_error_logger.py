@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Pruebas del sistema de registro de errores"""
+
+import tempfile
+
+from utils import ErrorEntry, ErrorLogger, ErrorLogSink
+
+def test_error_logger_ring_buffer():
+    """El registro conserva solo las últimas max_entries entradas"""
+    print("=== Probando ErrorLogger acotado ===")
+    logger = ErrorLogger(max_entries=5)
+
+    for i in range(12):
+        severity = "WARNING" if i % 2 else "ERROR"
+        logger.log_error("PolicyViolation" if i % 3 else "NoRouteToHost", severity, f"evento {i}")
+
+    recent = logger.get_recent_errors()
+    assert len(logger) == 5
+    assert [e.message for e in recent] == [f"evento {i}" for i in range(7, 12)]
+    assert [e.message for e in logger.get_recent_errors(2)] == ["evento 10", "evento 11"]
+
+    # Una capacidad inválida se rechaza sin modificar el registro
+    for invalid in (0, -3):
+        try:
+            logger.max_entries = invalid
+            assert False, "Se esperaba ValueError"
+        except ValueError:
+            pass
+    assert logger.max_entries == 5 and len(logger) == 5
+
+    print(f"Entradas conservadas: {len(logger)}")
+
+def test_error_logger_indexed_queries():
+    """Consultas por tipo/severidad y conteos no modifican el registro"""
+    print("=== Probando consultas indexadas ===")
+    logger = ErrorLogger(max_entries=5)
+
+    for i in range(12):
+        severity = "WARNING" if i % 2 else "ERROR"
+        logger.log_error("PolicyViolation" if i % 3 else "NoRouteToHost", severity, f"evento {i}")
+
+    by_type = logger.get_errors_by_type("NoRouteToHost")
+    assert [e.message for e in by_type] == ["evento 9"]
+    assert [e.message for e in logger.get_errors_by_severity("ERROR")] == ["evento 8", "evento 10"]
+    assert logger.get_errors_by_type("Inexistente") == []
+
+    counts = logger.get_error_counts()
+    assert counts == {
+        "by_type": {"PolicyViolation": 4, "NoRouteToHost": 1},
+        "by_severity": {"WARNING": 3, "ERROR": 2},
+        "total": 5,
+        "entries": 5,
+        "suppressed": 0,
+    }
+    assert len(logger) == 5
+
+    logger.clear_errors()
+    assert logger.get_error_counts()["total"] == 0
+    print(f"Conteos: {counts}")
+
+def test_error_logger_aggregation():
+    """En modo agregado los eventos idénticos se fusionan en una entrada"""
+    print("=== Probando agregación de eventos ===")
+    logger = ErrorLogger(max_entries=10, aggregate=True)
+
+    for i in range(1000):
+        logger.log_error(
+            "PolicyViolation", "WARNING",
+            "Paquete bloqueado por política en prefijo {prefix}",
+            "packet from {source} to {destination}",
+            {"prefix": "10.0.0.0/8", "source": "1.1.1.1", "destination": f"10.0.{i // 256}.{i % 256}"}
+        )
+    logger.log_error("SyntaxError", "ERROR", "Falta nombre del host", "hostname")
+
+    assert len(logger) == 2
+    storm = logger.get_errors_by_type("PolicyViolation")[0]
+    assert storm.count == 1000
+    assert storm.message == "Paquete bloqueado por política en prefijo 10.0.0.0/8"
+    assert storm.command == "packet from 1.1.1.1 to 10.0.3.231"
+    assert "(x1000" in str(storm)
+
+    counts = logger.get_error_counts()
+    assert counts["by_type"]["PolicyViolation"] == 1000
+    assert counts["total"] == 1001
+    assert counts["entries"] == 2
+    print(f"Entrada agregada: {storm}")
+
+def test_error_logger_sampling_and_rate_limit():
+    """Muestreo y limitación por tipo descartan eventos y los contabilizan"""
+    print("=== Probando muestreo y limitación ===")
+    logger = ErrorLogger()
+    logger.set_sampling("TTLExpired", 10)
+    logger.set_rate_limit("NoRouteToHost", 5, per_seconds=3600)
+
+    for i in range(100):
+        logger.log_error("TTLExpired", "INFO", "TTL expiró ({n})", "", {"n": i})
+        logger.log_error("NoRouteToHost", "ERROR", "Sin ruta")
+
+    assert len(logger.get_errors_by_type("TTLExpired")) == 10
+    assert logger.get_errors_by_type("TTLExpired")[1].message == "TTL expiró (10)"
+    assert len(logger.get_errors_by_type("NoRouteToHost")) == 5
+    assert logger.get_suppressed_counts() == {"TTLExpired": 90, "NoRouteToHost": 95}
+    logger.max_entries = 500  # Cambiar la capacidad no pierde los descartes
+    assert logger.get_error_counts()["suppressed"] == 185
+
+    for max_events, per_seconds in ((5, 0), (5, -1), (0, 1), (-2, 1)):
+        try:
+            logger.set_rate_limit("NoRouteToHost", max_events, per_seconds)
+            assert False, "Se esperaba ValueError"
+        except ValueError:
+            pass
+    assert logger._rate_limits["NoRouteToHost"][3] == 5  # El límite anterior sigue vigente
+
+    logger.set_sampling("TTLExpired", None)
+    logger.log_error("TTLExpired", "INFO", "TTL expiró")
+    assert len(logger.get_errors_by_type("TTLExpired")) == 11
+
+    logger.clear_errors()
+    assert logger.get_suppressed_counts() == {}
+    assert logger.get_error_counts()["suppressed"] == 0
+
+def test_error_entry_lazy_formatting():
+    """Las entradas guardan timestamp en ns y formatean solo al mostrarse"""
+    print("=== Probando ErrorEntry compacta ===")
+    logger = ErrorLogger()
+    logger.log_error("NoRouteToHost", "ERROR", "No hay ruta disponible para {1}",
+                     "packet from {0}", ("192.168.1.10", "8.8.8.8"))
+    logger.log_error("SyntaxError", "ERROR", "Falta {campo}", "hostname", {"campo": "nombre"})
+
+    route_error, syntax_error = logger.get_recent_errors()
+    assert not hasattr(route_error, "__dict__")
+    assert isinstance(route_error.timestamp_ns, int)
+    assert route_error.message == "No hay ruta disponible para 8.8.8.8"
+    assert route_error.command == "packet from 192.168.1.10"
+    assert syntax_error.message == "Falta nombre"
+    assert syntax_error.args == {"campo": "nombre"}
+
+    summary = route_error.get_summary()
+    assert summary["timestamp"] == route_error.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    assert str(route_error).endswith("No hay ruta disponible para 8.8.8.8 | Command: 'packet from 192.168.1.10'")
+
+def _entry_at(timestamp_ns, message):
+    """Crea una entrada con un timestamp fijo"""
+    entry = ErrorEntry("NoRouteToHost", "ERROR", message, "packet\tfrom x")
+    entry.timestamp_ns = entry.last_seen_ns = timestamp_ns
+    return entry
+
+def test_error_log_sink_time_range():
+    """El destino en disco rota segmentos y responde rangos de tiempo tras reiniciar"""
+    print("=== Probando ErrorLogSink ===")
+    with tempfile.TemporaryDirectory() as directory:
+        sink = ErrorLogSink(directory, segment_max_bytes=2048, max_segments=100, index_every=4)
+        for i in range(300):
+            sink.submit(_entry_at(1_000 + i * 10, f"evento {i}"))
+        sink.close()
+
+        stats = sink.get_stats()
+        assert stats["entries_written"] == 300
+        assert stats["segments"] > 1
+
+        # Reabrir el directorio simula un reinicio del simulador
+        reopened = ErrorLogSink(directory, segment_max_bytes=2048, max_segments=100, index_every=4)
+        found = list(reopened.query(1_000 + 100 * 10, 1_000 + 199 * 10))
+        assert [e.message for e in found] == [f"evento {i}" for i in range(100, 200)]
+        assert found[0].command == "packet\tfrom x"
+        assert len(list(reopened.query(since_ns=1_000 + 290 * 10))) == 10
+        assert len(list(reopened.query(until_ns=999))) == 0
+
+        logger = ErrorLogger(max_entries=10, sink=reopened)
+        logger.log_error("SyntaxError", "ERROR", "nuevo")
+        recent = logger.get_errors_between(since_ns=10_000)
+        assert [e.message for e in recent] == ["nuevo"]
+        reopened.close()
+        print(f"Segmentos escritos: {stats['segments']}")
+
+def test_error_log_sink_persists_repeats():
+    """Las repeticiones agregadas llegan a disco como actualizaciones de su entrada"""
+    print("=== Probando repeticiones en ErrorLogSink ===")
+    with tempfile.TemporaryDirectory() as directory:
+        sink = ErrorLogSink(directory, batch_size=10 ** 6, flush_interval=60)
+        logger = ErrorLogger(aggregate=True, sink=sink)
+        for i in range(1000):
+            logger.log_error("NoRouteToHost", "ERROR", "Sin ruta a {0}", "", (f"10.0.0.{i % 7}",))
+            if i in (0, 499):
+                sink.flush()  # Actualizaciones repartidas en varios lotes
+        logger.log_error("SyntaxError", "ERROR", "otro")
+        storm = logger.get_errors_by_type("NoRouteToHost")[0]
+        assert storm.count == 1000
+        sink.flush()
+
+        # Cambiar la entrada viva tras persistirla no altera lo que está en disco
+        storm.count = 5
+        sink.close()
+        on_disk = list(sink.query())
+        assert [(e.error_type, e.count) for e in on_disk] == [("NoRouteToHost", 1000), ("SyntaxError", 1)]
+        assert on_disk[0].message == "Sin ruta a 10.0.0.5"
+        assert on_disk[0].last_seen_ns == storm.last_seen_ns
+        # Una línea por entrada y una actualización por lote, no por repetición
+        stats = sink.get_stats()
+        assert stats["entries_written"] == 2
+        assert stats["updates_written"] == 2
+
+        # Tras reiniciar, las consultas por rango aplican las actualizaciones posteriores
+        reopened = ErrorLogSink(directory)
+        found = list(reopened.query(storm.timestamp_ns, storm.timestamp_ns))
+        assert [(e.error_type, e.count) for e in found] == [("NoRouteToHost", 1000)]
+        reopened.close()
+
+def test_error_log_sink_sequence_ids():
+    """Entradas con igual timestamp, tipo y severidad se distinguen por su seq"""
+    print("=== Probando identificadores de ErrorLogSink ===")
+    with tempfile.TemporaryDirectory() as directory:
+        sink = ErrorLogSink(directory, batch_size=10 ** 6, flush_interval=60)
+        first = _entry_at(5_000, "primero")
+        second = _entry_at(5_000, "segundo")
+        sink.submit(first)
+        sink.submit(second)
+        assert (first.seq, second.seq) == (0, 1)
+        sink.flush()
+        first.count = 3
+        sink.update(first)
+        second.count = 7
+        sink.update(second)
+        sink.close()
+        assert [(e.message, e.count, e.seq) for e in sink.query()] == [("primero", 3, 0), ("segundo", 7, 1)]
+
+        # Al reabrir, la numeración continúa después del último seq en disco
+        reopened = ErrorLogSink(directory)
+        third = _entry_at(6_000, "tercero")
+        reopened.submit(third)
+        assert third.seq == 2
+        reopened.close()
+
+def test_error_log_sink_streaming_query():
+    """La consulta genera entradas a medida que lee y las actualizaciones se compactan"""
+    print("=== Probando consultas incrementales de ErrorLogSink ===")
+    with tempfile.TemporaryDirectory() as directory:
+        sink = ErrorLogSink(directory, segment_max_bytes=2048, max_segments=100,
+                            batch_size=10 ** 6, flush_interval=60, index_every=4)
+        entries = [_entry_at(1_000 + i * 10, f"evento {i}") for i in range(300)]
+        for entry in entries:
+            sink.submit(entry)
+        sink.flush()
+
+        # Muchos lotes de actualizaciones de la misma entrada no hacen crecer el archivo
+        for count in range(2, 502):
+            entries[0].count = count
+            sink.update(entries[0])
+            sink.flush()
+        segment = sink._segments[0]
+        with open(segment.updates_path, "rb") as f:
+            assert len(f.readlines()) <= 2 + ErrorLogSink.UPDATES_SLACK
+
+        results = sink.query(1_000, 1_000 + 9 * 10)
+        assert not isinstance(results, list)
+        found = list(results)
+        assert [e.message for e in found] == [f"evento {i}" for i in range(10)]
+        assert found[0].count == 501
+        sink.close()
+
+if __name__ == "__main__":
+    test_error_logger_ring_buffer()
+    test_error_logger_indexed_queries()
+    test_error_logger_aggregation()
+    test_error_logger_sampling_and_rate_limit()
+    test_error_entry_lazy_formatting()
+    test_error_log_sink_time_range()
+    test_error_log_sink_persists_repeats()
+    test_error_log_sink_sequence_ids()
+    test_error_log_sink_streaming_query()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Pruebas del reenvío salto a salto entre dispositivos conectados"""
+
+import tempfile
+
+from cli import CLIParser
+from network import Network
+from utils import ErrorLogger
+
+def _build_chain(directory):
+    """PC1 - R1 - R2 - PC2, un enlace punto a punto por subred /24"""
+    network = Network(snapshot_dir=directory)
+    for name, kind in (("PC1", "host"), ("R1", "router"), ("R2", "router"), ("PC2", "host")):
+        network.add_device(name, kind)
+    addresses = [("PC1", "eth0", "10.0.1.10", "R1", "g0/0", "10.0.1.1"),
+                 ("R1", "g0/1", "10.0.12.1", "R2", "g0/0", "10.0.12.2"),
+                 ("R2", "g0/1", "10.0.2.1", "PC2", "eth0", "10.0.2.20")]
+    for dev1, iface1, ip1, dev2, iface2, ip2 in addresses:
+        network.get_device(dev1).configure_interface(iface1, ip1, "255.255.255.0")
+        network.get_device(dev2).configure_interface(iface2, ip2, "255.255.255.0")
+        assert network.connect(f"{dev1}.{iface1}", dev2, iface2)
+        network.get_device(dev1).configure_interface(iface1, status="up")
+        network.get_device(dev2).configure_interface(iface2, status="up")
+
+    network.get_device("PC1").add_route("0.0.0.0", "0.0.0.0", "10.0.1.1")
+    network.get_device("PC2").add_route("0.0.0.0", "0.0.0.0", "10.0.2.1")
+    r1, r2 = network.get_device("R1"), network.get_device("R2")
+    r1.add_route("10.0.1.0", "255.255.255.0", "10.0.1.10")
+    r1.add_route("10.0.2.0", "255.255.255.0", "10.0.12.2")
+    r2.add_route("10.0.1.0", "255.255.255.0", "10.0.12.1")
+    r2.add_route("10.0.2.0", "255.255.255.0", "10.0.2.20")
+    return network
+
+def test_packets_cross_every_hop():
+    """Un paquete avanza un salto por tick y llega al destino con su camino completo"""
+    print("=== Probando reenvío salto a salto ===")
+    with tempfile.TemporaryDirectory() as directory:
+        network = _build_chain(directory)
+        for _ in range(5):
+            network.send_packet("10.0.1.10", "10.0.2.20", "hola", 64)
+        network.send_packet("10.0.2.20", "10.0.1.10", "respuesta", 64)
+
+        # t=1 sale de los hosts, t=2 R1/R2, t=3 R2/R1, t=4 llega al destino
+        for _ in range(3):
+            network.tick()
+            assert network.get_device("PC2").packets_received == 0
+        network.tick()
+        pc1, pc2 = network.get_device("PC1"), network.get_device("PC2")
+        assert (pc2.packets_received, pc1.packets_received) == (5, 1)
+        assert len(network.scheduler) == 0
+
+        packet = pc2.get_history()[0]
+        assert packet.path == ["PC1", "R1", "R2", "PC2"]
+        assert packet.get_hops() == 3 and packet.ttl == 61 and packet.arrival_time is not None
+        assert pc1.get_history()[0].path == ["PC2", "R2", "R1", "PC1"]
+        assert network.get_network_stats()["average_hops"] == 3
+
+        records = network.get_throughput()
+        assert [record["time"] for record in records] == [1, 2, 3, 4]
+        assert [record["delivered"] for record in records] == [0, 0, 0, 6]
+        assert sum(record["dropped"] for record in records) == 0
+        network.close()
+
+def test_drops_on_ttl_and_link_down():
+    """El TTL se descuenta por salto y un enlace caído descarta en el emisor"""
+    with tempfile.TemporaryDirectory() as directory:
+        network = _build_chain(directory)
+        network.send_packet("10.0.1.10", "10.0.2.20", "ttl corto", 2)
+        network.run_until_idle()
+        assert network.get_device("PC2").packets_received == 0
+        assert network.get_device("R1").packets_dropped == 1  # TTL 2 -> 1 en PC1 -> 0 en R1
+
+        network.get_device("R2").configure_interface("g0/0", status="down")
+        network.send_packet("10.0.1.10", "10.0.2.20", "enlace caído", 64)
+        network.run_until_idle()
+        assert network.get_device("R1").packets_dropped == 2
+        assert network.get_throughput(1)[0]["dropped"] == 1
+
+        # Un router offline retiene los paquetes hasta volver
+        network.get_device("R2").configure_interface("g0/0", status="up")
+        network.set_device_status("R2", "offline")
+        network.send_packet("10.0.1.10", "10.0.2.20", "en espera", 64)
+        network.run_until_idle()
+        assert network.get_device("R2").get_interface("g0/0").input_queue.size() == 1
+        network.set_device_status("R2", "online")
+        network.run_until_idle()
+        assert network.get_device("PC2").packets_received == 1
+
+        cli = CLIParser(network, ErrorLogger())
+        output = cli.parse_command("show throughput 2").splitlines()
+        assert len(output) == 3 and output[-1].split()[2] == "1"
+        network.close()
+
+def test_loaded_config_forwards_packets():
+    """Los dispositivos creados al cargar un snapshot también entregan paquetes a sus vecinos"""
+    with tempfile.TemporaryDirectory() as directory:
+        network = _build_chain(directory)
+        assert network.save_snapshot("cadena")[0]
+        network.close()
+
+        loaded = Network(snapshot_dir=directory)
+        ok, message = loaded.load_snapshot("cadena")
+        assert ok, message
+        r1 = loaded.get_device("R1")
+        assert r1.get_interface("g0/1").connected_to == ("R2", "g0/0")
+        assert r1.get_interface("g0/1").is_up() and r1.get_interface("g0/0").connected_to == ("PC1", "eth0")
+
+        assert loaded.send_packet("10.0.1.10", "10.0.2.20", "tras cargar", 64)[0]
+        loaded.run_until_idle()
+        assert loaded.get_device("PC1").packets_sent == 1
+        assert loaded.get_device("PC2").packets_received == 1
+        assert loaded.get_device("PC2").get_history()[0].path == ["PC1", "R1", "R2", "PC2"]
+        loaded.close()
+
+if __name__ == "__main__":
+    test_packets_cross_every_hop()
+    test_drops_on_ttl_and_link_down()
+    test_loaded_config_forwards_packets()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Pruebas de las estructuras lineales (Queue sobre buffer circular, LinkedList con cola)"""
+
+from data_structures import LinkedList, Queue
+from network import Network
+
+def test_queue_ring_buffer():
+    """La cola mantiene el orden FIFO al crecer y dar la vuelta al buffer"""
+    print("=== Probando Queue (ring buffer) ===")
+    q = Queue()
+
+    for i in range(5):
+        q.enqueue(i)
+    assert q.dequeue() == 0
+    assert q.dequeue() == 1
+
+    # Forzar que el buffer dé la vuelta y luego crezca
+    q.enqueue_many(range(5, 40))
+    assert len(q) == 38
+    assert q.peek() == 2
+    assert list(q) == list(range(2, 40))
+
+    print(f"Cola tras enqueue_many: {len(q)} elementos")
+
+def test_queue_drain():
+    """drain(n) extrae lotes en orden sin perder elementos"""
+    print("=== Probando Queue.drain ===")
+    q = Queue()
+    q.enqueue_many(range(10))
+
+    assert q.drain(3) == [0, 1, 2]
+    q.enqueue_many(range(10, 14))
+    assert q.drain(0) == []
+    assert q.drain() == list(range(3, 14))
+    assert q.is_empty()
+    assert q.drain() == []
+
+    try:
+        q.dequeue()
+        assert False, "dequeue en cola vacía debería fallar"
+    except IndexError:
+        pass
+
+    print("Queue.drain funcionando correctamente")
+
+def test_linked_list_tail():
+    """append, insert_at(size) y remove_at mantienen la referencia a la cola"""
+    print("=== Probando LinkedList con tail ===")
+    for doubly in (False, True):
+        ll = LinkedList(doubly=doubly)
+        ll.append("A")
+        ll.append("B")
+        ll.insert_at(2, "C")
+        ll.prepend("Z")
+        assert str(ll) == "[Z -> A -> B -> C]"
+        assert ll.tail.data == "C"
+
+        assert ll.remove_at(3) == "C"
+        assert ll.tail.data == "B"
+        ll.append("D")
+        assert list(ll) == ["Z", "A", "B", "D"]
+        assert ll.get(3) == "D"
+
+        assert ll.remove("Z")
+        assert not ll.remove("nope")
+        assert list(ll) == ["A", "B", "D"]
+
+def test_linked_list_remove_node():
+    """remove_node desenlaza un nodo conocido en modo doble"""
+    print("=== Probando LinkedList.remove_node ===")
+    ll = LinkedList(doubly=True)
+    nodes = [ll.append(i) for i in range(5)]
+
+    assert ll.remove_node(nodes[4]) == 4
+    assert ll.tail is nodes[3]
+    assert ll.remove_node(nodes[0]) == 0
+    assert ll.head is nodes[1]
+    assert ll.remove_node(nodes[2]) == 2
+    assert list(ll) == [1, 3]
+    assert nodes[3].prev is nodes[1]
+    assert len(ll) == 2
+
+def test_network_disconnect_neighbors():
+    """Network.disconnect elimina conexión y vecinos sin recorrer por índice"""
+    print("=== Probando desconexión en la red ===")
+    network = Network()
+    network.add_device("R1", "router")
+    network.add_device("R2", "router")
+
+    assert network.connect("R1.g0/0", "R2", "g0/0")
+    assert network.connect("R1.g0/1", "R2", "g0/1")
+    assert len(network.connections) == 2
+
+    assert network.disconnect("R1.g0/0", "R2", "g0/0")
+    assert len(network.connections) == 1
+    assert list(network.connections)[0]["iface1"] == "g0/1"
+
+    r1_iface = network.get_device("R1").get_interface("g0/0")
+    assert not r1_iface.neighbors.contains("R2")
+    assert len(network.get_device("R1").get_interface("g0/1").neighbors) == 1
+
+if __name__ == "__main__":
+    test_queue_ring_buffer()
+    test_queue_drain()
+    test_linked_list_tail()
+    test_linked_list_remove_node()
+    test_network_disconnect_neighbors()
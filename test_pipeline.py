@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Pruebas del pipeline de reenvío por etapas"""
+
+import tempfile
+
+from cli import CLIParser
+from network import Device, Network, Packet
+from network.pipeline import ForwardingPipeline, TtlStage
+from utils import ErrorLogger
+
+def _router():
+    router = Device("R1", "router")
+    router.add_interface("g0/0")
+    iface = router.get_interface("g0/0")
+    iface.set_status("up")
+    iface.connect_to("R2", "g0/0")
+    router.add_route("10.0.0.0", "255.0.0.0", "192.168.1.2", 1)
+    router.set_policy("10.9.0.0", "255.255.0.0", "block", True)
+    return router, iface
+
+def _enqueue(iface, destinations, ttl=64):
+    for destination in destinations:
+        iface.output_queue.enqueue(Packet("192.168.1.1", destination, "x", ttl))
+
+def test_pipeline_one_lookup_per_destination():
+    """Cada etapa ve el lote completo y las búsquedas se hacen una vez por destino único"""
+    print("=== Probando pipeline por etapas ===")
+    router, iface = _router()
+    lookups = []
+    original = router._lookup_route
+    router._lookup_route = lambda destination: lookups.append(destination) or original(destination)
+
+    destinations = [f"10.{i % 4}.0.1" for i in range(400)] + ["10.9.1.1"] * 50 + ["172.16.0.1"] * 10
+    _enqueue(iface, destinations)
+    router.process_queues()
+
+    assert sorted(lookups) == ["10.0.0.1", "10.1.0.1", "10.2.0.1", "10.3.0.1", "172.16.0.1"]
+    assert (router.packets_sent, router.packets_dropped) == (400, 60)
+    profile = dict(router.pipeline.get_profile())
+    assert [name for name, _ in router.pipeline.get_profile()] == ["classify", "policy", "route", "arp", "ttl", "enqueue"]
+    assert profile["classify"]["packets"] == 460
+    assert (profile["policy"]["dropped"], profile["route"]["dropped"]) == (50, 10)
+    assert profile["enqueue"]["packets"] == 400 and profile["enqueue"]["calls"] == 1
+
+    # El lote siguiente resuelve todo desde la caché de decisiones
+    _enqueue(iface, destinations)
+    router.process_queues()
+    assert len(lookups) == 5 and router.packets_sent == 800
+
+def test_pipeline_stages_are_pluggable():
+    """Las etapas se pueden insertar, reemplazar y quitar"""
+    router, iface = _router()
+
+    class DropOddTtl:
+        """Etapa de prueba: descarta los paquetes con TTL impar"""
+        name = "odd-ttl"
+
+        def __call__(self, batch):
+            keep = [packet.ttl % 2 == 0 for packet in batch.packets]
+            for flag in keep:
+                if not flag:
+                    batch.drop("Filtered", "INFO", "TTL impar", "", ())
+            batch.retain(keep)
+
+    router.pipeline.insert_before("ttl", DropOddTtl())
+    _enqueue(iface, ["10.0.0.1"] * 3, ttl=5)
+    _enqueue(iface, ["10.0.0.1"] * 2, ttl=6)
+    router.process_queues()
+    assert (router.packets_sent, router.packets_dropped) == (2, 3)
+
+    # Sin la etapa TTL, el TTL no se decrementa
+    router.pipeline.remove("odd-ttl")
+    router.pipeline.remove("ttl")
+    packet = Packet("192.168.1.1", "10.0.0.1", "x", 1)
+    iface.output_queue.enqueue(packet)
+    router.process_queues()
+    assert packet.ttl == 1 and router.packets_sent == 3
+
+    router.pipeline.insert_before("enqueue", TtlStage())
+    router.pipeline.replace("ttl", TtlStage())
+    for invalid in (lambda: router.pipeline.insert_before("enqueue", TtlStage()),
+                    lambda: router.pipeline.remove("no-existe")):
+        try:
+            invalid()
+            assert False, "Se esperaba error"
+        except (ValueError, KeyError):
+            pass
+
+    pipeline = ForwardingPipeline()
+    pipeline.reset_profile()
+    assert all(stats["calls"] == 0 for _, stats in pipeline.get_profile())
+
+def test_send_packet_counted_once():
+    """Un paquete enviado con Device.send_packet cuenta una sola vez, al salir por el pipeline"""
+    router, iface = _router()
+    assert router.send_packet(Packet("192.168.1.1", "10.0.0.1", "x", 64))
+    assert router.packets_sent == 0 and iface.output_queue.size() == 1
+    router.process_queues()
+    assert (router.packets_sent, router.packets_dropped) == (1, 0)
+    assert router.get_statistics()["packets_sent"] == 1
+
+    # Descartado en el pipeline (TTL expira): no cuenta como enviado
+    assert router.send_packet(Packet("192.168.1.1", "10.0.0.1", "x", 1))
+    router.process_queues()
+    assert (router.packets_sent, router.packets_dropped) == (1, 1)
+
+def test_show_pipeline_command():
+    """show pipeline muestra el perfil del dispositivo actual"""
+    with tempfile.TemporaryDirectory() as directory:
+        network = Network(snapshot_dir=directory)
+        network.add_device("Router1", "router")
+        cli = CLIParser(network, ErrorLogger())
+        lines = cli.parse_command("show pipeline").splitlines()
+        assert [line.split()[0] for line in lines[1:]] == ["classify", "policy", "route", "arp", "ttl", "enqueue"]
+        network.close()
+
+if __name__ == "__main__":
+    test_pipeline_one_lookup_per_destination()
+    test_pipeline_stages_are_pluggable()
+    test_send_packet_counted_once()
+    test_show_pipeline_command()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Pruebas del MinHeap y del planificador de eventos discretos de la red"""
+
+import random
+import tempfile
+
+from data_structures import MinHeap
+from network import Network
+from network.scheduler import EventScheduler, DEPARTURE, ARRIVAL
+
+def _build_network(directory, n_devices, active):
+    """Red de n_devices routers con tráfico posible solo en los `active` primeros"""
+    network = Network(snapshot_dir=directory)
+    for i in range(n_devices):
+        network.add_device(f"R{i}", "router")
+    for i in range(active):
+        router = network.get_device(f"R{i}")
+        router.configure_interface("g0/0", f"10.{i}.0.1", "255.255.255.0", "down")
+        router.add_route("172.16.0.0", "255.255.0.0", f"10.{i}.0.2")
+    return network
+
+def test_min_heap_order():
+    """pop retorna los elementos en orden, con duplicados y mezclado con push"""
+    print("=== Probando MinHeap ===")
+    random.seed(53)
+    heap = MinHeap()
+    expected = []
+    for step in range(5000):
+        if expected and random.random() < 0.4:
+            expected.sort()
+            assert heap.peek() == expected[0]
+            assert heap.pop() == expected.pop(0)
+        else:
+            value = random.randint(0, 300)
+            heap.push(value)
+            expected.append(value)
+    assert len(heap) == len(expected)
+    assert [heap.pop() for _ in range(len(heap))] == sorted(expected)
+    assert heap.is_empty() and heap.peek() is None
+    try:
+        heap.pop()
+        assert False, "Se esperaba IndexError"
+    except IndexError:
+        pass
+
+def test_event_scheduler_coalesces():
+    """Un evento pendiente por cola e instante; los del mismo instante salen en orden de llegada"""
+    scheduler = EventScheduler()
+    assert scheduler.schedule(5, "R1", "g0/0")
+    assert not scheduler.schedule(5, "R1", "g0/0")  # Lo cubre el evento en t=5
+    assert scheduler.schedule(7, "R1", "g0/0")  # Un instante posterior no se adelanta a t=5
+    assert scheduler.schedule(5, "R1", "g0/0", ARRIVAL)
+    assert scheduler.schedule(3, "R2", "g0/1")
+    assert scheduler.schedule(5, "R0", "g0/0")
+    order = [(event.time, event.device_name, event.kind) for event in
+             (scheduler.pop() for _ in range(len(scheduler)))]
+    assert order == [(3, "R2", DEPARTURE), (5, "R1", DEPARTURE), (5, "R1", ARRIVAL), (5, "R0", DEPARTURE),
+                     (7, "R1", DEPARTURE)]
+    # Tras dispararse, la cola puede volver a programarse
+    assert scheduler.schedule(5, "R1", "g0/0")
+    stats = scheduler.get_stats()
+    assert (stats["pending"], stats["coalesced"], stats["processed"]) == (1, 1, 5)
+
+def test_arrivals_respect_link_delay():
+    """Un paquete nunca se entrega antes de PROCESSING_DELAY + LINK_DELAY desde su envío"""
+    with tempfile.TemporaryDirectory() as directory:
+        network = Network(snapshot_dir=directory)
+        network.LINK_DELAY = 3
+        for name, ip in (("H1", "10.0.0.1"), ("H2", "10.0.0.2")):
+            network.add_device(name, "host")
+            network.get_device(name).configure_interface("eth0", ip, "255.255.255.0")
+        assert network.connect("H1.eth0", "H2", "eth0")
+        for name in ("H1", "H2"):
+            network.get_device(name).configure_interface("eth0", status="up")
+        network.get_device("H1").add_route("0.0.0.0", "0.0.0.0", "10.0.0.2")
+        h2 = network.get_device("H2")
+
+        sent_at = []
+        for _ in range(12):
+            if len(sent_at) < 6:
+                # Un envío por instante: llegan a H2 mientras otro evento de su cola está pendiente
+                assert network.send_packet("10.0.0.1", "10.0.0.2", "x", 64)[0]
+                sent_at.append(network.clock)
+            network.tick()
+            due = sum(1 for sent in sent_at if sent + network.PROCESSING_DELAY + network.LINK_DELAY <= network.clock)
+            assert h2.packets_received == due, (network.clock, h2.packets_received, due)
+        assert h2.packets_received == 6
+        assert network.scheduler.get_stats()["coalesced"] == 0
+        network.close()
+
+def test_network_run_until_touches_only_active_devices():
+    """El reloj avanza por eventos y solo procesa los dispositivos con paquetes"""
+    print("=== Probando planificador de eventos de la red ===")
+    with tempfile.TemporaryDirectory() as directory:
+        network = _build_network(directory, 2000, 3)
+        calls = []
+        for device in network.devices.values():
+            original = device.process_output_queue
+            device.process_output_queue = (lambda interface, until=None, device=device, original=original:
+                                           calls.append(device.name) or original(interface, until))
+
+        for i in range(3):
+            for _ in range(10):
+                ok, _ = network.send_packet(f"10.{i}.0.1", "172.16.5.5", "hola", 64)
+                assert ok
+        assert len(network.scheduler) == 3  # Un evento por cola, no por paquete
+
+        assert network.run_until(0) == 0 and network.clock == 0
+        assert network.tick() == 30
+        assert network.clock == 1
+        assert sorted(calls) == ["R0", "R1", "R2"]
+        assert network.tick() == 0 and len(calls) == 3
+
+        # Un dispositivo offline conserva sus paquetes hasta volver a estar online
+        network.set_device_status("R1", "offline")
+        network.send_packet("10.1.0.1", "172.16.5.5", "hola", 64)
+        network.run_until(10)
+        assert network.clock == 10
+        assert network.get_device("R1").interfaces["g0/0"].output_queue.size() == 1
+        network.set_device_status("R1", "online")
+        assert network.run_until_idle() == 1
+        assert len(network.scheduler) == 0 and network.clock == 11
+        network.close()
+
+if __name__ == "__main__":
+    test_min_heap_order()
+    test_event_scheduler_coalesces()
+    test_arrivals_respect_link_delay()
+    test_network_run_until_touches_only_active_devices()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Pruebas de los motores de prefijos (Patricia, compacto, multibit, DIR-24-8, Trie de políticas) contra una búsqueda por fuerza bruta"""
+
+import random
+
+from data_structures import CompactTrie, Dir248Table, MultibitTrie, PatriciaTrie, Trie
+from network import Device
+from network.addressing import int_to_ip, prefix_length_to_mask
+
+def _mask(length, width=32):
+    return ((1 << length) - 1) << (width - length)
+
+def _brute_force_match(prefixes, address, width=32):
+    """Prefijo más largo que contiene address, recorriendo todos"""
+    best = None
+    for key, length in prefixes:
+        if address & _mask(length, width) == key and (best is None or length > best[1]):
+            best = (key, length)
+    return best
+
+def test_patricia_random_prefixes():
+    """insert/delete/longest_match coinciden con la fuerza bruta"""
+    print("=== Probando PatriciaTrie ===")
+    random.seed(11)
+    trie = PatriciaTrie(32)
+    prefixes = set()
+
+    for _ in range(2000):
+        length = random.choice([0, 4, 8, 12, 16, 20, 24, 28, 32])
+        key = random.getrandbits(32) & 0xFF0F0000 & _mask(length)
+        if random.random() < 0.7:
+            assert trie.insert(key, length, (key, length)) == ((key, length) not in prefixes)
+            prefixes.add((key, length))
+        else:
+            assert trie.delete(key, length) == ((key, length) in prefixes)
+            prefixes.discard((key, length))
+
+    assert len(trie) == len(prefixes)
+    assert [(key, length) for key, length, _ in trie.items()] == sorted(prefixes)
+
+    for _ in range(2000):
+        address = random.getrandbits(32) & 0xFF0FFFFF
+        match = trie.longest_match(address)
+        assert (match[:2] if match else None) == _brute_force_match(prefixes, address)
+
+    # Borrar todo deja el trie sin nodos
+    for key, length in list(prefixes):
+        assert trie.exact(key, length) == (key, length)
+        trie.delete(key, length)
+    assert trie.get_stats() == {"prefixes": 0, "nodes": 0, "width": 32}
+
+def test_patricia_ipv6_width():
+    """El mismo trie funciona con claves de 128 bits"""
+    trie = PatriciaTrie(128)
+    doc = 0x20010DB8 << 96
+    trie.insert(doc, 32, "2001:db8::/32")
+    trie.insert(doc | (1 << 80), 48, "2001:db8:1::/48")
+
+    assert trie.longest_match(doc | (1 << 80) | 5)[2] == "2001:db8:1::/48"
+    assert trie.longest_match(doc | 7)[2] == "2001:db8::/32"
+    assert trie.longest_match(1) is None
+
+def test_compact_trie_matches_patricia():
+    """El trie sobre arreglos responde igual que PatriciaTrie, interna valores y reutiliza posiciones"""
+    print("=== Probando CompactTrie ===")
+    random.seed(14)
+    for width in (32, 128):
+        compact = CompactTrie(width)
+        trie = PatriciaTrie(width)
+        space = _mask(10, width) | 0xFFFF
+        for _ in range(2000):
+            length = random.choice([0, 8, 12, 16, 21, 24, 32, width])
+            key = random.getrandbits(width) & space & _mask(length, width)
+            if random.random() < 0.7:
+                policy = {"ttl-min": random.choice([5, 10])}
+                assert compact.insert(key, length, policy) == trie.insert(key, length, policy)
+            else:
+                assert compact.delete(key, length) == trie.delete(key, length)
+
+        assert (len(compact), compact.node_count) == (len(trie), trie.node_count)
+        assert list(compact.items()) == list(trie.items())
+        for _ in range(2000):
+            address = random.getrandbits(width) & space
+            assert compact.longest_match(address) == trie.longest_match(address)
+
+        # Solo dos políticas distintas en la tabla de valores
+        assert compact.memory_report()["values"] == 2
+
+        slots = compact.memory_report()["slots"]
+        for key, length, _ in list(trie.items()):
+            compact.delete(key, length)
+        assert compact.get_stats() == {"prefixes": 0, "nodes": 0, "width": width}
+        assert compact.memory_report()["values"] == 0
+
+        # Las posiciones liberadas se reutilizan
+        compact.insert(0, 0, {"block": True})
+        assert compact.memory_report()["slots"] == slots
+
+def test_compact_trie_unhashable_values():
+    """Los valores no hashables (dict con listas, listas) se guardan sin internar"""
+    compact = CompactTrie(32)
+    nested = {"block": True, "ports": [22, 23]}
+    compact.insert(0x0A000000, 8, nested)
+    compact.insert(0x0B000000, 8, {"block": True, "ports": [22, 23]})
+    compact.insert(0x0C000000, 8, ["a"])
+    compact.insert(0x0D000000, 8, {"block": True})
+    compact.insert(0x0E000000, 8, {"block": True})
+    assert compact.longest_match(0x0A010101)[2] is nested
+    assert compact.longest_match(0x0C000001)[2] == ["a"]
+    # Solo los valores hashables se comparten
+    assert compact.memory_report()["values"] == 4
+
+    for first_octet in (0x0A, 0x0B, 0x0C, 0x0D, 0x0E):
+        assert compact.delete(first_octet << 24, 8)
+    assert compact.memory_report()["values"] == 0
+
+def test_multibit_matches_brute_force():
+    """El trie multibit con expansión de prefijos coincide con la fuerza bruta en IPv4 e IPv6"""
+    print("=== Probando MultibitTrie ===")
+    random.seed(13)
+    for width, stride, lengths in [(32, 8, [0, 3, 8, 12, 19, 24, 27, 32]),
+                                   (32, 4, [1, 6, 8, 13, 16, 30]),
+                                   (128, 8, [0, 16, 29, 32, 48, 56, 61, 64, 127, 128])]:
+        trie = MultibitTrie(width, stride)
+        # Pocos bits altos variables para que los prefijos se solapen
+        space = _mask(12, width) | 0xFF
+        prefixes = set()
+        for _ in range(1500):
+            length = random.choice(lengths)
+            key = random.getrandbits(width) & space & _mask(length, width)
+            if random.random() < 0.7:
+                assert trie.insert(key, length, (key, length)) == ((key, length) not in prefixes)
+                prefixes.add((key, length))
+            else:
+                assert trie.delete(key, length) == ((key, length) in prefixes)
+                prefixes.discard((key, length))
+
+        assert len(trie) == len(prefixes)
+        assert [(key, length) for key, length, _ in trie.items()] == sorted(prefixes)
+        for _ in range(1500):
+            address = random.getrandbits(width) & space
+            match = trie.longest_match(address)
+            assert (match[:2] if match else None) == _brute_force_match(prefixes, address, width)
+
+        for key, length in list(prefixes):
+            assert trie.exact(key, length) == (key, length)
+            trie.delete(key, length)
+        assert (len(trie), trie.node_count) == (0, 0)
+
+def test_dir24_8_matches_patricia():
+    """La tabla DIR-24-8 responde igual que el trie, incluidos prefijos > /24"""
+    print("=== Probando Dir248Table ===")
+    random.seed(12)
+    trie = PatriciaTrie(32)
+    for _ in range(1000):
+        length = random.choice([0, 8, 16, 22, 24, 25, 27, 30, 32])
+        key = random.getrandbits(32) & 0x0A0A0AFF & _mask(length)
+        trie.insert(key, length, (key, length))
+
+    table = Dir248Table(trie.items())
+    assert len(table) == len(trie)
+    assert table.memory_report()["tbl8_groups"] > 0
+
+    for _ in range(3000):
+        address = random.getrandbits(32) & 0x0A0A0AFF
+        assert table.longest_match(address) == trie.longest_match(address)
+
+    table.build([])
+    assert table.longest_match(0x0A000001) is None
+
+def test_policy_trie_any_mask():
+    """El Trie de políticas resuelve máscaras no alineadas a octetos"""
+    print("=== Probando Trie de políticas con máscaras arbitrarias ===")
+    trie = Trie()
+    trie.insert("10.0.0.0", "255.0.0.0", {"ttl-min": 5})
+    trie.insert("10.16.0.0", "255.240.0.0", {"block": True})       # /12
+    trie.insert("10.16.32.0", "255.255.240.0", {"ttl-min": 9})     # /20
+    trie.insert("192.168.1.77", "255.255.255.0", {"block": True})  # Se enmascara a /24
+
+    assert trie.search_longest_prefix("10.16.40.1") == ("10.16.32.0/20", {"ttl-min": 9})
+    assert trie.search_longest_prefix("10.31.0.1") == ("10.16.0.0/12", {"block": True})
+    assert trie.search_longest_prefix("10.32.0.1") == ("10.0.0.0/8", {"ttl-min": 5})
+    assert trie.search_longest_prefix("192.168.1.5")[0] == "192.168.1.0/24"
+    assert trie.search_longest_prefix("11.0.0.1") == (None, None)
+
+    assert trie.search_exact("10.16.32.0", "255.255.240.0") == {"ttl-min": 9}
+    assert trie.search_exact("10.16.32.0") is None
+
+    assert trie.delete("10.16.0.0", "255.240.0.0")
+    assert not trie.delete("10.16.0.0", "255.240.0.0")
+    assert trie.search_longest_prefix("10.31.0.1")[0] == "10.0.0.0/8"
+    assert [prefix for prefix, _ in trie.get_all_prefixes()] == [
+        "10.0.0.0/8", "10.16.32.0/20", "192.168.1.0/24"]
+
+    # Compresión de caminos: un nodo por prefijo más las bifurcaciones
+    assert trie.get_stats() == {"nodes": 4, "prefixes": 3}
+
+def test_policy_trie_prefix_length_masks():
+    """Las máscaras IPv4 aceptan longitud de prefijo igual que las rutas"""
+    for engine in ("patricia", "compact", "multibit"):
+        trie = Trie(engine=engine)
+        trie.insert("10.0.0.0", "16", {"block": True})
+        trie.insert("172.16.0.0", "/12", {"ttl-min": 4})
+        assert trie.search_longest_prefix("10.0.200.1") == ("10.0.0.0/16", {"block": True})
+        assert trie.search_longest_prefix("10.1.0.1") == (None, None)
+        assert trie.search_longest_prefix("100.0.0.1") == (None, None)
+        assert trie.search_longest_prefix("172.31.0.1") == ("172.16.0.0/12", {"ttl-min": 4})
+        assert trie.search_exact("10.0.0.0", "255.255.0.0") == {"block": True}
+        assert trie.delete("172.16.0.0", "255.240.0.0")
+        for invalid in ("33", "/40", "x"):
+            try:
+                trie.insert("10.0.0.0", invalid, {"block": True})
+                assert False, "Se esperaba ValueError"
+            except ValueError:
+                pass
+
+    device = Device("R1", "router")
+    device.set_policy("10.0.0.0", "16", "block", True)
+    assert device.policy_trie.search_longest_prefix("10.0.1.1")[0] == "10.0.0.0/16"
+    assert device.policy_trie.search_longest_prefix("100.0.0.1") == (None, None)
+
+def test_policy_trie_ipv6_and_multibit():
+    """Prefijos IPv6 en el Trie de políticas y motor multibit para IPv4"""
+    print("=== Probando Trie de políticas IPv6 ===")
+    for engine in ("patricia", "compact", "multibit"):
+        trie = Trie(engine=engine, stride=4)
+        trie.insert("10.16.0.0", "255.240.0.0", {"block": True})
+        trie.insert("2001:db8::", "32", {"ttl-min": 3})
+        trie.insert("2001:db8:1:ffff::", "/48", {"block": True})  # Se enmascara a 2001:db8:1::/48
+
+        assert trie.search_longest_prefix("10.20.0.1") == ("10.16.0.0/12", {"block": True})
+        assert trie.search_longest_prefix("2001:db8:1::9") == ("2001:db8:1::/48", {"block": True})
+        assert trie.search_longest_prefix("2001:db8:2::9") == ("2001:db8::/32", {"ttl-min": 3})
+        assert trie.search_longest_prefix("2001:db9::1") == (None, None)
+        assert trie.search_exact("2001:db8::", "32") == {"ttl-min": 3}
+        assert [prefix for prefix, _ in trie.get_all_prefixes()] == [
+            "10.16.0.0/12", "2001:db8::/32", "2001:db8:1::/48"]
+
+        assert trie.delete("2001:db8:1::", "48")
+        assert trie.search_longest_prefix("2001:db8:1::9")[0] == "2001:db8::/32"
+
+def test_trie_stats_and_compact():
+    """Los contadores siguen a inserciones, reemplazos y borrados; compact libera nodos sin uso"""
+    print("=== Probando compactación del Trie ===")
+    random.seed(15)
+    for engine in ("patricia", "compact", "multibit"):
+        trie = Trie(engine=engine)
+        live = set()
+        for round_number in range(3):
+            for _ in range(400):
+                length = random.randint(8, 32)
+                network = random.getrandbits(32) & 0x0AFFFFFF & _mask(length)
+                prefix = (int_to_ip(network), prefix_length_to_mask(length))
+                assert trie.insert(*prefix, {"ttl-min": round_number}) == (prefix not in live)
+                live.add(prefix)
+            # Borrar la mayor parte: churn de políticas
+            for prefix in random.sample(sorted(live), len(live) * 3 // 4):
+                assert trie.delete(*prefix)
+                live.discard(prefix)
+            assert trie.get_stats()["prefixes"] == len(live) == len(trie.get_all_prefixes())
+
+        nodes_before = trie.nodes_count
+        reclaimed = trie.compact()
+        assert trie.get_stats() == {"nodes": trie.nodes_count, "prefixes": len(live)}
+        if engine == "compact":
+            # Las posiciones liberadas por los borrados se devuelven al re-empaquetar
+            assert reclaimed > 0
+            assert trie._engine.memory_report()["slots"] == trie.nodes_count
+        else:
+            # Los borrados ya podan: no quedan ramas muertas
+            assert reclaimed == 0 and trie.nodes_count == nodes_before
+        for prefix in live:
+            assert trie.search_exact(*prefix) is not None
+        assert trie.compact() == 0
+
+def test_device_ipv6_routes():
+    """Las rutas IPv6 del dispositivo se resuelven en la FIB multibit"""
+    router = Device("R6", "router")
+    router.add_route("2001:db8::", "32", "fe80::1", 5)
+    router.add_route("2001:db8:aa::", "48", "fe80::2", 1)
+    router.add_route("10.0.0.0", "/8", "192.168.1.2", 1)
+
+    assert router.find_route("2001:db8:aa::7")["next_hop"] == "fe80::2"
+    assert router.find_route("2001:db8:bb::7")["next_hop"] == "fe80::1"
+    assert router.find_route("2001:db9::1") is None
+    assert router.find_route("10.9.9.9")["next_hop"] == "192.168.1.2"
+    assert [prefix for prefix, _ in router.iter_routes()] == [
+        "10.0.0.0/8", "2001:db8::/32", "2001:db8:aa::/48"]
+
+    router.set_policy("2001:db8:aa::", "48", "block", True)
+    assert router.find_route("2001:db8:aa::7") is None
+
+    router.remove_route("2001:db8::", "32")
+    assert router.find_route("2001:db8:bb::7") is None
+    assert router.route_count() == 2
+
+if __name__ == "__main__":
+    test_patricia_random_prefixes()
+    test_patricia_ipv6_width()
+    test_compact_trie_matches_patricia()
+    test_compact_trie_unhashable_values()
+    test_multibit_matches_brute_force()
+    test_dir24_8_matches_patricia()
+    test_policy_trie_any_mask()
+    test_policy_trie_prefix_length_masks()
+    test_policy_trie_ipv6_and_multibit()
+    test_trie_stats_and_compact()
+    test_device_ipv6_routes()
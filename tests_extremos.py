@@ -5,6 +5,7 @@ Según las pautas del proyecto
 """
 
 from data_structures import AVLTree, BTree, Trie
+from data_structures.addressing import parse_prefix_length
 
 def test_avl_casos_extremos():
     """Tests extremos para AVL: borrado de raíz, rotaciones dobles"""
@@ -142,7 +143,7 @@ def test_trie_casos_extremos():
 
     for ip, mask, policy in prefixes:
         trie.insert(ip, mask, policy)
-        print(f"   Insertado: {ip}/{trie._get_prefix_length(mask)} -> {policy}")
+        print(f"   Insertado: {ip}/{parse_prefix_length(mask)} -> {policy}")
 
     print("\nEstado del Trie:")
     stats = trie.get_stats()
@@ -4,8 +4,10 @@ Utilidades para el simulador de red
 """
 
 from .error_logger import ErrorLogger, ErrorEntry
+from .error_sink import ErrorLogSink
 
 __all__ = [
     'ErrorLogger',
-    'ErrorEntry'
+    'ErrorEntry',
+    'ErrorLogSink'
 ]
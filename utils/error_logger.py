@@ -2,143 +2,353 @@
 Sistema de registro de errores para el simulador
 """
 
-from data_structures import Queue
+from data_structures import Queue, RingBuffer
 from datetime import datetime
+import time
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_last_formatted = [None, ""]  # [segundo epoch, texto] del último formateo
+_arg_names = {}  # Tuplas de nombres de argumentos compartidas entre entradas
+
+def format_timestamp(timestamp_ns):
+    """Formatea un timestamp epoch en nanosegundos (reutiliza el último segundo formateado)"""
+    seconds = timestamp_ns // 1_000_000_000
+    if _last_formatted[0] != seconds:
+        _last_formatted[0] = seconds
+        _last_formatted[1] = time.strftime(_TIME_FORMAT, time.localtime(seconds))
+    return _last_formatted[1]
 
 class ErrorEntry:
-    """Representa una entrada de error en el log"""
+    """Representa una entrada de error en el log
+
+    El mensaje y el comando pueden ser plantillas (`str.format`) que solo se
+    formatean con `args` cuando la entrada se muestra. En modo agregado una
+    entrada representa `count` eventos idénticos entre `timestamp_ns` y
+    `last_seen_ns` (nanosegundos desde epoch). `seq` es el identificador
+    único que le asigna el destino en disco al recibirla.
+    """
 
-    def __init__(self, error_type, severity, message, command=""):
-        self.timestamp = datetime.now()
+    __slots__ = (
+        "timestamp_ns", "error_type", "severity", "template",
+        "command_template", "arg_names", "arg_values", "count", "last_seen_ns", "seq"
+    )
+
+    def __init__(self, error_type, severity, message, command="", args=None):
+        self.timestamp_ns = time.time_ns()
         self.error_type = error_type  # "SyntaxError", "ConnectionError", "CommandDisabled", etc.
         self.severity = severity  # "INFO", "WARNING", "ERROR", "CRITICAL"
-        self.message = message
-        self.command = command
+        self.template = message
+        self.command_template = command
+        self.count = 1
+        self.last_seen_ns = self.timestamp_ns
+        self.seq = None
+        self._set_args(args)
+
+    def _set_args(self, args):
+        """Guarda los argumentos: una tupla se usa tal cual (plantilla posicional);
+        un diccionario se divide en valores y una tupla de nombres compartida"""
+        if args is None or type(args) is tuple:
+            self.arg_names = None
+            self.arg_values = args
+        else:
+            names = tuple(args)
+            self.arg_names = _arg_names.setdefault(names, names)
+            self.arg_values = tuple(args.values())
+
+    @property
+    def args(self):
+        """Argumentos estructurados de la plantilla (tupla o diccionario)"""
+        if self.arg_names is None:
+            return self.arg_values
+        return dict(zip(self.arg_names, self.arg_values))
+
+    @property
+    def timestamp(self):
+        """Fecha y hora de la primera ocurrencia"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+
+    @property
+    def last_seen(self):
+        """Fecha y hora de la última ocurrencia"""
+        return datetime.fromtimestamp(self.last_seen_ns / 1e9)
+
+    def _format(self, template):
+        """Formatea una plantilla con los argumentos de la entrada"""
+        if not template or self.arg_values is None:
+            return template
+        if self.arg_names is None:
+            return template.format(*self.arg_values)
+        return template.format(**dict(zip(self.arg_names, self.arg_values)))
+
+    @property
+    def message(self):
+        """Mensaje formateado bajo demanda"""
+        return self._format(self.template)
+
+    @property
+    def command(self):
+        """Comando formateado bajo demanda"""
+        return self._format(self.command_template)
+
+    def record_repeat(self, args=None):
+        """Acumula otra ocurrencia del mismo evento"""
+        self.count += 1
+        self.last_seen_ns = time.time_ns()
+        if args is not None:
+            self._set_args(args)
+
+    def copy(self):
+        """Copia del estado actual (el destino en disco la formatea sin carreras)"""
+        entry = ErrorEntry.__new__(ErrorEntry)
+        for name in ErrorEntry.__slots__:
+            setattr(entry, name, getattr(self, name))
+        return entry
 
     def __str__(self):
-        time_str = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        cmd_str = f" | Command: '{self.command}'" if self.command else ""
-        return f"[{time_str}] {self.severity} - {self.error_type}: {self.message}{cmd_str}"
+        time_str = format_timestamp(self.timestamp_ns)
+        command = self.command
+        cmd_str = f" | Command: '{command}'" if command else ""
+        repeat_str = ""
+        if self.count > 1:
+            repeat_str = f" (x{self.count}, último {format_timestamp(self.last_seen_ns)})"
+        return f"[{time_str}] {self.severity} - {self.error_type}: {self.message}{cmd_str}{repeat_str}"
 
     def get_summary(self):
         """Obtiene un resumen de la entrada para reportes"""
         return {
-            "timestamp": self.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": format_timestamp(self.timestamp_ns),
             "type": self.error_type,
             "severity": self.severity,
             "message": self.message,
-            "command": self.command
+            "command": self.command,
+            "count": self.count,
+            "last_seen": format_timestamp(self.last_seen_ns)
         }
 
 class ErrorLogger:
-    """Sistema de logging de errores usando cola FIFO"""
+    """Sistema de logging de errores sobre un buffer circular con índices secundarios"""
 
-    def __init__(self):
-        self.error_queue = Queue()
-        self.max_entries = 1000  # Límite máximo de entradas
+    def __init__(self, max_entries=1000, aggregate=False, sink=None):
+        self._max_entries = max_entries  # Límite máximo de entradas
+        self.sink = sink  # Destino persistente opcional (ErrorLogSink)
+        self.error_buffer = RingBuffer(max_entries)
+        self._type_index = {}  # Tipo -> Queue de entradas (orden de llegada)
+        self._severity_index = {}  # Severidad -> Queue de entradas
+        self._type_counts = {}  # Eventos representados por tipo
+        self._severity_counts = {}
+        self._event_count = 0
 
-    def log_error(self, error_type, severity, message, command=""):
-        """Registra un nuevo error"""
-        error_entry = ErrorEntry(error_type, severity, message, command)
-        self.error_queue.enqueue(error_entry)
+        # Modo agregado: (tipo, severidad, plantilla) -> entrada viva
+        self.aggregate = aggregate
+        self._aggregates = {}
 
-        # Mantener el límite de entradas
-        if self.error_queue.size() > self.max_entries:
-            self.error_queue.dequeue()  # Remover el más antiguo
+        # Limitación por tipo: tipo -> [tokens, última recarga, tasa, ráfaga]
+        self._rate_limits = {}
+        # Muestreo por tipo: tipo -> [cada_n, contador]
+        self._sampling = {}
+        self._suppressed = {}  # Eventos descartados por tipo
 
-    def get_recent_errors(self, limit=None):
-        """Obtiene los errores más recientes"""
-        errors = []
-        temp_queue = Queue()
+    @property
+    def max_entries(self):
+        """Capacidad del registro"""
+        return self._max_entries
 
-        # Vaciar la cola para obtener los elementos en orden
-        while not self.error_queue.is_empty():
-            error = self.error_queue.dequeue()
-            errors.append(error)
-            temp_queue.enqueue(error)
+    @max_entries.setter
+    def max_entries(self, value):
+        """Cambia la capacidad conservando las entradas más recientes"""
+        if value <= 0:
+            raise ValueError("La capacidad debe ser mayor que cero")
+        entries = self.error_buffer.last(value)
+        suppressed = self._suppressed
+        self._max_entries = value
+        self.clear_errors()
+        self._suppressed = suppressed
+        for entry in entries:
+            self._store(entry)
+            if self.aggregate:
+                self._aggregates[(entry.error_type, entry.severity, entry.template)] = entry
 
-        # Restaurar la cola original
-        while not temp_queue.is_empty():
-            self.error_queue.enqueue(temp_queue.dequeue())
+    def _store(self, entry):
+        """Almacena una entrada actualizando índices y contadores"""
+        type_index = self._type_index
+        severity_index = self._severity_index
+        type_counts = self._type_counts
+        severity_counts = self._severity_counts
 
-        # Aplicar límite si se especifica
-        if limit:
-            errors = errors[-limit:]
+        evicted = self.error_buffer.append(entry)
+        if evicted is not None:
+            # Las entradas se desalojan en orden FIFO, así que la más antigua
+            # de su tipo/severidad siempre está al frente de su cola
+            key = evicted.error_type
+            queue = type_index[key]
+            queue.dequeue()
+            type_counts[key] -= evicted.count
+            if queue.is_empty():
+                del type_index[key]
+                del type_counts[key]
 
-        return errors
+            key = evicted.severity
+            queue = severity_index[key]
+            queue.dequeue()
+            severity_counts[key] -= evicted.count
+            if queue.is_empty():
+                del severity_index[key]
+                del severity_counts[key]
 
-    def get_errors_by_type(self, error_type):
-        """Obtiene errores de un tipo específico"""
-        errors = []
-        temp_queue = Queue()
+            self._event_count -= evicted.count
+            key = (evicted.error_type, evicted.severity, evicted.template)
+            if self._aggregates.get(key) is evicted:
+                del self._aggregates[key]
 
-        # Recorrer la cola
-        while not self.error_queue.is_empty():
-            error = self.error_queue.dequeue()
-            if error.error_type == error_type:
-                errors.append(error)
-            temp_queue.enqueue(error)
+        error_type = entry.error_type
+        queue = type_index.get(error_type)
+        if queue is None:
+            queue = type_index[error_type] = Queue()
+            type_counts[error_type] = 0
+        queue.enqueue(entry)
+        type_counts[error_type] += entry.count
 
-        # Restaurar la cola original
-        while not temp_queue.is_empty():
-            self.error_queue.enqueue(temp_queue.dequeue())
+        severity = entry.severity
+        queue = severity_index.get(severity)
+        if queue is None:
+            queue = severity_index[severity] = Queue()
+            severity_counts[severity] = 0
+        queue.enqueue(entry)
+        severity_counts[severity] += entry.count
 
-        return errors
+        self._event_count += entry.count
 
-    def get_errors_by_severity(self, severity):
-        """Obtiene errores de una severidad específica"""
-        errors = []
-        temp_queue = Queue()
+    def _admit(self, error_type):
+        """Aplica muestreo y limitación de tasa; False si el evento se descarta"""
+        sampling = self._sampling.get(error_type)
+        if sampling is not None:
+            sampled = sampling[1] % sampling[0] == 0
+            sampling[1] += 1
+            if not sampled:
+                self._suppressed[error_type] = self._suppressed.get(error_type, 0) + 1
+                return False
 
-        # Recorrer la cola
-        while not self.error_queue.is_empty():
-            error = self.error_queue.dequeue()
-            if error.severity == severity:
-                errors.append(error)
-            temp_queue.enqueue(error)
+        bucket = self._rate_limits.get(error_type)
+        if bucket is not None:
+            now = time.monotonic()
+            bucket[0] = min(bucket[3], bucket[0] + (now - bucket[1]) * bucket[2])
+            bucket[1] = now
+            if bucket[0] < 1:
+                self._suppressed[error_type] = self._suppressed.get(error_type, 0) + 1
+                return False
+            bucket[0] -= 1
 
-        # Restaurar la cola original
-        while not temp_queue.is_empty():
-            self.error_queue.enqueue(temp_queue.dequeue())
+        return True
 
-        return errors
+    def log_error(self, error_type, severity, message, command="", args=None):
+        """Registra un nuevo error
 
-    def clear_errors(self):
-        """Limpia todos los errores"""
-        self.error_queue.clear()
+        `message` y `command` pueden ser plantillas de `str.format`; con `args`
+        (tupla posicional o diccionario) se formatean solo al mostrarse.
+        """
+        if (self._sampling or self._rate_limits) and not self._admit(error_type):
+            return
 
-    def get_error_counts(self):
-        """Obtiene conteo de errores por tipo y severidad"""
-        type_counts = {}
-        severity_counts = {}
-        temp_queue = Queue()
+        if self.aggregate:
+            key = (error_type, severity, message)
+            entry = self._aggregates.get(key)
+            if entry is not None:
+                entry.record_repeat(args)
+                self._type_counts[error_type] += 1
+                self._severity_counts[severity] += 1
+                self._event_count += 1
+                if self.sink is not None:
+                    self.sink.update(entry)
+                return
+
+            entry = ErrorEntry(error_type, severity, message, command, args)
+            self._store(entry)
+            self._aggregates[key] = entry
+        else:
+            entry = ErrorEntry(error_type, severity, message, command, args)
+            self._store(entry)
+
+        if self.sink is not None:
+            self.sink.submit(entry)
+
+    def attach_sink(self, sink):
+        """Conecta un destino persistente que recibirá las nuevas entradas y sus repeticiones"""
+        self.sink = sink
 
-        # Recorrer la cola
-        while not self.error_queue.is_empty():
-            error = self.error_queue.dequeue()
+    def get_errors_between(self, since_ns=None, until_ns=None):
+        """Obtiene errores en un rango de tiempo (ns desde epoch), desde disco si hay destino"""
+        if self.sink is not None:
+            return list(self.sink.query(since_ns, until_ns))
+        return [
+            entry for entry in self.error_buffer
+            if (since_ns is None or entry.timestamp_ns >= since_ns)
+            and (until_ns is None or entry.timestamp_ns <= until_ns)
+        ]
 
-            # Contar por tipo
-            if error.error_type not in type_counts:
-                type_counts[error.error_type] = 0
-            type_counts[error.error_type] += 1
+    def set_aggregation(self, enabled):
+        """Activa o desactiva la agregación de eventos idénticos"""
+        self.aggregate = enabled
+        if not enabled:
+            self._aggregates = {}
 
-            # Contar por severidad
-            if error.severity not in severity_counts:
-                severity_counts[error.severity] = 0
-            severity_counts[error.severity] += 1
+    def set_rate_limit(self, error_type, max_events, per_seconds=1.0):
+        """Limita un tipo a max_events cada per_seconds (None elimina el límite)"""
+        if max_events is None:
+            self._rate_limits.pop(error_type, None)
+            return
+        if max_events <= 0:
+            raise ValueError("max_events debe ser mayor que cero (None elimina el límite)")
+        if per_seconds <= 0:
+            raise ValueError("per_seconds debe ser mayor que cero")
+        rate = max_events / per_seconds
+        self._rate_limits[error_type] = [float(max_events), time.monotonic(), rate, float(max_events)]
 
-            temp_queue.enqueue(error)
+    def set_sampling(self, error_type, every_n):
+        """Registra solo 1 de cada every_n eventos de un tipo (None o 1 lo desactiva)"""
+        if not every_n or every_n <= 1:
+            self._sampling.pop(error_type, None)
+            return
+        self._sampling[error_type] = [every_n, 0]
 
-        # Restaurar la cola original
-        while not temp_queue.is_empty():
-            self.error_queue.enqueue(temp_queue.dequeue())
+    def get_suppressed_counts(self):
+        """Obtiene los eventos descartados por muestreo o limitación, por tipo"""
+        return dict(self._suppressed)
 
+    def get_recent_errors(self, limit=None):
+        """Obtiene los errores más recientes"""
+        if limit:
+            return self.error_buffer.last(limit)
+        return list(self.error_buffer)
+
+    def get_errors_by_type(self, error_type):
+        """Obtiene errores de un tipo específico"""
+        return list(self._type_index.get(error_type, ()))
+
+    def get_errors_by_severity(self, severity):
+        """Obtiene errores de una severidad específica"""
+        return list(self._severity_index.get(severity, ()))
+
+    def clear_errors(self):
+        """Limpia todos los errores"""
+        self.error_buffer = RingBuffer(self._max_entries)
+        self._type_index = {}
+        self._severity_index = {}
+        self._type_counts = {}
+        self._severity_counts = {}
+        self._event_count = 0
+        self._aggregates = {}
+        self._suppressed = {}
+
+    def get_error_counts(self):
+        """Obtiene conteo de errores por tipo y severidad"""
         return {
-            "by_type": type_counts,
-            "by_severity": severity_counts,
-            "total": self.error_queue.size()
+            "by_type": dict(self._type_counts),
+            "by_severity": dict(self._severity_counts),
+            "total": self._event_count,
+            "entries": len(self.error_buffer),
+            "suppressed": sum(self._suppressed.values())
         }
 
     def __len__(self):
         """Retorna el número de errores registrados"""
-        return self.error_queue.size()
+        return len(self.error_buffer)
@@ -0,0 +1,393 @@
+"""
+Destino persistente para el registro de errores: escritura asíncrona por
+lotes en segmentos rotativos de solo-anexado, con un índice temporal disperso
+y un archivo compacto de actualizaciones por segmento
+"""
+
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+_ESCAPES = (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"))
+
+def _escape(text):
+    """Escapa separadores para guardar un campo en una línea"""
+    for raw, escaped in _ESCAPES:
+        text = text.replace(raw, escaped)
+    return text
+
+def _unescape(text):
+    """Revierte _escape"""
+    if "\\" not in text:
+        return text
+    result = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            result.append({"t": "\t", "n": "\n"}.get(nxt, nxt))
+            i += 2
+        else:
+            result.append(char)
+            i += 1
+    return "".join(result)
+
+_FIELDS = 8  # timestamp, última aparición, contador, severidad, tipo, mensaje, comando, seq
+
+def _parse_line(raw):
+    """Divide una línea del log en sus campos (sin desescapar)"""
+    return raw.decode("utf-8").rstrip("\n").split("\t")
+
+def _line_seq(fields):
+    """Identificador de la entrada de una línea (None en líneas sin seq)"""
+    return int(fields[7]) if len(fields) >= _FIELDS else None
+
+class _Segment:
+    """Segmento del log en disco con su índice disperso (timestamp, offset)
+
+    Las actualizaciones de las entradas del segmento (repeticiones agregadas)
+    se guardan aparte, en un archivo `.upd` que se compacta para conservar
+    solo la última línea de cada entrada.
+    """
+
+    def __init__(self, number, path):
+        self.number = number
+        self.path = path
+        self.index_path = path[:-len(".log")] + ".idx"
+        self.updates_path = path[:-len(".log")] + ".upd"
+        self.index_ts = []
+        self.index_offsets = []
+        self.size = 0
+        self.entries = 0
+        self.first_seq = None
+        self.update_lines = 0  # Líneas en el archivo de actualizaciones
+        self.update_seqs = set()  # Entradas con alguna actualización
+
+    @property
+    def first_ts(self):
+        return self.index_ts[0] if self.index_ts else None
+
+class ErrorLogSink:
+    """Escribe entradas de error en disco desde un hilo en segundo plano
+
+    `submit` asigna a la entrada un `seq` único y encola una copia en memoria
+    (no bloquea); el hilo escritor la formatea y la anexa en lotes al
+    segmento actual. Cada `index_every` líneas se registra (timestamp,
+    offset) para que las consultas por rango de tiempo salten directamente
+    al punto correcto.
+
+    Las repeticiones de una entrada agregada llegan por `update`, que solo la
+    marca como pendiente: el escritor toma una copia por lote y la anexa al
+    archivo de actualizaciones del segmento donde está la entrada original,
+    así `query` lee cada segmento en orden y se detiene al pasar until_ns.
+    """
+
+    # El archivo de actualizaciones se compacta al superar 2 líneas por entrada más este margen
+    UPDATES_SLACK = 64
+
+    def __init__(self, directory="logs", segment_max_bytes=4 * 1024 * 1024, max_segments=16,
+                 batch_size=256, flush_interval=0.5, index_every=64):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.index_every = index_every
+
+        self._pending = deque()  # append/popleft son seguros entre hilos
+        self._dirty = {}  # seq -> entrada viva con repeticiones sin persistir
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.entries_written = 0
+        self.updates_written = 0
+        self.batches_written = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = []
+        self._next_seq = 0
+        self._load_segments()
+        self._written_seq = self._next_seq  # Las entradas con seq menor ya están en disco
+
+        self._thread = threading.Thread(target=self._run, name="error-log-sink", daemon=True)
+        self._thread.start()
+
+    # Carga de segmentos existentes
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"errors-{number:06d}.log")
+
+    def _load_segments(self):
+        """Descubre segmentos de ejecuciones anteriores y carga sus índices"""
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith("errors-") and name.endswith(".log"):
+                try:
+                    numbers.append(int(name[len("errors-"):-len(".log")]))
+                except ValueError:
+                    continue
+
+        for number in sorted(numbers):
+            segment = _Segment(number, self._segment_path(number))
+            segment.size = os.path.getsize(segment.path)
+            if os.path.exists(segment.index_path):
+                with open(segment.index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        ts, offset = line.split()
+                        segment.index_ts.append(int(ts))
+                        segment.index_offsets.append(int(offset))
+                # Aproximación: solo determina la densidad del índice al anexar
+                segment.entries = len(segment.index_ts) * self.index_every
+            else:
+                self._rebuild_index(segment)
+            if not segment.index_ts:
+                continue
+            with open(segment.path, "rb") as f:
+                segment.first_seq = _line_seq(_parse_line(f.readline()))
+            for seq in self._read_updates(segment):
+                segment.update_seqs.add(seq)
+            segment.update_lines = len(segment.update_seqs)
+            self._segments.append(segment)
+
+        if self._segments:
+            # El último seq está en la última línea del último segmento
+            segment = self._segments[-1]
+            with open(segment.path, "rb") as f:
+                f.seek(max(segment.size - 65536, 0))
+                last_seq = _line_seq(_parse_line(f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]))
+            if last_seq is not None:
+                self._next_seq = last_seq + 1
+
+    def _rebuild_index(self, segment):
+        """Reconstruye el índice disperso recorriendo el segmento"""
+        offset = 0
+        count = 0
+        with open(segment.path, "rb") as f, open(segment.index_path, "w", encoding="utf-8") as idx:
+            for raw in f:
+                if count % self.index_every == 0:
+                    ts = int(raw.split(b"\t", 1)[0])
+                    segment.index_ts.append(ts)
+                    segment.index_offsets.append(offset)
+                    idx.write(f"{ts} {offset}\n")
+                offset += len(raw)
+                count += 1
+        segment.entries = count
+
+    def _read_updates(self, segment):
+        """Retorna {seq: campos} con la última actualización de cada entrada del segmento"""
+        updates = {}
+        if os.path.exists(segment.updates_path):
+            with open(segment.updates_path, "rb") as f:
+                for raw in f:
+                    fields = _parse_line(raw)
+                    updates[_line_seq(fields)] = fields
+        return updates
+
+    # Escritura
+    def submit(self, entry):
+        """Asigna un seq a la entrada y encola una copia para persistirla (no bloqueante)"""
+        if self._closed:
+            return
+        entry.seq = self._next_seq
+        self._next_seq += 1
+        self._pending.append(entry.copy())
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def update(self, entry):
+        """Marca que una entrada ya enviada cambió (contador, última aparición); O(1)"""
+        if self._closed or entry.seq is None:
+            return
+        self._dirty[entry.seq] = entry
+
+    def _run(self):
+        """Bucle del hilo escritor"""
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if self._closed:
+                break
+
+    def _current_segment(self):
+        """Retorna el segmento abierto para escritura, rotando si está lleno"""
+        if self._segments and self._segments[-1].size < self.segment_max_bytes:
+            return self._segments[-1]
+
+        number = self._segments[-1].number + 1 if self._segments else 0
+        segment = _Segment(number, self._segment_path(number))
+        self._segments.append(segment)
+
+        # Descartar los segmentos más antiguos
+        while len(self._segments) > self.max_segments:
+            old = self._segments.pop(0)
+            for path in (old.path, old.index_path, old.updates_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return segment
+
+    @staticmethod
+    def _serialize(entry):
+        return "\t".join((
+            str(entry.timestamp_ns),
+            str(entry.last_seen_ns),
+            str(entry.count),
+            _escape(entry.severity),
+            _escape(entry.error_type),
+            _escape(entry.message or ""),
+            _escape(entry.command or ""),
+            str(entry.seq),
+        )) + "\n"
+
+    def flush(self):
+        """Escribe en disco las entradas pendientes y luego las actualizaciones"""
+        with self._io_lock:
+            self._write_entries()
+            self._write_updates()
+
+    def _write_entries(self):
+        """Anexa las entradas nuevas a los segmentos, rotando cuando se llenan"""
+        while self._pending:
+            segment = self._current_segment()
+            lines = []
+            index_lines = []
+            offset = segment.size
+
+            # Llenar el segmento actual hasta su tamaño máximo
+            while self._pending and offset < self.segment_max_bytes:
+                entry = self._pending.popleft()
+                data = self._serialize(entry).encode("utf-8")
+                if segment.first_seq is None:
+                    segment.first_seq = entry.seq
+                if segment.entries % self.index_every == 0:
+                    segment.index_ts.append(entry.timestamp_ns)
+                    segment.index_offsets.append(offset)
+                    index_lines.append(f"{entry.timestamp_ns} {offset}\n")
+                lines.append(data)
+                offset += len(data)
+                segment.entries += 1
+                self._written_seq = entry.seq + 1
+
+            with open(segment.path, "ab") as f:
+                f.write(b"".join(lines))
+            if index_lines:
+                with open(segment.index_path, "a", encoding="utf-8") as f:
+                    f.write("".join(index_lines))
+
+            segment.size = offset
+            self.entries_written += len(lines)
+            self.batches_written += 1
+
+    def _write_updates(self):
+        """Copia una vez cada entrada marcada y la anexa al segmento de su línea original"""
+        dirty = self._dirty
+        segments = [segment for segment in self._segments if segment.first_seq is not None]
+        firsts = [segment.first_seq for segment in segments]
+        by_segment = {}
+        unwritten = []
+        while dirty:
+            seq, entry = dirty.popitem()
+            if seq >= self._written_seq:
+                unwritten.append(entry)  # Su línea original sale en el próximo lote
+                continue
+            position = bisect_right(firsts, seq) - 1
+            if position >= 0:  # Si no, su segmento ya se descartó al rotar
+                by_segment.setdefault(position, []).append(entry.copy())
+        for entry in unwritten:
+            dirty.setdefault(entry.seq, entry)
+
+        for position, entries in by_segment.items():
+            segment = segments[position]
+            with open(segment.updates_path, "ab") as f:
+                f.write(b"".join(self._serialize(entry).encode("utf-8") for entry in entries))
+            segment.update_lines += len(entries)
+            segment.update_seqs.update(entry.seq for entry in entries)
+            self.updates_written += len(entries)
+            if segment.update_lines > 2 * len(segment.update_seqs) + self.UPDATES_SLACK:
+                self._compact_updates(segment)
+
+    def _compact_updates(self, segment):
+        """Reescribe el archivo de actualizaciones con solo la última línea por entrada"""
+        updates = self._read_updates(segment)
+        temporary = segment.updates_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write("".join("\t".join(fields) + "\n" for fields in updates.values()))
+        os.replace(temporary, segment.updates_path)
+        segment.update_lines = len(updates)
+
+    def close(self):
+        """Detiene el hilo escritor tras persistir lo pendiente"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    # Consultas
+    def query(self, since_ns=None, until_ns=None):
+        """Genera las entradas con since_ns <= timestamp <= until_ns desde disco
+
+        Se leen solo los segmentos del rango, desde el punto del índice
+        disperso, y la lectura termina en la primera línea posterior a
+        until_ns. Cada entrada sale con su última actualización aplicada.
+        """
+        from .error_logger import ErrorEntry
+
+        self.flush()
+        with self._io_lock:
+            segments = list(self._segments)
+
+        # Primer segmento que puede contener since_ns (el último que empieza
+        # antes; puede terminar con timestamps iguales a since_ns)
+        start = 0
+        if since_ns is not None:
+            firsts = [segment.first_ts for segment in segments]
+            start = max(bisect_left(firsts, since_ns) - 1, 0)
+
+        for segment in segments[start:]:
+            if until_ns is not None and segment.first_ts > until_ns:
+                return
+            updates = self._read_updates(segment)
+
+            # Saltar dentro del segmento con el índice disperso
+            offset = 0
+            if since_ns is not None:
+                # Último punto indexado estrictamente anterior a since_ns
+                position = bisect_left(segment.index_ts, since_ns) - 1
+                if position >= 0:
+                    offset = segment.index_offsets[position]
+
+            with open(segment.path, "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    fields = _parse_line(raw)
+                    timestamp_ns = int(fields[0])
+                    if since_ns is not None and timestamp_ns < since_ns:
+                        continue
+                    if until_ns is not None and timestamp_ns > until_ns:
+                        return
+
+                    seq = _line_seq(fields)
+                    fields = updates.get(seq, fields)
+                    entry = ErrorEntry(_unescape(fields[4]), _unescape(fields[3]),
+                                       _unescape(fields[5]), _unescape(fields[6]))
+                    entry.timestamp_ns = timestamp_ns
+                    entry.last_seen_ns = int(fields[1])
+                    entry.count = int(fields[2])
+                    entry.seq = seq
+                    yield entry
+
+    def get_stats(self):
+        """Obtiene estadísticas del destino en disco"""
+        with self._io_lock:
+            return {
+                "segments": len(self._segments),
+                "bytes": sum(segment.size for segment in self._segments),
+                "entries_written": self.entries_written,
+                "updates_written": self.updates_written,
+                "batches_written": self.batches_written,
+                "pending": len(self._pending),
+                "dirty": len(self._dirty)
+            }